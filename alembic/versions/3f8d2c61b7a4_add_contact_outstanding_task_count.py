@@ -0,0 +1,36 @@
+"""Add outstanding_task_count to contacts
+
+Revision ID: 3f8d2c61b7a4
+Revises: e5b82d07c1f9
+Create Date: 2026-10-16 15:07:41.522918
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3f8d2c61b7a4'
+down_revision: Union[str, None] = 'e5b82d07c1f9'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('contacts', sa.Column('outstanding_task_count', sa.Integer(), server_default=sa.text('0'), nullable=False))
+    # Backfill from existing tasks; the Task mapper events keep it current afterwards
+    op.execute("""
+        UPDATE contacts SET outstanding_task_count = (
+            SELECT COUNT(*) FROM tasks
+            WHERE tasks.contact_id = contacts.id
+              AND tasks.status IN ('PENDING', 'IN_PROGRESS')
+        )
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('contacts', 'outstanding_task_count')
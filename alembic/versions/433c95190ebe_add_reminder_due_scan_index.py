@@ -0,0 +1,30 @@
+"""Add composite index for the due reminder scan
+
+Revision ID: 433c95190ebe
+Revises: fdc59296aacc
+Create Date: 2026-10-16 04:30:12.518204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '433c95190ebe'
+down_revision: Union[str, None] = 'fdc59296aacc'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    with op.batch_alter_table('reminders', schema=None) as batch_op:
+        batch_op.create_index('ix_reminder_due_scan', ['is_active', 'trigger_datetime'], unique=False, postgresql_where=sa.text('is_active'))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table('reminders', schema=None) as batch_op:
+        batch_op.drop_index('ix_reminder_due_scan', postgresql_where=sa.text('is_active'))
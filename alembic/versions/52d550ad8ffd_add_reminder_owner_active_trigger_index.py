@@ -0,0 +1,33 @@
+"""Add composite owner/active/trigger index on reminders
+
+Revision ID: 52d550ad8ffd
+Revises: 433c95190ebe
+Create Date: 2026-10-16 06:12:44.301952
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '52d550ad8ffd'
+down_revision: Union[str, None] = '433c95190ebe'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    with op.batch_alter_table('reminders', schema=None) as batch_op:
+        batch_op.create_index('ix_rem_owner_active_trigger', ['owner_id', 'is_active', 'trigger_datetime'], unique=False)
+        # Covered by the leading column of ix_reminder_due_scan
+        batch_op.drop_index('ix_reminders_is_active')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table('reminders', schema=None) as batch_op:
+        batch_op.create_index('ix_reminders_is_active', ['is_active'], unique=False)
+        batch_op.drop_index('ix_rem_owner_active_trigger')
@@ -0,0 +1,30 @@
+"""Add composite owner/id index on categories
+
+Revision ID: 7c3e91a4d2b6
+Revises: 52d550ad8ffd
+Create Date: 2026-10-16 09:41:18.527036
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7c3e91a4d2b6'
+down_revision: Union[str, None] = '52d550ad8ffd'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    with op.batch_alter_table('categories', schema=None) as batch_op:
+        batch_op.create_index('ix_categories_owner_id', ['owner_id', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table('categories', schema=None) as batch_op:
+        batch_op.drop_index('ix_categories_owner_id')
@@ -0,0 +1,30 @@
+"""Add composite owner/id index on tasks
+
+Revision ID: b81f4e07a2c9
+Revises: 3f8d2c61b7a4
+Create Date: 2026-10-16 16:12:37.904125
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b81f4e07a2c9'
+down_revision: Union[str, None] = '3f8d2c61b7a4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    with op.batch_alter_table('tasks', schema=None) as batch_op:
+        batch_op.create_index('ix_tasks_owner_id', ['owner_id', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table('tasks', schema=None) as batch_op:
+        batch_op.drop_index('ix_tasks_owner_id')
@@ -0,0 +1,30 @@
+"""Add partial available-tasks index on tasks
+
+Revision ID: d4a9c2e61f53
+Revises: b81f4e07a2c9
+Create Date: 2026-10-16 16:48:09.217563
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd4a9c2e61f53'
+down_revision: Union[str, None] = 'b81f4e07a2c9'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    with op.batch_alter_table('tasks', schema=None) as batch_op:
+        batch_op.create_index('ix_tasks_available', ['owner_id', 'id'], unique=False, postgresql_where=sa.text("status IN ('PENDING', 'IN_PROGRESS')"))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table('tasks', schema=None) as batch_op:
+        batch_op.drop_index('ix_tasks_available', postgresql_where=sa.text("status IN ('PENDING', 'IN_PROGRESS')"))
@@ -0,0 +1,32 @@
+"""Add composite indexes for notes, projects and reminder history
+
+Revision ID: e5b82d07c1f9
+Revises: 7c3e91a4d2b6
+Create Date: 2026-10-16 14:22:05.118304
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e5b82d07c1f9'
+down_revision: Union[str, None] = '7c3e91a4d2b6'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_notes_owner_contact', 'notes', ['owner_id', 'contact_id'], unique=False)
+    op.create_index('ix_projects_owner_category', 'projects', ['owner_id', 'category_id'], unique=False)
+    op.create_index('ix_reminder_events_rid_time', 'reminder_events', ['reminder_id', 'action_time'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_reminder_events_rid_time', table_name='reminder_events')
+    op.drop_index('ix_projects_owner_category', table_name='projects')
+    op.drop_index('ix_notes_owner_contact', table_name='notes')
@@ -0,0 +1,23 @@
+from unittest.mock import patch
+from fastapi.testclient import TestClient
+
+from zoltar_backend import auth_utils_ms
+
+# Without Redis the OAuth state lives in a per-process store; the callback must still reject
+# any state it cannot verify.
+
+@patch("zoltar_backend.auth_utils_ms.get_redis", return_value=None)
+def test_oauth_state_is_single_use_without_redis(mock_get_redis):
+    auth_utils_ms.save_oauth_state("local-state")
+
+    assert auth_utils_ms.consume_oauth_state("local-state") is True
+    assert auth_utils_ms.consume_oauth_state("local-state") is False
+    assert auth_utils_ms.consume_oauth_state("never-issued") is False
+    assert auth_utils_ms.consume_oauth_state(None) is False
+
+@patch("zoltar_backend.auth_utils_ms.get_redis", return_value=None)
+def test_callback_rejects_unverified_state_without_redis(mock_get_redis, test_client: TestClient):
+    response = test_client.get("/auth/microsoft/callback", params={"code": "abc", "state": "forged"})
+
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Invalid state parameter."
@@ -1,12 +1,13 @@
+import asyncio
 import pytest
 from fastapi.testclient import TestClient
-from unittest.mock import patch, MagicMock
+from unittest.mock import patch, AsyncMock
 from datetime import datetime, timezone
 from typing import List, Optional, Dict, Any
 
 # Adjust the import path based on your project structure
 from zoltar_backend.main import app # Import your FastAPI app instance
-from zoltar_backend import schemas, models, auth # Import relevant schemas, models, and auth module
+from zoltar_backend import schemas, models, auth, auth_utils_ms # Import relevant schemas, models, and auth module
 
 # Create a TestClient instance
 client = TestClient(app)
@@ -64,9 +65,9 @@ app.dependency_overrides[auth.get_current_active_user] = override_get_current_ac
     (MOCK_USER_NOT_LINKED, 400, None, None),         # Error - Account not linked
     (MOCK_USER_LINKED, 503, None, None),             # Error - Graph API failure
 ])
-@patch("zoltar_backend.auth_utils_ms.get_outlook_calendar_events")
+@patch("zoltar_backend.auth_utils_ms.get_outlook_calendar_events_async", new_callable=AsyncMock)
 def test_read_calendar_agenda(
-    mock_get_events: MagicMock,
+    mock_get_events: AsyncMock,
     test_user: models.User,
     expected_status: int,
     mock_events: Optional[List[Dict[str, Any]]],
@@ -111,6 +112,26 @@ def test_read_calendar_agenda(
     # Clean up dependency override after test
     app.dependency_overrides = {}
 
+@patch("zoltar_backend.auth_utils_ms._send_graph_request_async", new_callable=AsyncMock)
+@patch("zoltar_backend.auth_utils_ms.get_cached_ms_token")
+def test_calendar_events_follow_next_link_without_count(mock_get_token, mock_send):
+    """Without @odata.count, every @odata.nextLink page is fetched in turn."""
+    mock_get_token.return_value = {"access_token": "token"}
+    next_link = "https://graph.microsoft.com/v1.0/me/calendarview?$skip=50"
+    mock_send.side_effect = [
+        {"value": [MOCK_RAW_EVENT_1], "@odata.nextLink": next_link},
+        {"value": [MOCK_RAW_EVENT_1]},
+    ]
+
+    events = asyncio.run(auth_utils_ms.get_outlook_calendar_events_async(
+        db=None, ms_oid=MOCK_USER_LINKED.ms_oid,
+        start_time=datetime(2024, 7, 30, tzinfo=timezone.utc), end_time=datetime(2024, 7, 31, tzinfo=timezone.utc)
+    ))
+
+    assert len(events) == 2
+    assert mock_send.call_count == 2
+    assert mock_send.call_args.args[:2] == ("GET", next_link)
+
 def test_read_calendar_agenda_unauthenticated():
     """Tests GET /calendar/agenda without authentication (no override)."""
     # Ensure overrides are clear if previous test failed
@@ -198,9 +219,9 @@ INVALID_EVENT_PAYLOAD_END_BEFORE_START = {
     # Error: Graph API response has bad date (causes Pydantic error)
     (MOCK_USER_LINKED, VALID_EVENT_PAYLOAD, MOCK_GRAPH_CREATE_RESPONSE_BAD_DATE, 500, "Failed to process response"),
 ])
-@patch("zoltar_backend.auth_utils_ms.call_microsoft_graph_api")
+@patch("zoltar_backend.auth_utils_ms.call_microsoft_graph_api_async", new_callable=AsyncMock)
 def test_create_calendar_event(
-    mock_call_graph: MagicMock,
+    mock_call_graph: AsyncMock,
     test_user: models.User,
     request_payload: Dict[str, Any],
     mock_graph_response: Optional[Dict[str, Any]],
@@ -325,9 +346,9 @@ INVALID_UPDATE_PAYLOAD_END_BEFORE_START = {
     # Error: Empty update payload
     (MOCK_USER_LINKED, "event123", {}, None, 400, "No update data provided"),
 ])
-@patch("zoltar_backend.auth_utils_ms.call_microsoft_graph_api")
+@patch("zoltar_backend.auth_utils_ms.call_microsoft_graph_api_async", new_callable=AsyncMock)
 def test_update_calendar_event(
-    mock_call_graph: MagicMock,
+    mock_call_graph: AsyncMock,
     test_user: models.User,
     event_id: str,
     request_payload: Dict[str, Any],
@@ -386,4 +407,30 @@ def test_update_calendar_event_invalid_payload(payload: Dict, expected_detail_pa
 
 
 
-# Example: 
\ No newline at end of file
+# Example: 
+
+@pytest.mark.parametrize("test_user, expected_status", [
+    (MOCK_USER_LINKED, 200),      # Reminders not found are reported per item
+    (MOCK_USER_NOT_LINKED, 400),  # Error - Account not linked
+])
+@patch("zoltar_backend.auth_utils_ms.call_microsoft_graph_batch_async", new_callable=AsyncMock)
+def test_sync_reminders_to_calendar_batch(
+    mock_batch: AsyncMock,
+    test_user: models.User,
+    expected_status: int,
+):
+    """Tests POST /calendar/reminders/batch for unknown reminders and unlinked accounts."""
+    app.dependency_overrides[auth.get_current_active_user] = lambda: test_user
+
+    response = client.post("/calendar/reminders/batch", json={"reminder_ids": [987654, 987655, 987654]})
+
+    assert response.status_code == expected_status
+    if expected_status == 200:
+        results = response.json()["results"]
+        assert [r["reminder_id"] for r in results] == [987654, 987655] # De-duplicated, in order
+        assert all(r["status"] == 404 for r in results)
+        mock_batch.assert_not_called() # Nothing valid to send to Graph
+    else:
+        assert "Microsoft account not linked" in response.json()["detail"]
+
+    app.dependency_overrides = {}
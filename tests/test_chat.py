@@ -158,6 +158,60 @@ def test_route_create_task_with_response(
     assert response_data["entities"] == expected_entities_for_generator
     assert response_data["response_text"] == mock_final_response_text
 
+@patch.object(llm_utils, 'generate_response_text')
+@patch.object(crud, 'create_user_task')
+@patch.object(crud, 'create_user_reminders_bulk')
+@patch.object(llm_utils, 'extract_intent_entities')
+def test_route_batch_intents_with_response(
+    mock_extract, mock_create_reminders, mock_create_task, mock_generate_response,
+    test_client: TestClient, auth_headers: dict
+):
+    """Test that batch_intents inserts all reminders in one call and routes other items to their handler."""
+    message_text = "Remind me to call Sam at 9 and Alex at 10, and add a task to book flights"
+    mock_extract.return_value = {
+        "intent": "batch_intents",
+        "entities": {"intents": [
+            {"intent": "create_reminder", "entities": {"description": "call Sam", "trigger_datetime_iso": "2024-08-16T09:00:00"}},
+            {"intent": "create_reminder", "entities": {"description": "call Alex", "trigger_datetime_iso": "2024-08-16T10:00:00"}},
+            {"intent": "create_reminder", "entities": {"description": "no time given"}},
+            {"intent": "create_task", "entities": {"title": "Book flights"}},
+        ]}
+    }
+    mock_create_reminders.return_value = [11, 12]
+    mock_created_task = MagicMock(spec=schemas.Task)
+    mock_created_task.id = 789
+    mock_created_task.title = "Book flights"
+    mock_created_task.description = None
+    mock_created_task.due_date = None
+    mock_create_task.return_value = mock_created_task
+    mock_generate_response.return_value = "Generated success message for batch"
+
+    response = test_client.post(
+        "/chat/message", json={"text": message_text}, headers=auth_headers
+    )
+
+    assert response.status_code == 200
+    # Only the two complete reminders are inserted, together
+    mock_create_reminders.assert_called_once()
+    reminders = mock_create_reminders.call_args.args[1]
+    assert [reminder.description for reminder in reminders] == ["call Sam", "call Alex"]
+    assert [reminder.trigger_datetime for reminder in reminders] == [
+        datetime.fromisoformat("2024-08-16T09:00:00"), datetime.fromisoformat("2024-08-16T10:00:00")
+    ]
+    mock_create_task.assert_called_once()
+    assert mock_create_task.call_args.kwargs["task"].title == "Book flights"
+
+    response_data = response.json()
+    assert response_data["intent"] == "batch_intents"
+    assert response_data["response_text"] == "Generated success message for batch"
+    entities = response_data["entities"]
+    assert entities["created_reminder_ids"] == [11, 12]
+    results = entities["results"]
+    assert [result["entities"].get("created_reminder_id") for result in results[:3]] == [11, 12, None]
+    assert results[2]["entities"]["error"] == "missing_required_entities"
+    assert results[3]["entities"]["created_task_id"] == 789
+    mock_generate_response.assert_called_once_with("batch_intents", entities)
+
 # --- Test LLM/Routing/Response Failures --- 
 
 @patch.object(llm_utils, 'generate_response_text')
@@ -180,6 +234,46 @@ def test_send_chat_message_llm_failure(mock_extract, mock_generate_response, tes
     # Generator should NOT be called if initial extraction fails and raises HTTP Exception
     mock_generate_response.assert_not_called()
 
+@patch.object(llm_utils, 'generate_response_text')
+@patch.object(llm_utils, 'extract_intent_entities')
+def test_general_question_uses_extracted_response_text(mock_extract, mock_generate_response, test_client: TestClient, auth_headers: dict):
+    """A response_text returned with the intent is used directly for intents without an action."""
+    message_text = "What's the capital of France?"
+    mock_extract.return_value = {
+        "intent": "ask_general_question",
+        "entities": {"query": message_text},
+        "response_text": "The capital of France is Paris."
+    }
+
+    response = test_client.post(
+        "/chat/message", json={"text": message_text}, headers=auth_headers
+    )
+
+    assert response.status_code == 200
+    mock_extract.assert_called_once_with(message_text)
+    # No second LLM round trip for the answer
+    mock_generate_response.assert_not_called()
+    assert response.json() == {
+        "intent": "ask_general_question",
+        "entities": {"query": message_text},
+        "response_text": "The capital of France is Paris."
+    }
+
+@patch.object(llm_utils, 'extract_intent_entities')
+def test_greeting_skips_llm_intent_extraction(mock_extract, test_client: TestClient, auth_headers: dict):
+    """Plain greetings are classified by the static intent router without calling the LLM."""
+    response = test_client.post(
+        "/chat/message", json={"text": "Hello there!"}, headers=auth_headers
+    )
+
+    assert response.status_code == 200
+    mock_extract.assert_not_called()
+    assert response.json() == {
+        "intent": "general_greeting",
+        "entities": {},
+        "response_text": "Hello there! How can I help you today?"
+    }
+
 def test_send_chat_message_invalid_input(test_client: TestClient, auth_headers: dict):
     """Test sending invalid JSON payload."""
     response = test_client.post(
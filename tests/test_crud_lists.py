@@ -13,7 +13,7 @@ def db_session_mock():
     session = MagicMock(spec=Session)
     session.query.return_value.filter.return_value.first.return_value = None # Default: not found
     session.query.return_value.options.return_value.filter.return_value.first.return_value = None # Default for get_list
-    session.query.return_value.options.return_value.filter.return_value.order_by.return_value.all.return_value = [] # Default for get_lists_by_user
+    session.query.return_value.options.return_value.filter.return_value.order_by.return_value.offset.return_value.limit.return_value.all.return_value = [] # Default for get_lists_by_user
     session.query.return_value.join.return_value.filter.return_value.first.return_value = None # Default for item lookups
     return session
 
@@ -108,7 +108,7 @@ def test_get_list_wrong_user(db_session_mock, test_user, mock_list_db_obj):
 
 def test_get_lists_by_user(db_session_mock, test_user, mock_list_db_obj):
     """Tests retrieving all lists for a user."""
-    db_session_mock.query.return_value.options.return_value.filter.return_value.order_by.return_value.all.return_value = [mock_list_db_obj]
+    db_session_mock.query.return_value.options.return_value.filter.return_value.order_by.return_value.offset.return_value.limit.return_value.all.return_value = [mock_list_db_obj]
 
     lists = crud.get_lists_by_user(db=db_session_mock, user_id=test_user.id)
 
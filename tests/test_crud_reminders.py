@@ -0,0 +1,24 @@
+import pytest
+from sqlalchemy.orm import Session
+from unittest.mock import MagicMock
+from datetime import datetime, timezone
+
+from zoltar_backend import crud, crud_errors, schemas
+
+@pytest.mark.parametrize("fields", [
+    {"reminder_type": schemas.ReminderType.RECURRING_RELATIVE, "relative_to_task_completion_id": 5, "relative_delay_minutes": 10},
+    # Bypasses ReminderCreate's validator, which would otherwise clear the relative task
+    {"relative_to_task_completion_id": 5},
+    {"task_id": 7},
+])
+def test_create_user_reminders_bulk_rejects_linked_reminders(fields):
+    """Linked reminders need create_user_reminder's ownership checks; the bulk insert refuses them."""
+    db = MagicMock(spec=Session)
+    reminder = schemas.ReminderCreate.model_construct(
+        description="linked", trigger_datetime=datetime.now(timezone.utc), **fields
+    )
+
+    with pytest.raises(crud_errors.CrudError):
+        crud.create_user_reminders_bulk(db, [reminder], owner_id=1)
+    db.scalars.assert_not_called()
+    db.commit.assert_not_called()
@@ -6,7 +6,7 @@ from typing import List, Optional
 
 # Adjust the import path based on your project structure
 from zoltar_backend.main import app # Import your FastAPI app instance
-from zoltar_backend import schemas, models, auth, crud # Import relevant components
+from zoltar_backend import schemas, models, auth, crud, crud_errors # Import relevant components
 
 # Create a TestClient instance
 client = TestClient(app)
@@ -100,7 +100,7 @@ def test_read_lists_success(mock_crud_get_all):
     response_data = response.json()
     assert len(response_data) == 1
     assert response_data[0]["id"] == MOCK_LIST_ID
-    mock_crud_get_all.assert_called_once_with(db=ANY, user_id=MOCK_USER.id)
+    mock_crud_get_all.assert_called_once_with(db=ANY, user_id=MOCK_USER.id, skip=0, limit=100)
     app.dependency_overrides = {}
 
 def test_read_lists_unauthenticated():
@@ -327,4 +327,38 @@ def test_delete_list_item_unauthenticated():
     """Tests DELETE /items/{item_id} without authentication (401)."""
     app.dependency_overrides = {}
     response = client.delete(f"/lists/items/{MOCK_LIST_ITEM_ID}")
-    assert response.status_code == 401 
\ No newline at end of file
+    assert response.status_code == 401
+
+
+@patch("zoltar_backend.crud.bulk_create_list_items")
+def test_create_list_items_batch_success(mock_crud_bulk_create):
+    """Tests POST /{list_id}/items/batch passes every item to one CRUD call."""
+    mock_crud_bulk_create.return_value = [
+        {"id": MOCK_LIST_ITEM_ID, "text": "Eggs", "is_checked": False, "list_id": MOCK_LIST_ID, "created_at": NOW, "updated_at": None},
+        {"id": MOCK_LIST_ITEM_ID + 1, "text": "Bread", "is_checked": True, "list_id": MOCK_LIST_ID, "created_at": NOW, "updated_at": None},
+    ]
+    app.dependency_overrides[auth.get_current_active_user] = lambda: MOCK_USER
+
+    response = client.post(f"/lists/{MOCK_LIST_ID}/items/batch", json=[LIST_ITEM_CREATE_PAYLOAD, LIST_ITEM_UPDATE_PAYLOAD])
+
+    assert response.status_code == 200
+    assert [item["id"] for item in response.json()] == [MOCK_LIST_ITEM_ID, MOCK_LIST_ITEM_ID + 1]
+    mock_crud_bulk_create.assert_called_once_with(
+        db=ANY,
+        items=[schemas.ListItemCreate(**LIST_ITEM_CREATE_PAYLOAD), schemas.ListItemCreate(**LIST_ITEM_UPDATE_PAYLOAD)],
+        list_id=MOCK_LIST_ID,
+        user_id=MOCK_USER.id
+    )
+    app.dependency_overrides = {}
+
+@patch("zoltar_backend.crud.bulk_create_list_items")
+def test_create_list_items_batch_list_not_found(mock_crud_bulk_create):
+    """Tests POST /{list_id}/items/batch parent list not found (404)."""
+    mock_crud_bulk_create.side_effect = crud_errors.NotFound("Parent list not found or not owned by user")
+    app.dependency_overrides[auth.get_current_active_user] = lambda: MOCK_USER
+
+    response = client.post(f"/lists/{MOCK_LIST_ID + 99}/items/batch", json=[LIST_ITEM_CREATE_PAYLOAD])
+
+    assert response.status_code == 404
+    assert "Parent list not found" in response.json()["detail"]
+    app.dependency_overrides = {}
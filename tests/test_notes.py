@@ -1,12 +1,12 @@
 import pytest
 from fastapi.testclient import TestClient
-from unittest.mock import patch, MagicMock, ANY
+from unittest.mock import patch, MagicMock, AsyncMock, ANY
 from datetime import datetime, timezone
 from typing import List, Optional, Dict, Any, Tuple
 
 # Adjust the import path based on your project structure
 from zoltar_backend.main import app # Import your FastAPI app instance
-from zoltar_backend import schemas, models, auth # Import relevant schemas and models
+from zoltar_backend import schemas, models, auth, crud_errors # Import relevant schemas and models
 
 # Create a TestClient instance
 client = TestClient(app)
@@ -60,7 +60,7 @@ app.dependency_overrides[auth.get_current_active_user] = override_get_current_ac
         (None, None, Exception("DB Error"), 500, None, None),
     ]
 )
-@patch("zoltar_backend.llm_utils.summarize_text_gemini")
+@patch("zoltar_backend.llm_utils.summarize_text_gemini_async", new_callable=AsyncMock)
 @patch("zoltar_backend.crud.get_notes_content_by_filter")
 def test_summarize_notes(
     mock_get_notes: MagicMock,
@@ -122,4 +122,15 @@ def test_summarize_notes_invalid_payload():
     assert response.status_code == 422
     # Check Pydantic validation error detail
     assert "At least one filter" in response.json()["detail"][0]["msg"]
-    app.dependency_overrides = {} 
\ No newline at end of file
+    app.dependency_overrides = {}
+
+
+@patch("zoltar_backend.crud.create_user_note")
+def test_create_note_invalid_contact(mock_create_note):
+    """Tests that InvalidContact raised by CRUD is returned as a 400 with its detail."""
+    app.dependency_overrides[auth.get_current_active_user] = lambda: MOCK_USER
+    mock_create_note.side_effect = crud_errors.InvalidContact("Invalid contact_id: 999. Contact not found or does not belong to user.")
+    response = client.post("/notes/", json={"content": "Note", "contact_id": 999})
+    assert response.status_code == 400
+    assert response.json() == {"detail": "Invalid contact_id: 999. Contact not found or does not belong to user."}
+    app.dependency_overrides = {}
@@ -0,0 +1,24 @@
+from unittest.mock import MagicMock
+
+from zoltar_backend import push_utils
+
+def test_failed_client_build_is_retried(monkeypatch):
+    """A client that fails to build is not cached; the next call builds it again and keeps it."""
+    client = MagicMock()
+    build = MagicMock(side_effect=[None, client])
+    monkeypatch.setattr(push_utils, "APNS_CONFIGURED", True)
+    monkeypatch.setattr(push_utils, "_apns_client", None)
+    monkeypatch.setattr(push_utils, "_build_apns_client", build)
+
+    assert push_utils.get_apns_client() is None
+    assert push_utils.get_apns_client() is client
+    assert push_utils.get_apns_client() is client
+    assert build.call_count == 2
+
+def test_unconfigured_client_is_never_built(monkeypatch):
+    build = MagicMock()
+    monkeypatch.setattr(push_utils, "APNS_CONFIGURED", False)
+    monkeypatch.setattr(push_utils, "_build_apns_client", build)
+
+    assert push_utils.get_apns_client() is None
+    build.assert_not_called()
@@ -0,0 +1,49 @@
+import pytest
+from datetime import datetime, timedelta, timezone
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from zoltar_backend import crud
+
+models = crud.models
+
+@pytest.fixture
+def db():
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    models.Base.metadata.create_all(bind=engine)
+    session = sessionmaker(bind=engine)()
+    try:
+        yield session
+    finally:
+        session.close()
+        engine.dispose()
+
+@pytest.fixture
+def reminder_id(db) -> int:
+    """A reminder whose events were inserted out of action_time order, two sharing a time."""
+    reminder = models.Reminder(title="History", owner_id=1, trigger_datetime=datetime.now(timezone.utc))
+    db.add(reminder)
+    db.flush()
+    base = datetime(2024, 8, 1, tzinfo=timezone.utc)
+    for offset_minutes in (30, 0, 10, 10):
+        db.add(models.ReminderEvent(
+            reminder_id=reminder.id, expected_trigger_time=base, action_time=base + timedelta(minutes=offset_minutes),
+            action_type=models.ReminderActionType.TRIGGERED
+        ))
+    db.commit()
+    return reminder.id
+
+def _minutes(events):
+    return [int((event.action_time.replace(tzinfo=timezone.utc) - datetime(2024, 8, 1, tzinfo=timezone.utc)).total_seconds() // 60) for event in events]
+
+def test_history_is_unbounded_and_ordered_by_action_time(db, reminder_id):
+    events = crud.get_reminder_history(db, reminder_id=reminder_id, user_id=1)
+    assert _minutes(events) == [30, 10, 10, 0]
+    assert events[1].id > events[2].id # id breaks the action_time tie
+
+def test_history_pages_with_before_id(db, reminder_id):
+    first_page = crud.get_reminder_history(db, reminder_id=reminder_id, user_id=1, limit=2)
+    second_page = crud.get_reminder_history(db, reminder_id=reminder_id, user_id=1, before_id=first_page[-1].id, limit=2)
+    assert _minutes(first_page) + _minutes(second_page) == [30, 10, 10, 0]
+    assert {event.id for event in first_page}.isdisjoint(event.id for event in second_page)
@@ -0,0 +1,82 @@
+import pytest
+from datetime import datetime, timedelta, timezone
+from unittest.mock import MagicMock
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from zoltar_backend import reminder_schedule
+
+models = reminder_schedule.models
+
+@pytest.fixture
+def db():
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    models.Base.metadata.create_all(bind=engine)
+    session = sessionmaker(bind=engine)()
+    try:
+        yield session
+    finally:
+        session.close()
+        engine.dispose()
+
+def test_compute_next_due_ignores_renotify_of_snoozed_persistent_reminder(db):
+    now_utc = datetime.now(timezone.utc)
+    snoozed_until = now_utc + timedelta(minutes=30)
+    db.add(models.Reminder(
+        title="Snoozed persistent", owner_id=1, is_active=True,
+        trigger_datetime=now_utc - timedelta(hours=1),
+        last_notified_at=now_utc - timedelta(minutes=1),
+        remind_frequency_minutes=5,
+        snoozed_until=snoozed_until
+    ))
+    db.commit()
+
+    # The re-notify time (4 minutes out) is suppressed by the snooze; only the idle cap applies
+    assert reminder_schedule.compute_next_due(db, now_utc) == now_utc + reminder_schedule.MAX_IDLE
+
+def test_schedule_next_run_never_schedules_in_the_past(monkeypatch):
+    scheduler = MagicMock()
+    monkeypatch.setattr(reminder_schedule, "_scheduler", scheduler)
+    monkeypatch.setattr(reminder_schedule, "_next_due_datetime", datetime.now(timezone.utc) - timedelta(minutes=5))
+
+    before = datetime.now(timezone.utc)
+    reminder_schedule.schedule_next_run()
+
+    kwargs = scheduler.add_job.call_args.kwargs
+    assert kwargs["run_date"] >= before + reminder_schedule.MIN_RESCHEDULE_DELAY
+    assert kwargs["misfire_grace_time"] is None
+
+def test_failed_scan_backs_off_to_rescan_delay(monkeypatch):
+    from zoltar_backend import main
+
+    def failing_session():
+        raise RuntimeError("database unavailable")
+
+    scheduler = MagicMock()
+    monkeypatch.setattr(main.push_utils, "APNS_CONFIGURED", True)
+    monkeypatch.setattr(main.push_utils, "get_apns_client", lambda: object())
+    monkeypatch.setattr(main, "JobSessionLocal", failing_session)
+    monkeypatch.setattr(main.reminder_schedule, "_scheduler", scheduler)
+    # A due time left over from the previous scan, now in the past
+    monkeypatch.setattr(main.reminder_schedule, "_next_due_datetime", datetime.now(timezone.utc) - timedelta(seconds=5))
+
+    before = datetime.now(timezone.utc)
+    with pytest.raises(RuntimeError):
+        main.check_due_reminders_job()
+
+    assert main.reminder_schedule._next_due_datetime is None
+    assert scheduler.add_job.call_args.kwargs["run_date"] >= before + main.reminder_schedule.RESCAN_DELAY
+
+def test_unavailable_apns_client_reschedules_at_rescan_delay(monkeypatch):
+    from zoltar_backend import main
+
+    scheduler = MagicMock()
+    monkeypatch.setattr(main.push_utils, "APNS_CONFIGURED", True)
+    monkeypatch.setattr(main.push_utils, "get_apns_client", lambda: None)
+    monkeypatch.setattr(main.reminder_schedule, "_scheduler", scheduler)
+
+    before = datetime.now(timezone.utc)
+    main.check_due_reminders_job()
+
+    assert scheduler.add_job.call_args.kwargs["run_date"] >= before + main.reminder_schedule.RESCAN_DELAY
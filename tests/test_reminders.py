@@ -0,0 +1,22 @@
+from fastapi.testclient import TestClient
+
+def test_create_reminder(test_client: TestClient, auth_headers: dict):
+    """Tests POST /reminders/ creates a one-time reminder owned by the current user."""
+    payload = {"description": "Call the plumber", "trigger_datetime": "2030-01-15T09:00:00Z"}
+
+    response = test_client.post("/reminders/", json=payload, headers=auth_headers)
+
+    assert response.status_code == 201
+    data = response.json()
+    assert data["description"] == "Call the plumber"
+    assert data["reminder_type"] == "one_time"
+    assert data["is_active"] is True
+
+def test_create_reminder_invalid_task(test_client: TestClient, auth_headers: dict):
+    """Tests that a task the user doesn't own is rejected with a 400."""
+    payload = {"description": "Linked", "trigger_datetime": "2030-01-15T09:00:00Z", "task_id": 999999999}
+
+    response = test_client.post("/reminders/", json=payload, headers=auth_headers)
+
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Task not found or not owned by user"
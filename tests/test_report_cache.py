@@ -0,0 +1,77 @@
+from unittest.mock import patch
+from fastapi.testclient import TestClient
+
+# The aggregate report endpoints are cached per user; a committed write must drop the cached copy.
+
+def test_outstanding_items_cache_invalidated_by_new_note(test_client: TestClient, auth_headers: dict):
+    response = test_client.post("/contacts/", json={"name": "Report Cache Contact"}, headers=auth_headers)
+    assert response.status_code == 201
+    contact_id = response.json()["id"]
+    path = f"/outstanding/contact/{contact_id}"
+
+    first = test_client.get(path, headers=auth_headers)
+    second = test_client.get(path, headers=auth_headers)
+    assert first.headers["X-Cache"] == "MISS"
+    assert second.headers["X-Cache"] == "HIT"
+    assert second.json() == first.json()
+
+    note_response = test_client.post("/notes/", json={"content": "new", "contact_id": contact_id}, headers=auth_headers)
+    assert note_response.status_code == 201
+
+    after_write = test_client.get(path, headers=auth_headers)
+    assert after_write.headers["X-Cache"] == "MISS"
+    assert len(after_write.json()["notes"]) == 1
+
+def test_outstanding_items_cache_invalidated_by_bulk_notes(test_client: TestClient, auth_headers: dict):
+    response = test_client.post("/contacts/", json={"name": "Bulk Notes Contact"}, headers=auth_headers)
+    assert response.status_code == 201
+    contact_id = response.json()["id"]
+    path = f"/outstanding/contact/{contact_id}"
+
+    assert test_client.get(path, headers=auth_headers).headers["X-Cache"] == "MISS"
+    assert test_client.get(path, headers=auth_headers).headers["X-Cache"] == "HIT"
+
+    batch = [{"content": "first", "contact_id": contact_id}, {"content": "second", "contact_id": contact_id}]
+    assert test_client.post("/notes/batch", json=batch, headers=auth_headers).status_code == 201
+
+    after_write = test_client.get(path, headers=auth_headers)
+    assert after_write.headers["X-Cache"] == "MISS"
+    assert len(after_write.json()["notes"]) == 2
+
+def test_project_summary_cache_invalidated_by_update(test_client: TestClient, auth_headers: dict):
+    response = test_client.post("/projects/", json={"name": "Report Cache Project"}, headers=auth_headers)
+    assert response.status_code == 201
+    project_id = response.json()["id"]
+    path = f"/projects/{project_id}/summary"
+
+    assert test_client.get(path, headers=auth_headers).headers["X-Cache"] == "MISS"
+    assert test_client.get(path, headers=auth_headers).headers["X-Cache"] == "HIT"
+
+    update_response = test_client.put(f"/projects/{project_id}", json={"name": "Renamed Project"}, headers=auth_headers)
+    assert update_response.status_code == 200
+
+    after_write = test_client.get(path, headers=auth_headers)
+    assert after_write.headers["X-Cache"] == "MISS"
+    assert after_write.json()["name"] == "Renamed Project"
+
+def test_missing_contact_is_not_cached(test_client: TestClient, auth_headers: dict):
+    response = test_client.get("/outstanding/contact/999999999", headers=auth_headers)
+    assert response.status_code == 404
+
+@patch("zoltar_backend.report_cache.get_redis", return_value=None)
+def test_task_reads_not_cached_without_redis(mock_get_redis, test_client: TestClient, auth_headers: dict):
+    # The per-process fallback can't see writes handled by other workers, so task reads bypass it
+    response = test_client.post("/tasks/", json={"title": "Report Cache Task"}, headers=auth_headers)
+    assert response.status_code == 201
+    task_id = response.json()["id"]
+
+    for path in ("/tasks/", "/tasks/available", f"/tasks/{task_id}"):
+        assert test_client.get(path, headers=auth_headers).headers["X-Cache"] == "MISS"
+        assert test_client.get(path, headers=auth_headers).headers["X-Cache"] == "MISS"
+
+    update_response = test_client.put(f"/tasks/{task_id}", json={"status": "completed"}, headers=auth_headers)
+    assert update_response.status_code == 200
+
+    after_write = test_client.get("/tasks/available", headers=auth_headers)
+    assert task_id not in [task["id"] for task in after_write.json()]
+    assert test_client.get(f"/tasks/{task_id}", headers=auth_headers).json()["status"] == "completed"
@@ -1,6 +1,6 @@
 import pytest
 from datetime import datetime
-from zoltar_backend.schemas import ReminderCreate, ReminderType
+from zoltar_backend.schemas import ReminderCreate, ReminderUpdate, ReminderType
 
 
 def test_one_time_clears_recurrence_rule():
@@ -58,4 +58,10 @@ def test_invalid_reminder_type_raises():
         "reminder_type": "INVALID_TYPE"
     }
     with pytest.raises(ValueError):
-        ReminderCreate(**payload) 
\ No newline at end of file
+        ReminderCreate(**payload) 
+
+def test_reminder_update_type_mixed_case():
+    """Ensure that ReminderUpdate accepts mixed-case enum names and rejects unknown ones."""
+    assert ReminderUpdate(reminder_type="Recurring_Scheduled").reminder_type == ReminderType.RECURRING_SCHEDULED
+    with pytest.raises(ValueError):
+        ReminderUpdate(reminder_type="INVALID_TYPE")
@@ -0,0 +1,34 @@
+import pytest
+from fastapi.testclient import TestClient
+
+from zoltar_backend import crud # Import crud directly to patch its settings
+
+# With STRICT_RELATIONSHIP_LOADING on, the list queries behind these endpoints raise on any
+# relationship they don't eager-load, so an N+1 introduced by a schema change fails here.
+
+@pytest.fixture
+def strict_loading(monkeypatch):
+    monkeypatch.setattr(crud.settings, "STRICT_RELATIONSHIP_LOADING", True)
+
+@pytest.fixture
+def contact_id(test_client: TestClient, auth_headers: dict) -> int:
+    """Creates a contact with a linked note, plus a list with an item, so the endpoints return rows."""
+    response = test_client.post("/contacts/", json={"name": "Strict Loading Contact"}, headers=auth_headers)
+    assert response.status_code == 201
+    contact_id = response.json()["id"]
+    assert test_client.post("/notes/", json={"content": "note", "contact_id": contact_id}, headers=auth_headers).status_code == 201
+    list_response = test_client.post("/lists/", json={"name": "Strict Loading List"}, headers=auth_headers)
+    assert list_response.status_code == 200
+    item_response = test_client.post(f"/lists/{list_response.json()['id']}/items/", json={"text": "item"}, headers=auth_headers)
+    assert item_response.status_code == 200
+    return contact_id
+
+@pytest.mark.parametrize("path", ["/lists/", "/notes/", "/projects/", "/reminders/", "/tasks/", "/tasks/available"])
+def test_list_endpoints_do_not_lazy_load(path, strict_loading, contact_id, test_client: TestClient, auth_headers: dict):
+    response = test_client.get(path, headers=auth_headers)
+    assert response.status_code == 200
+
+def test_outstanding_items_do_not_lazy_load(strict_loading, contact_id, test_client: TestClient, auth_headers: dict):
+    response = test_client.get(f"/outstanding/contact/{contact_id}", headers=auth_headers)
+    assert response.status_code == 200
+    assert len(response.json()["notes"]) == 1
@@ -0,0 +1,124 @@
+from fastapi.testclient import TestClient
+from unittest.mock import patch, ANY
+from datetime import datetime, timezone
+
+from zoltar_backend.main import app # Import your FastAPI app instance
+from zoltar_backend import schemas, models, auth, crud_errors # Import relevant components
+
+# Create a TestClient instance
+client = TestClient(app)
+
+# --- Test Data & Mocks ---
+
+MOCK_USER = models.User(
+    id=1,
+    email="taskstester@example.com",
+    ms_oid=None,
+    is_active=True,
+    created_at=datetime.now(timezone.utc)
+)
+
+MOCK_TASK_ID = 301
+
+# --- CRUD error mapping ---
+
+@patch("zoltar_backend.crud.update_task")
+def test_update_task_invalid_project(mock_update_task):
+    """Tests that InvalidProject raised by CRUD is returned as a 400 with its detail."""
+    app.dependency_overrides[auth.get_current_active_user] = lambda: MOCK_USER
+    mock_update_task.side_effect = crud_errors.InvalidProject()
+    response = client.put(f"/tasks/{MOCK_TASK_ID}", json={"project_id": 999})
+    assert response.status_code == 400
+    assert response.json() == {"detail": "Project not found or not owned by user"}
+    app.dependency_overrides = {}
+
+@patch("zoltar_backend.crud.add_task_dependency")
+def test_add_task_dependency_errors(mock_add_dependency):
+    """Tests that SelfDependency and NotFound map to 400 and 404."""
+    app.dependency_overrides[auth.get_current_active_user] = lambda: MOCK_USER
+    mock_add_dependency.side_effect = crud_errors.SelfDependency("Task cannot depend on itself")
+    response = client.post(f"/tasks/{MOCK_TASK_ID}/depends_on/{MOCK_TASK_ID}")
+    assert response.status_code == 400
+    assert response.json() == {"detail": "Task cannot depend on itself"}
+
+    mock_add_dependency.side_effect = crud_errors.NotFound("One or both tasks not found or not owned by user")
+    response = client.post(f"/tasks/{MOCK_TASK_ID}/depends_on/{MOCK_TASK_ID + 1}")
+    assert response.status_code == 404
+    app.dependency_overrides = {}
+
+@patch("zoltar_backend.crud.add_task_dependency")
+def test_add_task_dependency_success(mock_add_dependency):
+    """Tests that an added (or already existing) dependency returns 204."""
+    app.dependency_overrides[auth.get_current_active_user] = lambda: MOCK_USER
+    mock_add_dependency.return_value = None
+    response = client.post(f"/tasks/{MOCK_TASK_ID}/depends_on/{MOCK_TASK_ID + 1}")
+    assert response.status_code == 204
+    mock_add_dependency.assert_called_once_with(ANY, MOCK_TASK_ID, MOCK_TASK_ID + 1, MOCK_USER.id)
+    app.dependency_overrides = {}
+
+@patch("zoltar_backend.crud.get_user_tasks")
+def test_read_tasks_passes_keyset_cursor(mock_get_user_tasks):
+    """Tests that after_id and limit reach the CRUD query."""
+    app.dependency_overrides[auth.get_current_active_user] = lambda: MOCK_USER
+    mock_get_user_tasks.return_value = []
+    response = client.get(f"/tasks/?after_id={MOCK_TASK_ID}&limit=25")
+    assert response.status_code == 200
+    assert response.json() == []
+    mock_get_user_tasks.assert_called_once_with(ANY, user_id=MOCK_USER.id, after_id=MOCK_TASK_ID, skip=0, limit=25)
+    app.dependency_overrides = {}
+
+@patch("zoltar_backend.crud.update_task")
+def test_update_task_returns_crud_response(mock_update_task):
+    """Tests that the TaskUpdateResponse built by CRUD is returned as-is."""
+    app.dependency_overrides[auth.get_current_active_user] = lambda: MOCK_USER
+    now = datetime.now(timezone.utc)
+    updated_task = schemas.Task(id=MOCK_TASK_ID, owner_id=MOCK_USER.id, title="Done", status="completed", created_at=now, completed_at=now)
+    mock_update_task.return_value = schemas.TaskUpdateResponse(
+        updated_task=updated_task,
+        unblocked_tasks=[schemas.TaskBasicInfo(id=MOCK_TASK_ID + 1, title="Next")]
+    )
+    response = client.put(f"/tasks/{MOCK_TASK_ID}", json={"status": "completed"})
+    assert response.status_code == 200
+    assert response.json()["updated_task"]["status"] == "completed"
+    assert response.json()["unblocked_tasks"] == [{"id": MOCK_TASK_ID + 1, "title": "Next"}]
+    app.dependency_overrides = {}
+
+@patch("zoltar_backend.reminder_schedule.invalidate_next_due")
+@patch("zoltar_backend.crud.update_task")
+def test_update_task_reschedules_activated_reminders(mock_update_task, mock_invalidate):
+    """Tests that completing a task with relative reminders reschedules the reminder scan."""
+    app.dependency_overrides[auth.get_current_active_user] = lambda: MOCK_USER
+    now = datetime.now(timezone.utc)
+    updated_task = schemas.Task(id=MOCK_TASK_ID, owner_id=MOCK_USER.id, title="Done", status="completed", created_at=now, completed_at=now)
+    mock_update_task.return_value = schemas.TaskUpdateResponse(updated_task=updated_task, relative_reminders_activated=True)
+
+    response = client.put(f"/tasks/{MOCK_TASK_ID}", json={"status": "completed"})
+    assert response.status_code == 200
+    assert "relative_reminders_activated" not in response.json()
+    mock_invalidate.assert_called_once_with()
+
+    mock_update_task.return_value = schemas.TaskUpdateResponse(updated_task=updated_task)
+    mock_invalidate.reset_mock()
+    assert client.put(f"/tasks/{MOCK_TASK_ID}", json={"status": "completed"}).status_code == 200
+    mock_invalidate.assert_not_called()
+    app.dependency_overrides = {}
+
+@patch("zoltar_backend.crud.get_task")
+def test_read_task_etag_not_modified(mock_get_task):
+    """Tests that read_task sends an ETag and answers a matching If-None-Match with 304."""
+    app.dependency_overrides[auth.get_current_active_user] = lambda: MOCK_USER
+    mock_get_task.return_value = models.Task(
+        id=MOCK_TASK_ID + 50, owner_id=MOCK_USER.id, title="Cached", status=models.TaskStatus.PENDING,
+        created_at=datetime.now(timezone.utc)
+    )
+    first = client.get(f"/tasks/{MOCK_TASK_ID + 50}")
+    assert first.status_code == 200
+    etag = first.headers["ETag"]
+
+    second = client.get(f"/tasks/{MOCK_TASK_ID + 50}", headers={"If-None-Match": etag})
+    assert second.status_code == 304
+    assert second.content == b""
+
+    third = client.get(f"/tasks/{MOCK_TASK_ID + 50}", headers={"If-None-Match": 'W/"stale"'})
+    assert third.status_code == 200
+    app.dependency_overrides = {}
@@ -0,0 +1,63 @@
+import os
+from functools import lru_cache
+from typing import Optional
+
+from dotenv import load_dotenv
+from pydantic import BaseModel
+
+# Load environment variables from .env file (optional, good for local dev).
+# This is the only place the .env file is read; modules import `settings` from here instead.
+load_dotenv()
+
+class Settings(BaseModel):
+    """Application configuration, read from the environment once at import."""
+    # Database
+    DATABASE_URL: str = "sqlite:///./zoltar.db"
+    # Connection pool (PostgreSQL); each request and Graph round trip can hold a connection
+    DB_POOL_SIZE: int = 20
+    DB_MAX_OVERFLOW: int = 20
+    DB_POOL_RECYCLE_SECONDS: int = 3600 # Replace connections before idle server/proxy timeouts drop them
+    DB_POOL_TIMEOUT_SECONDS: int = 30 # Fail a request waiting this long for a free connection instead of hanging
+    # Pools are per worker process; with several workers, point DATABASE_URL at PgBouncer
+    # (transaction pooling, port 6432) rather than raising Postgres max_connections
+    # Compiled-SQL cache entries per engine (SQLAlchemy default 500); statements are cached by
+    # structure, so this only needs to cover the app's distinct query shapes
+    DB_QUERY_CACHE_SIZE: int = 1024
+    # Dev/CI: list queries raise on unplanned lazy relationship loads instead of issuing N+1 SELECTs
+    STRICT_RELATIONSHIP_LOADING: bool = False
+
+    # Redis (optional; shared caches fall back to the database when unset)
+    REDIS_URL: Optional[str] = None
+
+    # Zoltar JWT auth
+    SECRET_KEY_PATH: str = "/secrets/jwt/key"
+    ALGORITHM: str = "HS256"
+    ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
+
+    # Google Gemini
+    GOOGLE_API_KEY_PATH: str = "/secrets/google/key"
+
+    # Microsoft OAuth / Graph
+    MS_CLIENT_ID: str = "YOUR_MS_CLIENT_ID_HERE"
+    MS_CLIENT_SECRET: str = "YOUR_MS_CLIENT_SECRET_HERE"
+    MS_CLIENT_SECRET_PATH: str = "/secrets/ms/client_secret"
+    MS_TENANT_ID: str = "common"
+    MS_REDIRECT_URI: str = "http://localhost:8000/auth/microsoft/callback"
+
+    # Apple Push Notification service
+    APNS_TEAM_ID: Optional[str] = None
+    APNS_AUTH_KEY_PATH: Optional[str] = None # Path to the .p8 file
+    APNS_KEY_ID: Optional[str] = None
+    APNS_TOPIC: Optional[str] = None # Your app's bundle ID
+    APNS_USE_SANDBOX: str = "True" # Default to Sandbox
+
+    @classmethod
+    def from_env(cls) -> "Settings":
+        values = {name: os.environ[name] for name in cls.model_fields if name in os.environ}
+        return cls(**values)
+
+@lru_cache(maxsize=1)
+def get_settings() -> Settings:
+    return Settings.from_env()
+
+settings = get_settings()
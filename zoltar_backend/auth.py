@@ -1,11 +1,10 @@
-import os
+import asyncio
 from datetime import datetime, timedelta, timezone
 from typing import Optional
 
 from jose import JWTError, jwt
 from passlib.context import CryptContext
 from pydantic import BaseModel
-from dotenv import load_dotenv
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from sqlalchemy.orm import Session
@@ -15,11 +14,10 @@ import crud
 import models 
 import schemas 
 from database import get_db
-
-load_dotenv()
+from app_settings import settings
 
 # Read secret key from file path specified in env var
-SECRET_KEY_PATH = os.getenv("SECRET_KEY_PATH", "/secrets/jwt/key") # Default path if not set
+SECRET_KEY_PATH = settings.SECRET_KEY_PATH
 SECRET_KEY = None
 try:
     with open(SECRET_KEY_PATH, 'r') as f:
@@ -44,8 +42,8 @@ if SECRET_KEY is None:
     print(error_msg)
     raise RuntimeError(error_msg)
 
-ALGORITHM = os.getenv("ALGORITHM", "HS256")
-ACCESS_TOKEN_EXPIRE_MINUTES = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", 30))
+ALGORITHM = settings.ALGORITHM
+ACCESS_TOKEN_EXPIRE_MINUTES = settings.ACCESS_TOKEN_EXPIRE_MINUTES
 
 # Password Hashing
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
@@ -85,7 +83,8 @@ async def get_current_user(token: str = Depends(oauth2_scheme), db: Session = De
         # token_data = schemas.TokenData(email=email) # This line is optional if only sub is needed
     except JWTError:
         raise credentials_exception
-    user = crud.get_user_by_email(db, email=email)
+    # Blocking DB lookup; run it off the event loop
+    user = await asyncio.to_thread(crud.get_user_by_email, db, email=email)
     if user is None:
         raise credentials_exception
     return user
@@ -1,13 +1,20 @@
+import asyncio
 import msal
-import os
 import logging
 import json # Needed for cache serialization
-from typing import Optional, Union, Dict, List, Any
+import orjson
+import threading
+import time
+from typing import Optional, Union, Dict, List, Any, Tuple
 from sqlalchemy.orm import Session # Need Session for DB access
 import models # Changed from . import models
 import requests # Add requests import if not already present
+import requests_cache
+import httpx
 from datetime import datetime, timezone # Make sure datetime and timezone are imported
 import schemas # Changed from . import schemas
+from app_settings import settings
+from redis_client import get_redis
 
 logger = logging.getLogger(__name__)
 
@@ -15,10 +22,10 @@ logger = logging.getLogger(__name__)
 # Load configuration from environment variables (replace placeholders with your actual values)
 # Ensure these are set in your environment before running the app.
 # DO NOT commit the client secret directly into the code.
-MS_CLIENT_ID = os.environ.get("MS_CLIENT_ID", "YOUR_MS_CLIENT_ID_HERE")
+MS_CLIENT_ID = settings.MS_CLIENT_ID
 
 # Read MS Client Secret from file path
-MS_CLIENT_SECRET_PATH = os.environ.get("MS_CLIENT_SECRET_PATH", "/secrets/ms/client_secret")
+MS_CLIENT_SECRET_PATH = settings.MS_CLIENT_SECRET_PATH
 MS_CLIENT_SECRET = None
 try:
     with open(MS_CLIENT_SECRET_PATH, 'r') as f:
@@ -32,28 +39,124 @@ except Exception as e:
 
 # Use 'common' for multi-tenant + personal accounts, 'organizations' for multi-tenant work/school only,
 # or a specific tenant ID (UUID) for single-tenant.
-MS_TENANT_ID = os.environ.get("MS_TENANT_ID", "common") 
+MS_TENANT_ID = settings.MS_TENANT_ID
 MS_AUTHORITY = f"https://login.microsoftonline.com/{MS_TENANT_ID}"
 # Ensure this matches EXACTLY what you registered in Azure AD
-MS_REDIRECT_URI = os.environ.get("MS_REDIRECT_URI", "http://localhost:8000/auth/microsoft/callback") 
+MS_REDIRECT_URI = settings.MS_REDIRECT_URI
 # Scopes required for accessing calendar data and maintaining login
 # MSAL handles offline_access implicitly for confidential clients
 MS_SCOPES = ["User.Read", "Calendars.ReadWrite"] # Removed offline_access
 
+# --- MSAL HTTP Client ---
+# MSAL fetches authority metadata (instance discovery, OpenID configuration) with plain GETs;
+# cache only those for a day. Token requests are POSTs and all other URLs are never cached.
+msal_http_client = requests_cache.CachedSession(
+    "msal_metadata",
+    backend="memory",
+    expire_after=requests_cache.DO_NOT_CACHE,
+    urls_expire_after={
+        "login.microsoftonline.com/common/discovery/*": 86400,
+        "login.microsoftonline.com/*/.well-known/*": 86400,
+    },
+    allowable_methods=("GET",),
+)
+
 # --- MSAL Client Initialization ---
-# Use a SerializableTokenCache instance for easier loading/saving
-token_cache = msal.SerializableTokenCache()
-msal_client = None
-if MS_CLIENT_ID and MS_CLIENT_SECRET and MS_AUTHORITY:
-    msal_client = msal.ConfidentialClientApplication(
+def _build_msal_client(cache: msal.SerializableTokenCache) -> msal.ConfidentialClientApplication:
+    # All clients share msal_http_client, so the authority metadata is fetched once per day
+    return msal.ConfidentialClientApplication(
         MS_CLIENT_ID,
         authority=MS_AUTHORITY,
         client_credential=MS_CLIENT_SECRET,
-        token_cache=token_cache 
+        token_cache=cache,
+        http_client=msal_http_client
     )
+
+# Use a SerializableTokenCache instance for easier loading/saving. This shared client serves the
+# login flow only; get_cached_ms_token runs in worker threads and builds a client per call.
+token_cache = msal.SerializableTokenCache()
+msal_client = None
+if MS_CLIENT_ID and MS_CLIENT_SECRET and MS_AUTHORITY:
+    msal_client = _build_msal_client(token_cache)
 else:
     logger.error("MSAL client could not be initialized. Missing MS_CLIENT_ID, MS_CLIENT_SECRET, or MS_AUTHORITY.")
 
+# --- Token Cache Storage ---
+# With Redis configured, each user's serialized MSAL cache lives under msal:token:{ms_oid}, so
+# silent token lookups and refreshes don't touch the database. Without Redis (or if it fails)
+# the users.ms_token_cache column is used, and it is also read once to migrate existing caches.
+MS_TOKEN_CACHE_TTL_SECONDS = 14 * 24 * 3600 # Refresh token lifetime
+
+def _token_cache_key(ms_oid: str) -> str:
+    return f"msal:token:{ms_oid}"
+
+def load_token_cache_from_redis(ms_oid: str) -> Optional[str]:
+    """Returns the user's serialized token cache from Redis, or None if unavailable."""
+    redis_conn = get_redis()
+    if redis_conn is None:
+        return None
+    try:
+        return redis_conn.get(_token_cache_key(ms_oid))
+    except Exception as e:
+        logger.warning(f"Failed to read MS token cache from Redis for OID {ms_oid}: {e}")
+        return None
+
+def save_token_cache_to_redis(ms_oid: str, cache_state: str) -> bool:
+    """Stores the user's serialized token cache in Redis. Returns False if Redis is not in use."""
+    redis_conn = get_redis()
+    if redis_conn is None:
+        return False
+    try:
+        redis_conn.setex(_token_cache_key(ms_oid), MS_TOKEN_CACHE_TTL_SECONDS, cache_state)
+        return True
+    except Exception as e:
+        logger.warning(f"Failed to write MS token cache to Redis for OID {ms_oid}: {e}")
+        return False
+
+# OAuth login state (CSRF protection) is kept in Redis under oauth:ms:state:{state} until the
+# callback consumes it, so any worker can validate it. Without Redis it is kept in a per-process
+# store instead, so the callback must reach the worker that served /login; a state that can't be
+# found is rejected either way.
+MS_OAUTH_STATE_TTL_SECONDS = 600
+
+_local_oauth_states: Dict[str, float] = {} # state -> time.monotonic() expiry
+_local_oauth_states_lock = threading.Lock()
+
+def _oauth_state_key(state: str) -> str:
+    return f"oauth:ms:state:{state}"
+
+def save_oauth_state(state: str) -> None:
+    """Records a login state value for the callback."""
+    redis_conn = get_redis()
+    if redis_conn is None:
+        now = time.monotonic()
+        with _local_oauth_states_lock:
+            # Drop abandoned logins so the store stays bounded
+            for expired in [s for s, expires_at in _local_oauth_states.items() if expires_at <= now]:
+                del _local_oauth_states[expired]
+            _local_oauth_states[state] = now + MS_OAUTH_STATE_TTL_SECONDS
+        return
+    try:
+        redis_conn.setex(_oauth_state_key(state), MS_OAUTH_STATE_TTL_SECONDS, "1")
+    except Exception as e:
+        logger.warning(f"Failed to store MS OAuth state in Redis: {e}")
+
+def consume_oauth_state(state: Optional[str]) -> bool:
+    """Atomically removes a login state value. Returns whether it was valid (issued and not yet
+    used or expired); False whenever it cannot be verified."""
+    if not state:
+        return False
+    redis_conn = get_redis()
+    if redis_conn is None:
+        with _local_oauth_states_lock:
+            expires_at = _local_oauth_states.pop(state, None)
+        return expires_at is not None and expires_at > time.monotonic()
+    try:
+        return redis_conn.getdel(_oauth_state_key(state)) is not None
+    except Exception as e:
+        logger.warning(f"Failed to read MS OAuth state from Redis: {e}")
+        return False
+
 # --- Placeholder for Token Storage ---
 # WARNING: This is NOT production-ready. 
 # For development only, stores tokens in memory.
@@ -79,12 +182,14 @@ def acquire_ms_token_from_code(auth_code: str, scopes: List[str] = MS_SCOPES) ->
        Updates the shared MSAL token cache instance upon success.
     """
     logger.debug(f"Attempting to acquire token with auth code: {auth_code[:10]}...")
+    started = time.perf_counter()
     # The result will update the token_cache instance passed to ConfidentialClientApplication
     result = msal_client.acquire_token_by_authorization_code(
         code=auth_code,
         scopes=scopes,
         redirect_uri=MS_REDIRECT_URI # Must match the redirect URI used in the auth request
     )
+    logger.debug("Token acquisition from auth code took %.1f ms", (time.perf_counter() - started) * 1000)
     
     if "error" in result:
         logger.error(f"Error acquiring token: {result.get('error_description', result)}")
@@ -106,18 +211,32 @@ def acquire_ms_token_from_code(auth_code: str, scopes: List[str] = MS_SCOPES) ->
 def get_cached_ms_token(db: Session, ms_oid: str, scopes: List[str] = MS_SCOPES) -> Optional[Dict]:
     """Retrieves cached tokens for a user by ms_oid, attempting refresh if necessary."""
     logger.debug(f"Attempting to get cached token for MS OID: {ms_oid} with scopes: {scopes}")
-    user = db.query(models.User).filter(models.User.ms_oid == ms_oid).first()
+    user = None
+    cache_state = load_token_cache_from_redis(ms_oid)
+    # Copy a cache found only in the DB into Redis (once) when Redis is in use
+    migrate_to_redis = False
 
-    if not user:
-        logger.warning(f"No user found with MS OID: {ms_oid}")
-        return None
-    if not user.ms_token_cache:
-        logger.warning(f"User {user.email} (OID: {ms_oid}) has no stored MS token cache.")
+    if cache_state is None:
+        user = db.query(models.User).filter(models.User.ms_oid == ms_oid).first()
+
+        if not user:
+            logger.warning(f"No user found with MS OID: {ms_oid}")
+            return None
+        if not user.ms_token_cache:
+            logger.warning(f"User {user.email} (OID: {ms_oid}) has no stored MS token cache.")
+            return None
+        cache_state = user.ms_token_cache
+        migrate_to_redis = get_redis() is not None
+
+    if msal_client is None:
+        logger.error(f"MSAL client is not configured; cannot acquire token for user OID: {ms_oid}")
         return None
 
-    # Load the cache from the database into our shared cache instance
+    # Load the stored cache into a cache and client of our own; this runs concurrently in worker
+    # threads, so a shared instance could hand one user's tokens to another
+    user_cache = msal.SerializableTokenCache()
     try:
-        token_cache.deserialize(user.ms_token_cache)
+        user_cache.deserialize(cache_state)
     except json.JSONDecodeError:
         logger.error(f"Failed to deserialize token cache for user OID: {ms_oid}. Cache may be corrupt.")
         # Optionally clear the corrupt cache
@@ -125,8 +244,10 @@ def get_cached_ms_token(db: Session, ms_oid: str, scopes: List[str] = MS_SCOPES)
         # db.commit()
         return None
 
+    user_client = _build_msal_client(user_cache)
+
     # Find the specific account associated with this OID in the cache
-    accounts = msal_client.get_accounts()
+    accounts = user_client.get_accounts()
     target_account = None
     for acc in accounts:
         # OID is usually the first part of home_account_id (e.g., OID.TenantID)
@@ -144,21 +265,30 @@ def get_cached_ms_token(db: Session, ms_oid: str, scopes: List[str] = MS_SCOPES)
     logger.debug(f"Found account in cache: {target_account.get('username')}")
 
     # Attempt to acquire token silently (checks cache, refreshes if needed)
-    result = msal_client.acquire_token_silent(scopes, account=target_account)
+    result = user_client.acquire_token_silent(scopes, account=target_account)
 
     # Check if the cache was modified (e.g., by a token refresh)
-    if token_cache.has_state_changed:
-        logger.info(f"MSAL token cache state changed for user OID: {ms_oid}, updating DB.")
-        user.ms_token_cache = token_cache.serialize()
-        try:
-            db.commit()
-            logger.debug("Token cache updated in DB.")
-        except Exception as e:
-            logger.error(f"Failed to update token cache in DB for user OID: {ms_oid} - {e}", exc_info=True)
-            db.rollback()
-            # Return None or raise? If DB fails, token might be valid but won't be saved.
-            # Let's return None for now to indicate failure.
-            return None
+    if user_cache.has_state_changed or migrate_to_redis:
+        cache_state = user_cache.serialize()
+        if save_token_cache_to_redis(ms_oid, cache_state):
+            logger.info(f"MSAL token cache state changed for user OID: {ms_oid}, updated Redis.")
+        else:
+            logger.info(f"MSAL token cache state changed for user OID: {ms_oid}, updating DB.")
+            if user is None:
+                user = db.query(models.User).filter(models.User.ms_oid == ms_oid).first()
+            if user is None:
+                logger.warning(f"No user found with MS OID: {ms_oid}; token cache not saved.")
+                return None
+            user.ms_token_cache = cache_state
+            try:
+                db.commit()
+                logger.debug("Token cache updated in DB.")
+            except Exception as e:
+                logger.error(f"Failed to update token cache in DB for user OID: {ms_oid} - {e}", exc_info=True)
+                db.rollback()
+                # Return None or raise? If DB fails, token might be valid but won't be saved.
+                # Let's return None for now to indicate failure.
+                return None
             
     if not result:
         logger.warning(f"Could not acquire token silently for user OID: {ms_oid}. Re-authentication might be required.")
@@ -175,6 +305,24 @@ def get_cached_ms_token(db: Session, ms_oid: str, scopes: List[str] = MS_SCOPES)
 # --- Graph API Client Helper ---
 GRAPH_API_ENDPOINT = "https://graph.microsoft.com/v1.0"
 
+# Shared async client for Graph with a keep-alive connection pool; closed on application shutdown
+# (see main.py). HTTP/1.1 only: httpx's HTTP/2 support needs h2>=3, which conflicts with the
+# h2 2.x pinned by apns2's hyper dependency.
+GRAPH_CLIENT = httpx.AsyncClient(
+    base_url=GRAPH_API_ENDPOINT,
+    timeout=10,
+    limits=httpx.Limits(max_connections=100, max_keepalive_connections=50),
+)
+
+def _graph_headers(access_token: str, headers_extra: Optional[Dict] = None) -> Dict[str, str]:
+    headers = {
+        "Authorization": f"Bearer {access_token}",
+        "Content-Type": "application/json" # Default content type
+    }
+    if headers_extra:
+        headers.update(headers_extra) # Merge extra headers
+    return headers
+
 def call_microsoft_graph_api(
     db: Session, 
     ms_oid: str, 
@@ -192,20 +340,15 @@ def call_microsoft_graph_api(
         logger.error(f"Could not obtain Graph API token for user OID {ms_oid} and scopes {scopes}")
         return None
         
-    access_token = token_result["access_token"]
-    headers = {
-        "Authorization": f"Bearer {access_token}",
-        "Content-Type": "application/json" # Default content type
-    }
-    if headers_extra:
-        headers.update(headers_extra) # Merge extra headers
+    headers = _graph_headers(token_result["access_token"], headers_extra)
     
     url = f"{GRAPH_API_ENDPOINT}{endpoint}"
     logger.debug(f"Calling Graph API: {method} {url} with params {params}")
     
     try:
-        # Pass params to requests.request
-        response = requests.request(method, url, headers=headers, json=json_data, params=params)
+        # Pass params to requests.request; the JSON body is pre-encoded with orjson
+        body = orjson.dumps(json_data) if json_data is not None else None
+        response = requests.request(method, url, headers=headers, data=body, params=params)
         response.raise_for_status() # Raises HTTPError for bad responses (4xx or 5xx)
         
         # Handle cases with no content response (e.g., 204 No Content for DELETE)
@@ -214,7 +357,7 @@ def call_microsoft_graph_api(
             return {"status": "success", "status_code": 204}
             
         logger.info(f"Graph API call successful ({method} {url}), status code {response.status_code}.")
-        return response.json()
+        return orjson.loads(response.content)
         
     except requests.exceptions.RequestException as e:
         logger.error(f"Error calling Graph API endpoint {endpoint}: {e}", exc_info=True)
@@ -227,25 +370,92 @@ def call_microsoft_graph_api(
                 logger.error(f"Graph API Response Body: {e.response.text}")
         return None
 
-def get_outlook_calendar_events(
+async def call_microsoft_graph_api_async(
+    db: Session, 
+    ms_oid: str, 
+    scopes: List[str], 
+    method: str, 
+    endpoint: str, 
+    json_data: Optional[Dict] = None,
+    params: Optional[Dict] = None,
+    headers_extra: Optional[Dict] = None
+) -> Optional[Dict]:
+    """Async version of call_microsoft_graph_api using the shared GRAPH_CLIENT."""
+    # Token lookup is blocking (MSAL refresh, DB/Redis); keep it off the event loop
+    token_result = await asyncio.to_thread(get_cached_ms_token, db=db, ms_oid=ms_oid, scopes=scopes)
+    
+    if not token_result or not token_result.get("access_token"):
+        logger.error(f"Could not obtain Graph API token for user OID {ms_oid} and scopes {scopes}")
+        return None
+        
+    headers = _graph_headers(token_result["access_token"], headers_extra)
+    return await _send_graph_request_async(method, endpoint, headers, json_data=json_data, params=params)
+
+async def _send_graph_request_async(
+    method: str,
+    endpoint: str,
+    headers: Dict[str, str],
+    json_data: Optional[Dict] = None,
+    params: Optional[Dict] = None
+) -> Optional[Dict]:
+    logger.debug(f"Calling Graph API: {method} {endpoint} with params {params}")
+    
+    try:
+        # The JSON body is pre-encoded with orjson (headers already carry the JSON content type)
+        body = orjson.dumps(json_data) if json_data is not None else None
+        response = await GRAPH_CLIENT.request(method, endpoint, headers=headers, content=body, params=params)
+        response.raise_for_status()
+        
+        if response.status_code == 204:
+            logger.info(f"Graph API call successful ({method} {endpoint}), status code 204 (No Content).")
+            return {"status": "success", "status_code": 204}
+            
+        logger.info(f"Graph API call successful ({method} {endpoint}), status code {response.status_code}.")
+        return orjson.loads(response.content)
+        
+    except httpx.HTTPStatusError as e:
+        logger.error(f"Error calling Graph API endpoint {endpoint}: {e}", exc_info=True)
+        logger.error(f"Graph API Response Status: {e.response.status_code}")
+        try:
+            logger.error(f"Graph API Response Body: {e.response.json()}")
+        except json.JSONDecodeError:
+            logger.error(f"Graph API Response Body: {e.response.text}")
+        return None
+    except httpx.HTTPError as e:
+        logger.error(f"Error calling Graph API endpoint {endpoint}: {e}", exc_info=True)
+        return None
+
+GRAPH_BATCH_MAX_REQUESTS = 20 # Graph JSON batching limit per $batch call
+
+async def call_microsoft_graph_batch_async(
     db: Session,
     ms_oid: str,
-    start_time: datetime,
-    end_time: datetime
+    scopes: List[str],
+    requests: List[Dict]
 ) -> Optional[List[Dict]]:
-    """Fetches calendar events from Microsoft Graph /me/calendarview.
-
-    Args:
-        db: SQLAlchemy Session.
-        ms_oid: The Microsoft Object ID of the user.
-        start_time: The start of the time window (timezone-aware recommended).
-        end_time: The end of the time window (timezone-aware recommended).
+    """Sends Graph JSON-batch sub-requests ({"id", "method", "url", ...}) via POST /$batch,
+    20 per call with the calls made concurrently. Returns the sub-responses, or None if any
+    batch call failed."""
+    token_result = await asyncio.to_thread(get_cached_ms_token, db=db, ms_oid=ms_oid, scopes=scopes)
+    
+    if not token_result or not token_result.get("access_token"):
+        logger.error(f"Could not obtain Graph API token for user OID {ms_oid} and scopes {scopes}")
+        return None
+        
+    headers = _graph_headers(token_result["access_token"])
+    batch_results = await asyncio.gather(*(
+        _send_graph_request_async("POST", "/$batch", headers, json_data={"requests": requests[i:i + GRAPH_BATCH_MAX_REQUESTS]})
+        for i in range(0, len(requests), GRAPH_BATCH_MAX_REQUESTS)
+    ))
+    if any(result is None for result in batch_results):
+        return None
+    return [response for result in batch_results for response in result.get("responses", [])]
 
-    Returns:
-        A list of event dictionaries from the Graph API response, or None on failure.
-    """
-    logger.info(f"Fetching Outlook calendar events for user OID {ms_oid} from {start_time} to {end_time}")
+CALENDAR_VIEW_PAGE_SIZE = 50
+CALENDAR_VIEW_MAX_PAGES = 20 # Upper bound on pages fetched for one agenda request
 
+def _calendar_view_request(start_time: datetime, end_time: datetime) -> Tuple[Dict, Dict]:
+    """Builds the query params and headers for GET /me/calendarview."""
     # Ensure datetimes are timezone-aware and in UTC ISO format for Graph API
     if start_time.tzinfo is None:
         logger.warning("Start time is timezone-naive. Assuming UTC.")
@@ -267,35 +477,117 @@ def get_outlook_calendar_events(
         "startDateTime": start_str,
         "endDateTime": end_str,
         "$select": "id,subject,bodyPreview,start,end", # Select only necessary fields
-        "$orderby": "start/dateTime asc" # Order by start time
+        "$orderby": "start/dateTime asc", # Order by start time
+        "$top": CALENDAR_VIEW_PAGE_SIZE, # Graph's calendarView default page is only 10 events
+        "$count": "true" # Total event count (@odata.count), used to request the remaining pages at once
     }
 
     # Define headers to request UTC timezone for response times
     headers = {
         "Prefer": 'outlook.timezone="UTC"'
     }
-    
-    # Define required scopes for reading calendar view
-    scopes = ["Calendars.Read"]
+    return params, headers
+
+def _calendar_events_from_response(graph_response: Optional[Dict], ms_oid: str) -> Optional[List[Dict]]:
+    if graph_response and "value" in graph_response:
+        logger.info(f"Successfully retrieved {len(graph_response['value'])} events from Graph API.")
+        return graph_response["value"] # Return the list of events
+    else:
+        logger.error(f"Failed to retrieve calendar events for user OID {ms_oid}. Response: {graph_response}")
+        return None
+
+def get_outlook_calendar_events(
+    db: Session,
+    ms_oid: str,
+    start_time: datetime,
+    end_time: datetime
+) -> Optional[List[Dict]]:
+    """Fetches calendar events from Microsoft Graph /me/calendarview.
+
+    Args:
+        db: SQLAlchemy Session.
+        ms_oid: The Microsoft Object ID of the user.
+        start_time: The start of the time window (timezone-aware recommended).
+        end_time: The end of the time window (timezone-aware recommended).
+
+    Returns:
+        A list of event dictionaries from the Graph API response, or None on failure.
+    """
+    logger.info(f"Fetching Outlook calendar events for user OID {ms_oid} from {start_time} to {end_time}")
+    params, headers = _calendar_view_request(start_time, end_time)
 
     # Call the generic Graph API helper
     graph_response = call_microsoft_graph_api(
         db=db,
         ms_oid=ms_oid,
-        scopes=scopes,
+        scopes=["Calendars.Read"], # Required scope for reading calendar view
         method="GET",
         endpoint="/me/calendarview",
         params=params,
         headers_extra=headers
     )
+    return _calendar_events_from_response(graph_response, ms_oid)
 
-    if graph_response and "value" in graph_response:
-        logger.info(f"Successfully retrieved {len(graph_response['value'])} events from Graph API.")
-        return graph_response["value"] # Return the list of events
-    else:
-        logger.error(f"Failed to retrieve calendar events for user OID {ms_oid}. Response: {graph_response}")
+async def get_outlook_calendar_events_async(
+    db: Session,
+    ms_oid: str,
+    start_time: datetime,
+    end_time: datetime
+) -> Optional[List[Dict]]:
+    """Async version of get_outlook_calendar_events that returns every page of the range.
+    When the first page reports the total count, the remaining pages are fetched concurrently;
+    otherwise @odata.nextLink is followed page by page."""
+    logger.info("Fetching Outlook calendar events for user OID %s from %s to %s", ms_oid, start_time, end_time)
+    params, headers_extra = _calendar_view_request(start_time, end_time)
+
+    token_result = await asyncio.to_thread(get_cached_ms_token, db=db, ms_oid=ms_oid, scopes=["Calendars.Read"])
+    if not token_result or not token_result.get("access_token"):
+        logger.error("Could not obtain Graph API token for user OID %s and scopes ['Calendars.Read']", ms_oid)
+        return None
+    headers = _graph_headers(token_result["access_token"], headers_extra)
+
+    first_page = await _send_graph_request_async("GET", "/me/calendarview", headers, params=params)
+    events = _calendar_events_from_response(first_page, ms_oid)
+    if events is None:
         return None
 
+    total = first_page.get("@odata.count")
+    if total is None:
+        # No count to plan from; the next page's URL (absolute, carrying the query) is all we have
+        next_link = first_page.get("@odata.nextLink")
+        page_count = 1
+        while next_link and page_count < CALENDAR_VIEW_MAX_PAGES:
+            page = await _send_graph_request_async("GET", next_link, headers)
+            page_events = _calendar_events_from_response(page, ms_oid)
+            if page_events is None:
+                return None
+            events.extend(page_events)
+            next_link = page.get("@odata.nextLink")
+            page_count += 1
+        if next_link:
+            logger.warning("Calendar view for user OID %s has more than %d pages; returning the first %d events.",
+                           ms_oid, CALENDAR_VIEW_MAX_PAGES, len(events))
+        return events
+
+    page_count = min(-(-total // CALENDAR_VIEW_PAGE_SIZE), CALENDAR_VIEW_MAX_PAGES)
+    if page_count > 1:
+        if total > CALENDAR_VIEW_PAGE_SIZE * CALENDAR_VIEW_MAX_PAGES:
+            logger.warning("Calendar view for user OID %s has %d events; returning the first %d.",
+                           ms_oid, total, CALENDAR_VIEW_PAGE_SIZE * CALENDAR_VIEW_MAX_PAGES)
+        pages = await asyncio.gather(*(
+            _send_graph_request_async(
+                "GET", "/me/calendarview", headers,
+                params={**params, "$count": "false", "$skip": page * CALENDAR_VIEW_PAGE_SIZE}
+            )
+            for page in range(1, page_count)
+        ))
+        for page in pages:
+            page_events = _calendar_events_from_response(page, ms_oid)
+            if page_events is None:
+                return None
+            events.extend(page_events)
+    return events
+
 def create_outlook_calendar_event_payload(event_data: schemas.CalendarEventCreate) -> Dict[str, Any]:
     """Creates the payload dictionary for POST /me/events from CalendarEventCreate schema."""
     # Ensure datetimes are in UTC for Graph API
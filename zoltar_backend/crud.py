@@ -1,4 +1,4 @@
-from sqlalchemy.orm import Session, joinedload
+from sqlalchemy.orm import Session, joinedload, raiseload, selectinload
 from datetime import datetime, timezone, timedelta # Need datetime for completed_at
 from typing import Optional, List, Union, Tuple, Dict, Any # Import Optional, List, and Union
 
@@ -10,14 +10,29 @@ from dateutil.tz import UTC # Import UTC for timezone awareness
 import models
 import schemas
 import auth
+import crud_errors
+import report_cache
+from app_settings import settings
 
-from sqlalchemy import func, or_, and_ # Import func for count, or_ for combining filters
-import sqlalchemy.orm # Import orm for joinedload
+from sqlalchemy import delete, exists, func, insert, literal, or_, and_, select, update # Import func for count, or_ for combining filters
 import logging
 
 # Set up logging
 logger = logging.getLogger(__name__)
 
+def _list_load_options(*options) -> tuple:
+    """Loader options for the list queries behind GET endpoints. With STRICT_RELATIONSHIP_LOADING
+    on (dev/CI), any relationship not loaded by `options` raises when accessed instead of
+    lazy-loading once per row."""
+    if settings.STRICT_RELATIONSHIP_LOADING:
+        return (*options, raiseload("*"))
+    return options
+
+def _set_fields(update_schema) -> Dict[str, Any]:
+    """The fields a partial-update schema was given, like model_dump(exclude_unset=True). The
+    update schemas are flat, so reading just the set attributes skips dumping every field."""
+    return {name: getattr(update_schema, name) for name in update_schema.model_fields_set}
+
 def get_user_by_email(db: Session, email: str):
     return db.query(models.User).filter(models.User.email == email).first()
 
@@ -31,11 +46,18 @@ def create_user(db: Session, user: schemas.UserCreate):
 
 # --- Category CRUD Functions ---
 
-def get_category(db: Session, category_id: int):
-    return db.query(models.Category).filter(models.Category.id == category_id).first()
+def get_category(db: Session, category_id: int, owner_id: Optional[int] = None):
+    query = db.query(models.Category).filter(models.Category.id == category_id)
+    if owner_id is not None:
+        query = query.filter(models.Category.owner_id == owner_id)
+    return query.first()
 
-def get_user_categories(db: Session, user_id: int, skip: int = 0, limit: int = 100):
-    return db.query(models.Category).filter(models.Category.owner_id == user_id).offset(skip).limit(limit).all()
+def get_user_categories(db: Session, user_id: int, after_id: Optional[int] = None, limit: int = 100):
+    """Keyset-paginated categories ordered by id; pass the last id of a page as after_id."""
+    query = db.query(models.Category).filter(models.Category.owner_id == user_id)
+    if after_id is not None:
+        query = query.filter(models.Category.id > after_id)
+    return query.order_by(models.Category.id).limit(limit).all()
 
 def create_user_category(db: Session, category: schemas.CategoryCreate, user_id: int):
     db_category = models.Category(**category.model_dump(), owner_id=user_id)
@@ -45,20 +67,29 @@ def create_user_category(db: Session, category: schemas.CategoryCreate, user_id:
     return db_category
 
 def delete_category(db: Session, category_id: int, user_id: int):
-    db_category = db.query(models.Category).filter(models.Category.id == category_id, models.Category.owner_id == user_id).first()
-    if db_category:
-        db.delete(db_category)
-        db.commit()
-        return True
-    return False
+    owned_category = select(models.Category.id).where(
+        models.Category.id == category_id, models.Category.owner_id == user_id
+    )
+    # Bulk delete bypasses the ORM, so uncategorize projects first as db.delete() would
+    db.execute(
+        update(models.Project)
+        .where(models.Project.category_id.in_(owned_category))
+        .values(category_id=None)
+    )
+    result = db.execute(
+        delete(models.Category).where(models.Category.id == category_id, models.Category.owner_id == user_id)
+    )
+    db.commit()
+    return result.rowcount > 0
 
 # --- Project CRUD Functions ---
 
-def get_project(db: Session, project_id: int):
-    return db.query(models.Project).filter(models.Project.id == project_id).first()
+def get_project(db: Session, project_id: int, user_id: int) -> Optional[models.Project]:
+    """Gets a single project by ID, ensuring it belongs to the user."""
+    return db.query(models.Project).filter(models.Project.id == project_id, models.Project.owner_id == user_id).first()
 
 def get_user_projects(db: Session, user_id: int, skip: int = 0, limit: int = 100):
-    return db.query(models.Project).filter(models.Project.owner_id == user_id).offset(skip).limit(limit).all()
+    return db.query(models.Project).options(*_list_load_options()).filter(models.Project.owner_id == user_id).offset(skip).limit(limit).all()
 
 def create_user_project(db: Session, project: schemas.ProjectCreate, user_id: int):
     # Validate category if provided
@@ -78,19 +109,19 @@ def update_project(db: Session, project_id: int, project_update: schemas.Project
     
     Returns:
         A dictionary containing the updated project and a list of unblocked dependent projects, 
-        or None if project not found, or 'invalid_category' if category invalid.
+        or None if project not found. Raises InvalidCategory if the new category isn't the user's.
     """
     db_project = db.query(models.Project).filter(models.Project.id == project_id, models.Project.owner_id == user_id).first()
     if not db_project:
         return None # Project not found or not owned by user
 
-    update_data = project_update.model_dump(exclude_unset=True)
+    update_data = _set_fields(project_update)
 
     # Validate category if it's being changed
     if 'category_id' in update_data and update_data['category_id'] is not None:
         category = get_category(db, update_data['category_id'])
         if not category or category.owner_id != user_id:
-            return "invalid_category" # Specific signal for invalid category during update
+            raise crud_errors.InvalidCategory()
 
     original_status = db_project.status # Store original status
 
@@ -157,26 +188,35 @@ def delete_project(db: Session, project_id: int, user_id: int):
 
 # --- Task CRUD Functions ---
 
-def get_task(db: Session, task_id: int):
-    return db.query(models.Task).filter(models.Task.id == task_id).first()
-
-def get_user_tasks(db: Session, user_id: int, skip: int = 0, limit: int = 100):
-    # Add filtering/sorting later (e.g., by project, status, due_date)
-    return db.query(models.Task).filter(models.Task.owner_id == user_id).offset(skip).limit(limit).all()
-
-def create_user_task(db: Session, task: schemas.TaskCreate, owner_id: int):
+def get_task(db: Session, task_id: int, user_id: int) -> Optional[models.Task]:
+    """Gets a single task by ID, ensuring it belongs to the user."""
+    return db.query(models.Task).filter(models.Task.id == task_id, models.Task.owner_id == user_id).first()
+
+def get_user_tasks(db: Session, user_id: int, after_id: Optional[int] = None, skip: int = 0, limit: int = 100):
+    """Tasks ordered by id (creation order). Keyset-paginated: pass the last id of a page as
+    after_id; skip still works but makes the database scan and discard the skipped rows."""
+    # Add filtering later (e.g., by project, status, due_date)
+    # schemas.Task only carries FK ids, so no relationship is eager-loaded; strict mode guards that
+    query = db.query(models.Task).options(*_list_load_options()).filter(models.Task.owner_id == user_id)
+    if after_id is not None:
+        query = query.filter(models.Task.id > after_id)
+    return query.order_by(models.Task.id).offset(skip).limit(limit).all()
+
+def create_user_task(db: Session, task: schemas.TaskCreate, owner_id: int) -> models.Task:
+    """Creates a task. Raises InvalidProject/InvalidContact if a linked project or contact
+    isn't the user's."""
     # Validate project if provided
     if task.project_id is not None:
-        project = get_project(db, task.project_id)
+        project = get_project(db, task.project_id, user_id=owner_id)
         # Ensure project belongs to the *same user* trying to create the task
-        if not project or project.owner_id != owner_id: # Check against owner_id
-            return "invalid_project" # Return error code
+        if not project:
+            raise crud_errors.InvalidProject()
 
     # Validate contact if provided
     if task.contact_id is not None:
         contact = get_contact(db, task.contact_id, owner_id) # Pass owner_id
         if not contact: # get_contact already checks ownership
-            return "invalid_contact" # Return error code
+            raise crud_errors.InvalidContact()
 
     # Prepare data, excluding completed_at initially
     task_data = task.model_dump()
@@ -195,31 +235,32 @@ def create_user_task(db: Session, task: schemas.TaskCreate, owner_id: int):
     db.refresh(db_task)
     return db_task # Return the created task object on success
 
-def update_task(db: Session, task_id: int, task_update: schemas.TaskUpdate, user_id: int):
+def update_task(db: Session, task_id: int, task_update: schemas.TaskUpdate, user_id: int) -> Optional[schemas.TaskUpdateResponse]:
     """Updates a task, triggers relative reminders, and checks/updates status of dependent tasks if this one is completed.
     
     Returns:
-        A dictionary containing the updated task and a list of unblocked dependent tasks, 
-        or None if task not found, or a string error code ('invalid_project', 'invalid_contact').
+        A TaskUpdateResponse with the updated task and the unblocked dependent tasks, 
+        or None if task not found. Raises InvalidProject/InvalidContact if a new project or
+        contact isn't the user's.
     """
     db_task = db.query(models.Task).filter(models.Task.id == task_id, models.Task.owner_id == user_id).first()
     if not db_task:
         return None # Task not found or not owned by user
 
-    update_data = task_update.model_dump(exclude_unset=True)
+    update_data = _set_fields(task_update)
     original_status = db_task.status # Store original status
 
     # Validate project if it's being changed
     if 'project_id' in update_data and update_data['project_id'] is not None:
-        project = get_project(db, update_data['project_id'])
-        if not project or project.owner_id != user_id:
-            return "invalid_project" # Specific signal for invalid project
+        project = get_project(db, update_data['project_id'], user_id=user_id)
+        if not project:
+            raise crud_errors.InvalidProject()
     
     # Validate contact if it's being changed
     if 'contact_id' in update_data and update_data['contact_id'] is not None:
         contact = get_contact(db, update_data['contact_id'], user_id)
         if not contact:
-            return "invalid_contact"
+            raise crud_errors.InvalidContact()
 
     task_completed_time = None # Variable to store completion time
     task_was_completed = False # Flag if status changed to COMPLETED
@@ -297,7 +338,12 @@ def update_task(db: Session, task_id: int, task_update: schemas.TaskUpdate, user
             print(f"Error refreshing unblocked task {task_item.id}: {e}")
             pass
 
-    return {"updated_task": db_task, "unblocked_tasks": unblocked_tasks}
+    # Validated here, while the session is still open, straight from the ORM objects
+    return schemas.TaskUpdateResponse(
+        updated_task=schemas.Task.model_validate(db_task),
+        unblocked_tasks=[schemas.TaskBasicInfo.model_validate(task_item) for task_item in unblocked_tasks],
+        relative_reminders_activated=relative_reminders_updated
+    )
 
 def delete_task(db: Session, task_id: int, user_id: int):
     db_task = db.query(models.Task).filter(models.Task.id == task_id, models.Task.owner_id == user_id).first()
@@ -350,15 +396,15 @@ def update_file_reference_links(
     if db_file_ref.owner_id != user_id:
         return "unauthorized_file"
 
-    update_values = update_data.model_dump(exclude_unset=True)
+    update_values = _set_fields(update_data)
     updated = False
 
     # Validate and set project_id if provided
     if "project_id" in update_values:
         project_id = update_values["project_id"]
         if project_id is not None:
-            project = get_project(db, project_id)
-            if not project or project.owner_id != user_id:
+            project = get_project(db, project_id, user_id=user_id)
+            if not project:
                 return "invalid_project"
         db_file_ref.project_id = project_id
         updated = True
@@ -367,8 +413,8 @@ def update_file_reference_links(
     if "task_id" in update_values:
         task_id = update_values["task_id"]
         if task_id is not None:
-            task = get_task(db, task_id)
-            if not task or task.owner_id != user_id:
+            task = get_task(db, task_id, user_id)
+            if not task:
                 return "invalid_task"
         db_file_ref.task_id = task_id
         updated = True
@@ -376,7 +422,13 @@ def update_file_reference_links(
     if updated:
         db.add(db_file_ref)
         db.commit()
-        db.refresh(db_file_ref)
+        # Reload with the linked project/task joined in, so callers reading .project/.task
+        # (e.g. the chat associate_file reply) don't trigger lazy loads
+        db_file_ref = db.scalars(
+            select(models.FileReference)
+            .options(joinedload(models.FileReference.project), joinedload(models.FileReference.task))
+            .where(models.FileReference.id == file_id)
+        ).one()
     
     return db_file_ref # Return the updated (or unchanged) object
 
@@ -438,43 +490,46 @@ def get_due_reminders(db: Session) -> list[models.Reminder]:
 
 # --- Reminder CRUD Functions ---
 
-def get_reminder(db: Session, reminder_id: int):
-    return db.query(models.Reminder).filter(models.Reminder.id == reminder_id).first()
+def get_reminder(db: Session, reminder_id: int, user_id: int) -> Optional[models.Reminder]:
+    """Gets a single reminder by ID, ensuring it belongs to the user."""
+    return db.query(models.Reminder).filter(models.Reminder.id == reminder_id, models.Reminder.owner_id == user_id).first()
 
 def get_user_reminders(db: Session, user_id: int, skip: int = 0, limit: int = 100):
     # Add filtering later (e.g., active, type, due before/after)
-    return db.query(models.Reminder).filter(models.Reminder.owner_id == user_id).offset(skip).limit(limit).all()
+    return db.query(models.Reminder).options(*_list_load_options()).filter(models.Reminder.owner_id == user_id).offset(skip).limit(limit).all()
 
-def create_user_reminder(db: Session, reminder: schemas.ReminderCreate, owner_id: int):
+def create_user_reminder(db: Session, reminder: schemas.ReminderCreate, owner_id: int) -> models.Reminder:
+    """Creates a reminder. Raises a CrudError if a linked task, file, contact or the
+    recurrence rule is invalid."""
     # Validate task if provided
     if reminder.task_id is not None:
-        task = get_task(db, reminder.task_id)
-        # Ensure task belongs to the *same user*
-        if not task or task.owner_id != owner_id: # Check against owner_id
-             return "invalid_task" # Or raise HTTPException? For now, return string code
+        task = get_task(db, reminder.task_id, owner_id)
+        # get_task only returns tasks belonging to the *same user*
+        if not task:
+            raise crud_errors.InvalidTask()
 
     # Validate file reference if provided
     if reminder.file_reference_id is not None:
         file_ref = get_file_reference(db, reminder.file_reference_id)
         # Ensure file belongs to the *same user*
         if not file_ref or file_ref.owner_id != owner_id: # Check against owner_id
-            return "invalid_file"
+            raise crud_errors.InvalidFile()
 
     # Validate contact if provided
     if reminder.contact_id is not None:
         contact = get_contact(db, reminder.contact_id, owner_id) # Pass owner_id
         if not contact: # get_contact checks ownership
-            return "invalid_contact"
+            raise crud_errors.InvalidContact()
 
     # Validate relative task if provided
     if reminder.relative_to_task_completion_id is not None:
-        relative_task = get_task(db, reminder.relative_to_task_completion_id)
-        if not relative_task or relative_task.owner_id != owner_id: # Check against owner_id
-             return "invalid_relative_task"
+        relative_task = get_task(db, reminder.relative_to_task_completion_id, owner_id)
+        if not relative_task:
+            raise crud_errors.InvalidRelativeTask()
 
     # Basic validation of recurrence rule format if provided
     if reminder.recurrence_rule and not validate_recurrence_rule(reminder.recurrence_rule):
-         return "invalid_recurrence_rule"
+        raise crud_errors.InvalidRule()
 
     # Clean the reminder data - Ensure trigger_datetime is None for relative types
     # The schema validation (@model_validator) should handle this, but double-check here
@@ -499,12 +554,36 @@ def create_user_reminder(db: Session, reminder: schemas.ReminderCreate, owner_id
     db.refresh(db_reminder)
     return db_reminder
 
-def update_reminder(db: Session, reminder_id: int, reminder_update: schemas.ReminderUpdate, user_id: int):
+def create_user_reminders_bulk(db: Session, reminders: List[schemas.ReminderCreate], owner_id: int) -> List[int]:
+    """Inserts several one-time reminders in a single INSERT ... RETURNING round trip and
+    returns their ids in input order. Only for reminders with no linked task, file, contact
+    or relative task, since the ownership checks in create_user_reminder are skipped; raises
+    CrudError for any other reminder."""
+    rows = []
+    for reminder in reminders:
+        if (reminder.reminder_type != schemas.ReminderType.ONE_TIME or reminder.task_id is not None
+                or reminder.file_reference_id is not None or reminder.contact_id is not None
+                or reminder.relative_to_task_completion_id is not None):
+            raise crud_errors.CrudError("Bulk reminder creation only accepts unlinked one-time reminders")
+        rows.append({**reminder.model_dump(), "owner_id": owner_id})
+    if not rows:
+        return []
+    reminder_ids = db.scalars(
+        insert(models.Reminder).returning(models.Reminder.id, sort_by_parameter_order=True), rows
+    ).all()
+    db.commit()
+    # A Core insert bypasses the ORM flush hooks that drop the user's cached reports
+    report_cache.invalidate({owner_id})
+    return list(reminder_ids)
+
+def update_reminder(db: Session, reminder_id: int, reminder_update: schemas.ReminderUpdate, user_id: int) -> Optional[models.Reminder]:
+    """Updates a reminder, or returns None if it isn't found/owned. Raises a CrudError for an
+    invalid recurrence change or linked task, file or contact."""
     db_reminder = db.query(models.Reminder).filter(models.Reminder.id == reminder_id, models.Reminder.owner_id == user_id).first()
     if not db_reminder:
         return None # Reminder not found or not owned
 
-    update_data = reminder_update.model_dump(exclude_unset=True)
+    update_data = _set_fields(reminder_update)
 
     # --- Recurrence Validation Logic ---
     new_type = update_data.get('reminder_type', db_reminder.reminder_type) # Get proposed type or keep existing
@@ -513,25 +592,25 @@ def update_reminder(db: Session, reminder_id: int, reminder_update: schemas.Remi
     if new_type != models.ReminderType.ONE_TIME:
         # If changing TO recurring, or updating rule for existing recurring
         if not new_rule:
-            return "invalid_rule" # Rule required for recurring type
+            raise crud_errors.InvalidRule("Invalid or missing recurrence rule, or rule provided for one-time reminder") # Rule required for recurring type
         if not validate_recurrence_rule(new_rule):
-            return "invalid_rule" # Provided/existing rule is invalid
+            raise crud_errors.InvalidRule("Invalid or missing recurrence rule, or rule provided for one-time reminder") # Provided/existing rule is invalid
         # If only type is changing TO recurring, ensure rule is present (handled above)
     elif new_type == models.ReminderType.ONE_TIME and 'reminder_type' in update_data:
         # If explicitly changing FROM recurring TO one-time
         update_data['recurrence_rule'] = None # Nullify the rule
     elif 'recurrence_rule' in update_data and update_data['recurrence_rule'] is not None and new_type == models.ReminderType.ONE_TIME:
          # If trying to set a rule on an existing ONE_TIME without changing type
-         return "invalid_rule" # Cannot set rule for ONE_TIME type
+        raise crud_errors.InvalidRule("Invalid or missing recurrence rule, or rule provided for one-time reminder") # Cannot set rule for ONE_TIME type
     # --- End Recurrence Validation ---
 
     # Validate task if being changed
     if "task_id" in update_data:
         task_id = update_data["task_id"]
         if task_id is not None:
-            task = get_task(db, task_id)
-            if not task or task.owner_id != user_id:
-                return "invalid_task"
+            task = get_task(db, task_id, user_id)
+            if not task:
+                raise crud_errors.InvalidTask()
 
     # Validate file if being changed
     if "file_reference_id" in update_data:
@@ -539,7 +618,7 @@ def update_reminder(db: Session, reminder_id: int, reminder_update: schemas.Remi
         if file_ref_id is not None:
             file_ref = get_file_reference(db, file_ref_id)
             if not file_ref or file_ref.owner_id != user_id:
-                return "invalid_file"
+                raise crud_errors.InvalidFile()
 
     # Validate contact if being changed
     if "contact_id" in update_data:
@@ -547,7 +626,7 @@ def update_reminder(db: Session, reminder_id: int, reminder_update: schemas.Remi
         if contact_id is not None:
             contact = get_contact(db, contact_id, user_id)
             if not contact:
-                return "invalid_contact"
+                raise crud_errors.InvalidContact()
 
     # Apply the updates
     for key, value in update_data.items():
@@ -568,13 +647,13 @@ def delete_reminder(db: Session, reminder_id: int, user_id: int):
 
 # --- Reminder Action Functions (Complete/Skip) ---
 
-def complete_reminder_instance(db: Session, reminder_id: int, user_id: int, action_time: Optional[datetime] = None) -> Optional[Union[models.Reminder, str]]:
+def complete_reminder_instance(db: Session, reminder_id: int, user_id: int, action_time: Optional[datetime] = None) -> models.Reminder:
     """Marks a reminder instance as completed. For recurring scheduled, calculates next trigger."""
     db_reminder = db.query(models.Reminder).filter(models.Reminder.id == reminder_id, models.Reminder.owner_id == user_id).first()
     if not db_reminder:
-        return "not_found"
+        raise crud_errors.NotFound("Reminder not found or not owned by user")
     if not db_reminder.is_active:
-        return "inactive"
+        raise crud_errors.ReminderInactive()
 
     now = action_time or datetime.now(timezone.utc)
 
@@ -601,13 +680,13 @@ def complete_reminder_instance(db: Session, reminder_id: int, user_id: int, acti
     db.refresh(db_reminder)
     return db_reminder
 
-def skip_reminder_instance(db: Session, reminder_id: int, user_id: int, action_time: Optional[datetime] = None) -> Optional[Union[models.Reminder, str]]:
+def skip_reminder_instance(db: Session, reminder_id: int, user_id: int, action_time: Optional[datetime] = None) -> models.Reminder:
     """Marks a reminder instance as skipped. For recurring scheduled, calculates next trigger."""
     db_reminder = db.query(models.Reminder).filter(models.Reminder.id == reminder_id, models.Reminder.owner_id == user_id).first()
     if not db_reminder:
-        return "not_found"
+        raise crud_errors.NotFound("Reminder not found or not owned by user")
     if not db_reminder.is_active:
-        return "inactive"
+        raise crud_errors.ReminderInactive()
 
     now = action_time or datetime.now(timezone.utc)
 
@@ -672,12 +751,22 @@ def get_pending_persistent_reminders(db: Session) -> list[models.Reminder]:
 
 # --- Reminder History Function ---
 
-def get_reminder_history(db: Session, reminder_id: int, user_id: int, start_date: Optional[datetime] = None, end_date: Optional[datetime] = None) -> Optional[Union[List[models.ReminderEvent], str]]:
-    """Retrieves the event history for a specific reminder owned by the user."""
+def get_reminder_history(
+    db: Session,
+    reminder_id: int,
+    user_id: int,
+    start_date: Optional[datetime] = None,
+    end_date: Optional[datetime] = None,
+    before_id: Optional[int] = None,
+    limit: Optional[int] = None
+) -> List[models.ReminderEvent]:
+    """Retrieves the event history for a specific reminder owned by the user, newest first
+    (by action_time, then id). Returns every event unless limit is given; to page back, pass
+    the id of the last event received as before_id."""
     # Verify reminder exists and belongs to user
     db_reminder = db.query(models.Reminder).filter(models.Reminder.id == reminder_id, models.Reminder.owner_id == user_id).first()
     if not db_reminder:
-        return "not_found"
+        raise crud_errors.NotFound("Reminder not found or not owned by user")
 
     query = db.query(models.ReminderEvent).filter(models.ReminderEvent.reminder_id == reminder_id)
 
@@ -688,112 +777,138 @@ def get_reminder_history(db: Session, reminder_id: int, user_id: int, start_date
         # Add a day if only date provided, to include the whole end day?
         # Or expect precise timestamp. Assuming precise timestamp for now.
         query = query.filter(models.ReminderEvent.action_time <= end_date)
-
-    history = query.order_by(models.ReminderEvent.action_time.desc()).all()
-    return history
+    if before_id is not None:
+        # Keyset on (action_time, id), the same order ix_reminder_events_rid_time serves
+        cursor_time = select(models.ReminderEvent.action_time).where(
+            models.ReminderEvent.id == before_id,
+            models.ReminderEvent.reminder_id == reminder_id
+        ).scalar_subquery()
+        query = query.filter(or_(
+            models.ReminderEvent.action_time < cursor_time,
+            and_(models.ReminderEvent.action_time == cursor_time, models.ReminderEvent.id < before_id)
+        ))
+
+    query = query.order_by(models.ReminderEvent.action_time.desc(), models.ReminderEvent.id.desc())
+    if limit is not None:
+        query = query.limit(limit)
+    return query.all()
 
 # --- Task Dependency Functions ---
 
-def add_task_dependency(db: Session, task_id: int, depends_on_task_id: int, user_id: int) -> Optional[str]:
-    """Adds a dependency link between two tasks owned by the user."""
+def _task_dependency_link(task_id: int, depends_on_task_id: int):
+    """WHERE clause for the task_dependency row that appending depends_on_task to
+    task.dependency_tasks creates (the backref stores it with the columns swapped)."""
+    link = models.task_dependency.c
+    return and_(link.task_id == depends_on_task_id, link.depends_on_task_id == task_id)
+
+def _both_tasks_owned(task_id: int, depends_on_task_id: int, user_id: int):
+    """Condition that both tasks exist and belong to the user, for use inside a single statement."""
+    return select(func.count()).select_from(models.Task).where(
+        models.Task.id.in_([task_id, depends_on_task_id]),
+        models.Task.owner_id == user_id
+    ).scalar_subquery() == 2
+
+def add_task_dependency(db: Session, task_id: int, depends_on_task_id: int, user_id: int) -> None:
+    """Adds a dependency link between two tasks owned by the user. Adding an existing
+    link is a no-op."""
     if task_id == depends_on_task_id:
-        return "self_dependency"
-
-    # Verify both tasks exist and belong to the user
-    task = db.query(models.Task).filter(models.Task.id == task_id, models.Task.owner_id == user_id).first()
-    depends_on_task = db.query(models.Task).filter(models.Task.id == depends_on_task_id, models.Task.owner_id == user_id).first()
-
-    if not task or not depends_on_task:
-        return "not_found"
-    
-    # Check if dependency already exists (optional but good practice)
-    # Accessing the relationship directly is easier than querying association table
-    if depends_on_task in task.dependency_tasks:
-         return "already_exists"
+        raise crud_errors.SelfDependency("Task cannot depend on itself")
+
+    # One INSERT ... SELECT checks ownership of both tasks and that the link is new
+    link = _task_dependency_link(task_id, depends_on_task_id)
+    result = db.execute(
+        insert(models.task_dependency).from_select(
+            ["task_id", "depends_on_task_id"],
+            select(literal(depends_on_task_id), literal(task_id)).where(
+                _both_tasks_owned(task_id, depends_on_task_id, user_id),
+                ~exists().where(link)
+            )
+        )
+    )
+    if result.rowcount == 0:
+        # Nothing inserted: tell an existing link apart from missing/foreign tasks
+        if db.execute(select(exists().where(link))).scalar():
+            return
+        raise crud_errors.NotFound("One or both tasks not found or not owned by user")
 
-    # Add the dependency
-    task.dependency_tasks.append(depends_on_task)
-    db.add(task)
-    
     # Check and update status after adding dependency
-    check_and_update_task_status(db, task)
+    check_and_update_task_status(db, db.get(models.Task, task_id))
     
     db.commit() # Commit changes to task and potentially its status
-    return "ok"
 
-def remove_task_dependency(db: Session, task_id: int, depends_on_task_id: int, user_id: int) -> Optional[str]:
+def remove_task_dependency(db: Session, task_id: int, depends_on_task_id: int, user_id: int) -> None:
     """Removes a dependency link between two tasks owned by the user."""
-    # Verify both tasks exist and belong to the user
-    task = db.query(models.Task).filter(models.Task.id == task_id, models.Task.owner_id == user_id).first()
-    depends_on_task = db.query(models.Task).filter(models.Task.id == depends_on_task_id, models.Task.owner_id == user_id).first()
-
-    if not task or not depends_on_task:
-        return "not_found"
-
-    # Check if the dependency exists before trying to remove
-    if depends_on_task not in task.dependency_tasks:
-        return "not_found" # Or maybe "dependency_not_found"?
+    # One DELETE checks ownership of both tasks and that the link exists
+    result = db.execute(delete(models.task_dependency).where(
+        _task_dependency_link(task_id, depends_on_task_id),
+        _both_tasks_owned(task_id, depends_on_task_id, user_id)
+    ))
+    if result.rowcount == 0:
+        # Either task missing/not owned, or no such dependency
+        raise crud_errors.NotFound("One or both tasks not found, or dependency does not exist")
 
-    # Remove the dependency
-    task.dependency_tasks.remove(depends_on_task)
-    db.add(task)
-    
     # Check and update status after removing dependency
-    check_and_update_task_status(db, task)
+    check_and_update_task_status(db, db.get(models.Task, task_id))
 
     db.commit() # Commit changes to task and potentially its status
-    return "ok"
 
 # --- Project Dependency Functions ---
 
-def add_project_dependency(db: Session, project_id: int, depends_on_project_id: int, user_id: int) -> Optional[str]:
-    """Adds a dependency link between two projects owned by the user."""
+def _count_owned_projects(db: Session, project_ids: List[int], user_id: int) -> int:
+    """Counts how many of project_ids belong to the user, without loading any project rows."""
+    return db.execute(select(func.count()).select_from(models.Project).where(
+        models.Project.id.in_(project_ids),
+        models.Project.owner_id == user_id
+    )).scalar_one()
+
+def _project_dependency_link(project_id: int, depends_on_project_id: int):
+    """WHERE clause for the project_dependency row that appending depends_on_project to
+    project.dependency_projects creates (the backref stores it with the columns swapped)."""
+    link = models.project_dependency.c
+    return and_(link.project_id == depends_on_project_id, link.depends_on_project_id == project_id)
+
+def add_project_dependency(db: Session, project_id: int, depends_on_project_id: int, user_id: int) -> None:
+    """Adds a dependency link between two projects owned by the user. Adding an existing
+    link is a no-op."""
     if project_id == depends_on_project_id:
-        return "self_dependency"
+        raise crud_errors.SelfDependency()
 
     # Verify both projects exist and belong to the user
-    project = db.query(models.Project).filter(models.Project.id == project_id, models.Project.owner_id == user_id).first()
-    depends_on_project = db.query(models.Project).filter(models.Project.id == depends_on_project_id, models.Project.owner_id == user_id).first()
-
-    if not project or not depends_on_project:
-        return "not_found"
+    if _count_owned_projects(db, [project_id, depends_on_project_id], user_id) != 2:
+        raise crud_errors.NotFound("One or both projects not found or not owned by user")
 
     # Check if dependency already exists
-    if depends_on_project in project.dependency_projects:
-         return "already_exists"
+    link = _project_dependency_link(project_id, depends_on_project_id)
+    if db.execute(select(exists().where(link))).scalar():
+        return
 
     # Add the dependency
-    project.dependency_projects.append(depends_on_project)
-    db.add(project)
-    
+    db.execute(insert(models.project_dependency).values(
+        project_id=depends_on_project_id, depends_on_project_id=project_id
+    ))
+
     # Check and update status after adding dependency
-    check_and_update_project_status(db, project)
+    check_and_update_project_status(db, db.get(models.Project, project_id))
 
     db.commit() # Commit changes to project and potentially its status
-    return "ok"
 
-def remove_project_dependency(db: Session, project_id: int, depends_on_project_id: int, user_id: int) -> Optional[str]:
+def remove_project_dependency(db: Session, project_id: int, depends_on_project_id: int, user_id: int) -> None:
     """Removes a dependency link between two projects owned by the user."""
     # Verify both projects exist and belong to the user
-    project = db.query(models.Project).filter(models.Project.id == project_id, models.Project.owner_id == user_id).first()
-    depends_on_project = db.query(models.Project).filter(models.Project.id == depends_on_project_id, models.Project.owner_id == user_id).first()
+    if _count_owned_projects(db, [project_id, depends_on_project_id], user_id) != 2:
+        raise crud_errors.NotFound("One or both projects not found, or dependency does not exist")
 
-    if not project or not depends_on_project:
-        return "not_found"
+    # Remove the dependency, checking it existed
+    result = db.execute(delete(models.project_dependency).where(
+        _project_dependency_link(project_id, depends_on_project_id)
+    ))
+    if result.rowcount == 0:
+        raise crud_errors.NotFound("One or both projects not found, or dependency does not exist")
 
-    # Check if the dependency exists before trying to remove
-    if depends_on_project not in project.dependency_projects:
-        return "not_found"
-
-    # Remove the dependency
-    project.dependency_projects.remove(depends_on_project)
-    db.add(project)
-    
     # Check and update status after removing dependency
-    check_and_update_project_status(db, project)
+    check_and_update_project_status(db, db.get(models.Project, project_id))
 
     db.commit() # Commit changes to project and potentially its status
-    return "ok"
 
 # --- Dependency Status Update Helpers ---
 
@@ -952,13 +1067,13 @@ def get_user_projects_by_category(db: Session, user_id: int) -> schemas.Projects
 
 def get_user_available_tasks(db: Session, user_id: int) -> List[models.Task]:
     """Retrieves tasks for a user that are in PENDING or IN_PROGRESS status."""
-    return db.query(models.Task).filter(
+    return db.query(models.Task).options(*_list_load_options()).filter(
         models.Task.owner_id == user_id,
         models.Task.status.in_([
             models.TaskStatus.PENDING,
             models.TaskStatus.IN_PROGRESS
         ])
-    ).all()
+    ).order_by(models.Task.id).all()
 
 # --- Contact CRUD Functions ---
 
@@ -984,7 +1099,7 @@ def update_contact(db: Session, contact_id: int, contact_update: schemas.Contact
     if not db_contact:
         return None
 
-    update_data = contact_update.model_dump(exclude_unset=True)
+    update_data = _set_fields(contact_update)
     for key, value in update_data.items():
         setattr(db_contact, key, value)
 
@@ -1015,29 +1130,34 @@ def get_outstanding_items_for_contact(db: Session, contact_id: int, user_id: int
         return None # Indicate contact not found or not owned
 
     now_utc = datetime.now(timezone.utc)
+    # The rows only feed the response schemas, so select plain column rows (dict-like
+    # mappings) instead of building and identity-mapping ORM instances
+    tasks_table, reminders_table, notes_table = models.Task.__table__, models.Reminder.__table__, models.Note.__table__
 
     # Query outstanding tasks linked to this contact
-    outstanding_tasks = db.query(models.Task).filter(
-        models.Task.owner_id == user_id,
-        models.Task.contact_id == contact_id,
-        models.Task.status.in_([
+    outstanding_tasks = db.execute(select(tasks_table).where(
+        tasks_table.c.owner_id == user_id,
+        tasks_table.c.contact_id == contact_id,
+        tasks_table.c.status.in_([
             models.TaskStatus.PENDING,
             models.TaskStatus.IN_PROGRESS
         ])
-    ).all()
+    )).mappings().all()
 
     # Query outstanding reminders linked to this contact
-    outstanding_reminders = db.query(models.Reminder).filter(
-        models.Reminder.owner_id == user_id,
-        models.Reminder.contact_id == contact_id,
-        models.Reminder.is_active == True,
-        models.Reminder.trigger_datetime != None, # Exclude relative reminders not yet triggered
-        (models.Reminder.snoozed_until == None) | (models.Reminder.snoozed_until <= now_utc)
-    ).all()
+    outstanding_reminders = db.execute(select(reminders_table).where(
+        reminders_table.c.owner_id == user_id,
+        reminders_table.c.contact_id == contact_id,
+        reminders_table.c.is_active == True,
+        reminders_table.c.trigger_datetime != None, # Exclude relative reminders not yet triggered
+        (reminders_table.c.snoozed_until == None) | (reminders_table.c.snoozed_until <= now_utc)
+    )).mappings().all()
     
-    # Query outstanding Notes linked to this contact
-    # Use the existing get_user_notes function which handles filtering and ownership
-    outstanding_notes = get_user_notes(db=db, user_id=user_id, contact_id=contact_id, limit=1000) # Use a high limit or handle pagination if needed
+    # Query outstanding Notes linked to this contact, in get_user_notes order
+    outstanding_notes = db.execute(select(notes_table).where(
+        notes_table.c.owner_id == user_id,
+        notes_table.c.contact_id == contact_id
+    ).order_by(notes_table.c.updated_at.desc(), notes_table.c.created_at.desc()).limit(1000)).mappings().all()
 
     return schemas.OutstandingItemsResponse(
         tasks=outstanding_tasks,
@@ -1049,14 +1169,16 @@ def get_outstanding_items_for_contact(db: Session, contact_id: int, user_id: int
 
 def get_project_summary(db: Session, project_id: int, user_id: int) -> Optional[dict]:
     """Retrieves structured summary data for a specific project owned by the user."""
-    # Fetch project and verify ownership, eager load category name if possible
-    project = db.query(models.Project).options(
-        # Eager load category to get name without separate query
-        sqlalchemy.orm.joinedload(models.Project.category) 
-    ).filter(
-        models.Project.id == project_id, 
-        models.Project.owner_id == user_id
-    ).first()
+    # Fetch the project's summary columns and category name in one row, verifying ownership
+    project = db.execute(
+        select(
+            models.Project.id, models.Project.name, models.Project.description,
+            models.Project.status, models.Category.name.label("category_name")
+        ).outerjoin(models.Category, models.Project.category_id == models.Category.id).where(
+            models.Project.id == project_id,
+            models.Project.owner_id == user_id
+        )
+    ).mappings().first()
 
     if not project:
         return None # Project not found or not owned
@@ -1084,16 +1206,9 @@ def get_project_summary(db: Session, project_id: int, user_id: int) -> Optional[
         models.FileReference.owner_id == user_id # Also safer
     ).scalar() or 0 # Use scalar() and default to 0 if None
 
-    # Get category name (already loaded if category exists)
-    category_name = project.category.name if project.category else None
-
     # Assemble the response data (will be validated by response_model)
     summary_data = {
-        "id": project.id,
-        "name": project.name,
-        "description": project.description,
-        "status": project.status,
-        "category_name": category_name,
+        **project, # id, name, description, status, category_name
         "task_counts": task_counts.model_dump(), # Convert Pydantic model to dict for return
         "file_count": file_count
     }
@@ -1114,7 +1229,7 @@ def get_user_notes(
     limit: int = 100
 ) -> List[models.Note]:
     """Gets a list of notes for a user, optionally filtered by contact_id."""
-    query = db.query(models.Note).filter(models.Note.owner_id == user_id)
+    query = db.query(models.Note).options(*_list_load_options()).filter(models.Note.owner_id == user_id)
     if contact_id is not None:
         # Ensure the contact also belongs to the user before filtering
         contact = get_contact(db, contact_id, user_id)
@@ -1125,13 +1240,13 @@ def get_user_notes(
     
     return query.order_by(models.Note.updated_at.desc(), models.Note.created_at.desc()).offset(skip).limit(limit).all()
 
-def create_user_note(db: Session, note: schemas.NoteCreate, user_id: int) -> Union[models.Note, str]:
-    """Creates a note for a user. Returns the note object or an error string."""
+def create_user_note(db: Session, note: schemas.NoteCreate, user_id: int) -> models.Note:
+    """Creates a note for a user. Raises InvalidContact if contact_id isn't the user's."""
     # Validate contact if provided
     if note.contact_id is not None:
         contact = get_contact(db, note.contact_id, user_id)
         if not contact: # get_contact already checks ownership
-            return "invalid_contact" # Return error code
+            raise crud_errors.InvalidContact(f"Invalid contact_id: {note.contact_id}. Contact not found or does not belong to user.")
             
     note_data = note.model_dump()
     db_note = models.Note(**note_data, owner_id=user_id)
@@ -1140,19 +1255,47 @@ def create_user_note(db: Session, note: schemas.NoteCreate, user_id: int) -> Uni
     db.refresh(db_note)
     return db_note
 
-def update_note(db: Session, note_id: int, note_update: schemas.NoteUpdate, user_id: int) -> Optional[Union[models.Note, str]]:
-    """Updates a note. Returns the updated note object, an error string, or None if not found."""
+def bulk_create_user_notes(db: Session, notes: List[schemas.NoteCreate], user_id: int) -> List[Dict[str, Any]]:
+    """Creates several notes for a user with one INSERT ... RETURNING round trip. Returns the
+    new rows as mappings in input order. Raises InvalidContact if any contact_id isn't the
+    user's."""
+    contact_ids = {note.contact_id for note in notes if note.contact_id is not None}
+    if contact_ids:
+        # Validate every linked contact in one query instead of a get_contact call per note
+        owned_ids = set(db.scalars(select(models.Contact.id).where(
+            models.Contact.id.in_(contact_ids),
+            models.Contact.owner_id == user_id
+        )).all())
+        missing = sorted(contact_ids - owned_ids)
+        if missing:
+            raise crud_errors.InvalidContact(f"Invalid contact_id: {missing[0]}. Contact not found or does not belong to user.")
+    if not notes:
+        return []
+
+    notes_table = models.Note.__table__
+    rows = [{**note.model_dump(), "owner_id": user_id} for note in notes]
+    created = db.execute(
+        insert(notes_table).returning(*notes_table.c, sort_by_parameter_order=True), rows
+    ).mappings().all()
+    db.commit()
+    # A Core insert bypasses the ORM flush hooks that drop the user's cached reports
+    report_cache.invalidate({user_id})
+    return [dict(row) for row in created]
+
+def update_note(db: Session, note_id: int, note_update: schemas.NoteUpdate, user_id: int) -> Optional[models.Note]:
+    """Updates a note. Returns the updated note object, or None if not found. Raises
+    InvalidContact if the new contact_id isn't the user's."""
     db_note = get_note(db, note_id, user_id) # Use get_note to ensure ownership
     if not db_note:
         return None # Note not found or not owned by user
 
-    update_data = note_update.model_dump(exclude_unset=True)
+    update_data = _set_fields(note_update)
 
     # Validate contact if it's being changed
     if 'contact_id' in update_data and update_data['contact_id'] is not None:
         contact = get_contact(db, update_data['contact_id'], user_id)
         if not contact:
-            return "invalid_contact"
+            raise crud_errors.InvalidContact("Invalid contact_id provided in update. Contact not found or does not belong to user.")
         
     # Apply updates
     for key, value in update_data.items():
@@ -1249,11 +1392,12 @@ def get_list(db: Session, list_id: int, user_id: int) -> Optional[models.List]:
         models.List.user_id == user_id
     ).first()
 
-def get_lists_by_user(db: Session, user_id: int) -> List[models.List]:
-    """Retrieves all lists belonging to a specific user."""
-    return db.query(models.List).options(joinedload(models.List.items)).filter(
+def get_lists_by_user(db: Session, user_id: int, skip: int = 0, limit: int = 100) -> List[models.List]:
+    """Retrieves a page of the lists belonging to a specific user, ordered by name."""
+    # selectinload fetches all items in one IN query instead of repeating each list row per item
+    return db.query(models.List).options(*_list_load_options(selectinload(models.List.items))).filter(
         models.List.user_id == user_id
-    ).order_by(models.List.name).all()
+    ).order_by(models.List.name).offset(skip).limit(limit).all()
 
 def update_list(db: Session, list_id: int, list_data: schemas.ListUpdate, user_id: int) -> Optional[models.List]:
     """Updates a list, ensuring it belongs to the user."""
@@ -1262,7 +1406,7 @@ def update_list(db: Session, list_id: int, list_data: schemas.ListUpdate, user_i
         logger.warning(f"Attempt to update non-existent or unauthorized list {list_id} by user {user_id}")
         return None
 
-    update_data = list_data.model_dump(exclude_unset=True)
+    update_data = _set_fields(list_data)
     for key, value in update_data.items():
         setattr(db_list, key, value)
 
@@ -1301,6 +1445,31 @@ def create_list_item(db: Session, item_data: schemas.ListItemCreate, list_id: in
     logger.info(f"Created item {db_item.id} in list {list_id} for user {user_id}")
     return db_item
 
+def bulk_create_list_items(db: Session, items: List[schemas.ListItemCreate], list_id: int, user_id: int) -> List[Dict[str, Any]]:
+    """Creates several items in a list owned by the user with one INSERT ... RETURNING round
+    trip. Returns the new rows as mappings in input order. Raises NotFound if the list isn't
+    the user's."""
+    list_exists = db.query(models.List.id).filter(
+        models.List.id == list_id,
+        models.List.user_id == user_id
+    ).first()
+    if not list_exists:
+        logger.warning(f"Attempt to bulk create items in non-existent or unauthorized list {list_id} by user {user_id}")
+        raise crud_errors.NotFound("Parent list not found or not owned by user")
+    if not items:
+        return []
+
+    list_items_table = models.ListItem.__table__
+    rows = [{**item.model_dump(), "list_id": list_id} for item in items]
+    # Core insert so the returned rows are plain mappings; ORM objects would be expired by
+    # the commit and reloaded one SELECT at a time during serialization
+    created = db.execute(
+        insert(list_items_table).returning(*list_items_table.c, sort_by_parameter_order=True), rows
+    ).mappings().all()
+    db.commit()
+    logger.info(f"Bulk created {len(created)} items in list {list_id} for user {user_id}")
+    return [dict(row) for row in created]
+
 def update_list_item(db: Session, item_id: int, item_data: schemas.ListItemUpdate, user_id: int) -> Optional[Union[models.ListItem, str]]:
     """Updates a list item, ensuring the user owns the parent list."""
     # Query the item and join with the list to check ownership in one go
@@ -1313,7 +1482,7 @@ def update_list_item(db: Session, item_id: int, item_data: schemas.ListItemUpdat
         logger.warning(f"Attempt to update non-existent or unauthorized list item {item_id} by user {user_id}")
         return "item_not_found"
 
-    update_data = item_data.model_dump(exclude_unset=True)
+    update_data = _set_fields(item_data)
     for key, value in update_data.items():
         setattr(db_item, key, value)
 
@@ -1360,7 +1529,7 @@ def update_user_ms_oid(db: Session, user_id: int, ms_oid: str):
 # --- Add function to update device token ---
 def update_user_device_token(db: Session, user_id: int, device_token: str) -> Optional[models.User]:
     """Update the device token for a given user."""
-    db_user = db.query(models.User).filter(models.User.id == user_id).first()
+    db_user = db.get(models.User, user_id) # Identity-map lookup; no SELECT if already loaded
     if db_user:
         db_user.device_token = device_token
         db.commit()
@@ -0,0 +1,45 @@
+from typing import Optional
+
+# Errors raised by CRUD functions instead of returning error-code strings. main.py turns any
+# CrudError into a JSON error response with the class's status_code and the detail message,
+# so routes only handle the success path.
+
+class CrudError(Exception):
+    status_code = 400
+    detail = "Invalid request"
+
+    def __init__(self, detail: Optional[str] = None):
+        if detail is not None:
+            self.detail = detail
+        super().__init__(self.detail)
+
+class NotFound(CrudError):
+    status_code = 404
+    detail = "Not found or not owned by user"
+
+class InvalidTask(CrudError):
+    detail = "Task not found or not owned by user"
+
+class InvalidRelativeTask(CrudError):
+    detail = "Relative task not found or not owned by user"
+
+class InvalidFile(CrudError):
+    detail = "File not found or not owned by user"
+
+class InvalidContact(CrudError):
+    detail = "Contact not found or not owned by user"
+
+class InvalidProject(CrudError):
+    detail = "Project not found or not owned by user"
+
+class InvalidCategory(CrudError):
+    detail = "Category not found or not owned by user"
+
+class InvalidRule(CrudError):
+    detail = "Invalid or missing recurrence rule for recurring reminder"
+
+class ReminderInactive(CrudError):
+    detail = "Reminder is already inactive"
+
+class SelfDependency(CrudError):
+    detail = "Project cannot depend on itself"
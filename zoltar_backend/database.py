@@ -1,19 +1,15 @@
-import os
 import logging # Import logging
 from sqlalchemy import create_engine, text # Add text for diagnostic query
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
-from dotenv import load_dotenv
+from app_settings import settings
 
 # Get a logger instance
 # The basicConfig in main.py should allow these messages to appear
 db_module_logger = logging.getLogger(__name__)
 
-# Load environment variables from .env file (optional, good for local dev)
-load_dotenv()
-
 # --- Get DATABASE_URL from environment variable ---
-DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./zoltar.db")
+DATABASE_URL = settings.DATABASE_URL
 db_module_logger.info(f"database.py: DATABASE_URL read from environment: '{DATABASE_URL}'") # ADDED LOGGING
 
 # --- Adjust engine creation based on URL ---
@@ -21,12 +17,21 @@ engine = None # Initialize engine
 
 if DATABASE_URL.startswith("postgresql"):
     db_module_logger.info("database.py: Configuring engine for PostgreSQL (no explicit sslmode).") # MODIFIED LOG
-    engine = create_engine(DATABASE_URL) # REMOVED connect_args
+    engine = create_engine(
+        DATABASE_URL,
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT_SECONDS,
+        pool_pre_ping=True, # Transparently replace connections dropped while idle
+        pool_recycle=settings.DB_POOL_RECYCLE_SECONDS,
+        query_cache_size=settings.DB_QUERY_CACHE_SIZE
+    ) # REMOVED connect_args
 
 elif DATABASE_URL: # Modified to ensure engine is always assigned if DATABASE_URL is not empty
     db_module_logger.info(f"database.py: Configuring engine for non-PostgreSQL (e.g., SQLite). Current DATABASE_URL: '{DATABASE_URL}'") # ADDED LOGGING
     engine = create_engine(
-        DATABASE_URL, connect_args={"check_same_thread": False}
+        DATABASE_URL, connect_args={"check_same_thread": False},
+        query_cache_size=settings.DB_QUERY_CACHE_SIZE
     )
 else: # Handle case where DATABASE_URL is empty after os.getenv (if default was removed)
     db_module_logger.error("database.py: DATABASE_URL is empty. Cannot create engine.")
@@ -39,10 +44,14 @@ if engine is None:
     raise RuntimeError("SQLAlchemy engine could not be initialized.")
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+# Sessions for background jobs; loaded rows stay usable after commit without being re-fetched
+JobSessionLocal = sessionmaker(autocommit=False, autoflush=False, expire_on_commit=False, bind=engine)
 
 Base = declarative_base()
 
 # Dependency to get DB session
+# Kept a sync generator: FastAPI runs it in the threadpool, so db.close() (which returns the
+# connection to the pool and may roll back) never blocks the event loop.
 def get_db():
     db = SessionLocal()
     try:
@@ -0,0 +1,12 @@
+from typing import Annotated
+
+from fastapi import Depends
+from sqlalchemy.orm import Session
+
+import auth
+import models
+from database import get_db
+
+# Shared route parameter types, e.g. `def read_contacts(db: DB, current_user: CurrentUser)`
+DB = Annotated[Session, Depends(get_db)]
+CurrentUser = Annotated[models.User, Depends(auth.get_current_active_user)]
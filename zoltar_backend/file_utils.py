@@ -1,9 +1,13 @@
+import codecs
 import logging
 import os
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
 from typing import Optional
 from pathlib import Path
 
 # Import specific libraries for file types
+import pymupdf
 from pypdf import PdfReader
 from docx import Document
 
@@ -11,6 +15,44 @@ logger = logging.getLogger(__name__)
 
 SUPPORTED_EXTENSIONS = {".txt", ".pdf", ".docx"}
 
+# pypdf fallback: PDFs at or above this page count are extracted in parallel worker processes.
+# Below it, process startup costs more than it saves.
+PARALLEL_PDF_PAGE_THRESHOLD = 50
+PDF_PAGES_PER_CHUNK = 5
+
+def _extract_range(path: str, start: int, end: int) -> str:
+    """Extracts text from pages [start:end] of a PDF. Runs in a worker process,
+    so it re-opens the file rather than receiving a reader object."""
+    reader = PdfReader(path)
+    parts = []
+    for page in reader.pages[start:end]:
+        page_text = page.extract_text()
+        if page_text:
+            parts.append(page_text + "\n") # Add newline between pages
+    return "".join(parts)
+
+def _extract_pdf_with_pypdf(path: Path) -> tuple[str, int]:
+    """Extracts PDF text with pypdf. Returns (text, page_count)."""
+    reader = PdfReader(path)
+    page_count = len(reader.pages)
+    if page_count < PARALLEL_PDF_PAGE_THRESHOLD:
+        text = _extract_range(str(path), 0, page_count)
+    else:
+        # Split into fixed-size page windows and extract them across processes;
+        # results are collected by chunk index to preserve page order.
+        ranges = [(start, min(start + PDF_PAGES_PER_CHUNK, page_count))
+                  for start in range(0, page_count, PDF_PAGES_PER_CHUNK)]
+        parts = [""] * len(ranges)
+        with ProcessPoolExecutor(max_workers=os.cpu_count()) as executor:
+            futures = {
+                executor.submit(_extract_range, str(path), start, end): chunk_id
+                for chunk_id, (start, end) in enumerate(ranges)
+            }
+            for future, chunk_id in futures.items():
+                parts[chunk_id] = future.result()
+        text = "".join(parts)
+    return text, page_count
+
 def extract_text_from_file(file_path: str) -> Optional[str]:
     """Extracts text content from supported file types (txt, pdf, docx).
 
@@ -21,50 +63,65 @@ def extract_text_from_file(file_path: str) -> Optional[str]:
         The extracted text content as a string, or None if the file is 
         not found, not supported, or extraction fails.
     """
-    logger.info(f"Attempting to extract text from: {file_path}")
+    logger.info("Attempting to extract text from: %s", file_path)
     path = Path(file_path)
     
     if not path.is_file():
-        logger.error(f"File not found at path: {file_path}")
+        logger.error("File not found at path: %s", file_path)
         return None
 
     file_extension = path.suffix.lower()
 
     if file_extension not in SUPPORTED_EXTENSIONS:
-        logger.warning(f"Unsupported file type for text extraction: {file_extension}")
+        logger.warning("Unsupported file type for text extraction: %s", file_extension)
         return None
 
+    # Cache key includes mtime and size so a modified file is re-extracted
+    stat = path.stat()
+    return _extract_cached(str(path.resolve()), stat.st_mtime_ns, stat.st_size)
+
+# Extracted text keyed by (path, mtime_ns, size); avoids re-parsing the same file
+# for repeated summarize/association requests.
+@lru_cache(maxsize=64)
+def _extract_cached(path_str: str, mtime_ns: int, size: int) -> Optional[str]:
+    path = Path(path_str)
+    file_extension = path.suffix.lower()
     try:
         if file_extension == ".txt":
-            # Try common encodings
+            # Read once in a single block, then try common encodings in memory
+            data = path.read_bytes()
             try:
-                with open(path, 'r', encoding='utf-8') as f:
-                    text = f.read()
+                if data.startswith((codecs.BOM_UTF16_LE, codecs.BOM_UTF16_BE)):
+                    text = data.decode('utf-16')
+                else:
+                    text = data.decode('utf-8-sig') # Also strips a UTF-8 BOM if present
             except UnicodeDecodeError:
-                logger.warning(f"UTF-8 decoding failed for {file_path}, trying latin-1.")
-                with open(path, 'r', encoding='latin-1') as f:
-                    text = f.read()
-            logger.info(f"Successfully extracted text from TXT file: {file_path}")
+                logger.warning("UTF-8 decoding failed for %s, trying latin-1.", path_str)
+                text = data.decode('latin-1', errors='replace')
+            logger.info("Successfully extracted text from TXT file: %s", path_str)
             return text
 
         elif file_extension == ".pdf":
-            reader = PdfReader(path)
-            text = ""
-            for page in reader.pages:
-                page_text = page.extract_text()
-                if page_text:
-                    text += page_text + "\n" # Add newline between pages
-            logger.info(f"Successfully extracted text from PDF file: {file_path} ({len(reader.pages)} pages)")
+            try:
+                with pymupdf.open(path) as doc:
+                    parts = [page.get_text() for page in doc]
+                    page_count = doc.page_count
+                text = "".join(parts)
+            except Exception as e:
+                # MuPDF rejects some malformed files that pypdf can still read
+                logger.warning("PyMuPDF failed for %s (%s), falling back to pypdf.", path_str, e)
+                text, page_count = _extract_pdf_with_pypdf(path)
+            logger.info("Successfully extracted text from PDF file: %s (%s pages)", path_str, page_count)
             return text
 
         elif file_extension == ".docx":
             document = Document(path)
-            text = "\n".join([para.text for para in document.paragraphs])
-            logger.info(f"Successfully extracted text from DOCX file: {file_path}")
+            text = "\n".join(para.text for para in document.paragraphs)
+            logger.info("Successfully extracted text from DOCX file: %s", path_str)
             return text
 
     except Exception as e:
-        logger.error(f"Error extracting text from {file_path} (type: {file_extension}): {e}", exc_info=True)
+        logger.error("Error extracting text from %s (type: %s): %s", path_str, file_extension, e, exc_info=True)
         return None
 
     # Should not be reached if extension is supported
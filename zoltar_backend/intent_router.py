@@ -0,0 +1,35 @@
+import re
+from typing import Any, Dict, Optional
+
+# Deterministic first pass for chat messages that don't need the LLM to be understood.
+# Patterns must match the whole message, so "hi, remind me to ..." still goes to the LLM.
+
+_END = r"[\s!.?,]*$"
+
+# Intent -> pattern for messages with no entities
+STATIC_PATTERNS = {
+    "general_greeting": re.compile(
+        r"^\s*(hi|hello|hey|hiya|yo|greetings|good (morning|afternoon|evening))( (there|zoltar))?" + _END,
+        re.IGNORECASE,
+    ),
+    "acknowledgement": re.compile(
+        r"^\s*(thanks|thank you|thx|ty|ok|okay|cool|great|got it|perfect)( (so much|a lot|zoltar))?" + _END,
+        re.IGNORECASE,
+    ),
+}
+
+_FILE_SUMMARY_RE = re.compile(
+    r"^\s*(summari[sz]e|show( me)?( a)? summary of) file( id)? #?(?P<file_id>\d+)" + _END,
+    re.IGNORECASE,
+)
+
+def classify(text: str) -> Optional[Dict[str, Any]]:
+    """Returns {"intent", "entities"} for messages matched by a static pattern, or None if the
+    message needs LLM intent extraction."""
+    for intent, pattern in STATIC_PATTERNS.items():
+        if pattern.match(text):
+            return {"intent": intent, "entities": {}}
+    match = _FILE_SUMMARY_RE.match(text)
+    if match:
+        return {"intent": "request_file_summary", "entities": {"file_id": int(match.group("file_id"))}}
+    return None
@@ -1,39 +1,55 @@
 import google.generativeai as genai
-import os
+import asyncio
 import json
 import logging
-from typing import Dict, Any, Optional
-from datetime import datetime
+import copy
+import hashlib
+import re
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Dict, Any, List, Optional
+from datetime import datetime, date
+from pydantic import BaseModel, ValidationError
+import orjson
+
+from app_settings import settings
+from redis_client import get_redis
 
 logger = logging.getLogger(__name__)
 
 # Configure the client. It will automatically pick up GOOGLE_API_KEY from env
 # Read Google API Key from file path
-GOOGLE_API_KEY_PATH = os.getenv("GOOGLE_API_KEY_PATH", "/secrets/google/key")
+GOOGLE_API_KEY_PATH = settings.GOOGLE_API_KEY_PATH
 GOOGLE_API_KEY = None
 try:
     with open(GOOGLE_API_KEY_PATH, 'r') as f:
         GOOGLE_API_KEY = f.read().strip()
     if not GOOGLE_API_KEY:
-        logger.error(f"Google API key file {GOOGLE_API_KEY_PATH} is empty.")
+        logger.error("Google API key file %s is empty.", GOOGLE_API_KEY_PATH)
     else:
         genai.configure(api_key=GOOGLE_API_KEY)
         logger.info("Google Generative AI configured successfully using key from file.")
 except FileNotFoundError:
-    logger.error(f"Google API key file not found at {GOOGLE_API_KEY_PATH}. Ensure GOOGLE_API_KEY_PATH env var is set and secret is mounted.")
+    logger.error("Google API key file not found at %s. Ensure GOOGLE_API_KEY_PATH env var is set and secret is mounted.", GOOGLE_API_KEY_PATH)
 except Exception as e:
-    logger.error(f"Error configuring Google Generative AI from key file {GOOGLE_API_KEY_PATH}: {e}")
+    logger.error("Error configuring Google Generative AI from key file %s: %s", GOOGLE_API_KEY_PATH, e)
 
 # Specify the model - using the user-requested identifier
 MODEL_NAME = "gemini-2.0-flash"
 
-def create_structured_prompt(user_text: str) -> str:
-    """Creates a prompt asking the LLM to extract intent and entities into JSON."""
-    # Improved prompt for better JSON formatting and intent/entity identification
-    # Added explicit instruction for ISO 8601 datetime parsing
-    prompt = f"""
+@lru_cache(maxsize=4)
+def _get_model(name: str = MODEL_NAME) -> genai.GenerativeModel:
+    """Returns a shared GenerativeModel so the client is not rebuilt on every request."""
+    return genai.GenerativeModel(name)
+
+# Static instructions and few-shot examples for intent extraction. Built once at import;
+# only the user request suffix changes between calls.
+INTENT_PROMPT_PREFIX = """
 Analyze the following user request and identify the primary intent and any relevant entities. 
 Return the result ONLY as a valid JSON object with two keys: "intent" (string) and "entities" (object). 
+For the "ask_general_question" intent only, add a third key "response_text" (string) containing a concise answer to the question.
+If the request asks for several separate actions at once (e.g. two reminders, or a reminder and a task), use the intent "batch_intents" with a single entity "intents": a list holding one {"intent", "entities"} object per action.
 
 The "intent" should be a concise snake_case string representing the user's goal (e.g., "create_task", "get_project_summary", "set_reminder", "ask_general_question").
 
@@ -43,50 +59,75 @@ The "entities" object should contain key-value pairs for relevant information ex
 
 Examples:
 User request: "Remind me to take out the trash tomorrow at 7pm"
-Output: {{"intent": "create_reminder", "entities": {{"description": "Take out the trash", "datetime_description": "tomorrow at 7pm", "trigger_datetime_iso": "2024-08-16T19:00:00"}}}}
+Output: {"intent": "create_reminder", "entities": {"description": "Take out the trash", "datetime_description": "tomorrow at 7pm", "trigger_datetime_iso": "2024-08-16T19:00:00"}}
 
 User request: "Set a task to finish the report by Friday"
-Output: {{"intent": "create_task", "entities": {{"title": "finish the report", "datetime_description": "by Friday", "due_date_iso": "2024-08-16T23:59:59"}}}}
+Output: {"intent": "create_task", "entities": {"title": "finish the report", "datetime_description": "by Friday", "due_date_iso": "2024-08-16T23:59:59"}}
 
 User request: "What is the status of the Project X?"
-Output: {{"intent": "get_project_status", "entities": {{"project_name": "Project X"}}}}
+Output: {"intent": "get_project_status", "entities": {"project_name": "Project X"}}
 
 User request: "Add milk and eggs to my grocery list"
-Output: {{"intent": "add_to_list", "entities": {{"list_name": "grocery", "items": ["milk", "eggs"]}}}}
+Output: {"intent": "add_to_list", "entities": {"list_name": "grocery", "items": ["milk", "eggs"]}}
 
 User request: "Upload the meeting notes file"
-Output: {{"intent": "upload_file", "entities": {{"file_description": "meeting notes"}}}}
+Output: {"intent": "upload_file", "entities": {"file_description": "meeting notes"}}
 
 User request: "hello there"
-Output: {{"intent": "general_greeting", "entities": {{}}}}
+Output: {"intent": "general_greeting", "entities": {}}
 
 User request: "What's the capital of France?"
-Output: {{"intent": "ask_general_question", "entities": {{"query": "What's the capital of France?"}}}}
+Output: {"intent": "ask_general_question", "entities": {"query": "What's the capital of France?"}, "response_text": "The capital of France is Paris."}
 
-User request: "summarize file ID 6"
-Output: {{"intent": "request_file_summary", "entities": {{"file_id": 6}}}}
+User request: "Remind me to call mom at 5pm today and create a task to book flights"
+Output: {"intent": "batch_intents", "entities": {"intents": [{"intent": "create_reminder", "entities": {"description": "Call mom", "datetime_description": "at 5pm today", "trigger_datetime_iso": "2024-08-15T17:00:00"}}, {"intent": "create_task", "entities": {"title": "book flights"}}]}}
 
-User request: "Can you give me a summary of file 12?"
-Output: {{"intent": "request_file_summary", "entities": {{"file_id": 12}}}}
+User request: "summarize file ID 6"
+Output: {"intent": "request_file_summary", "entities": {"file_id": 6}}
 
 User request: "associate file 7 with task 15"
-Output: {{"intent": "associate_file", "entities": {{"file_id": 7, "target_type": "task", "target_id": 15}}}}
+Output: {"intent": "associate_file", "entities": {"file_id": 7, "target_type": "task", "target_id": 15}}
 
 User request: "link file id 3 to project 9"
-Output: {{"intent": "associate_file", "entities": {{"file_id": 3, "target_type": "project", "target_id": 9}}}}
+Output: {"intent": "associate_file", "entities": {"file_id": 3, "target_type": "project", "target_id": 9}}
 
 User request: "attach file 5 to the report task (ID 22)"
-Output: {{"intent": "associate_file", "entities": {{"file_id": 5, "target_type": "task", "target_id": 22}}}}
+Output: {"intent": "associate_file", "entities": {"file_id": 5, "target_type": "task", "target_id": 22}}
+
+"""
 
----
+def create_structured_prompt(user_text: str) -> str:
+    """Creates a prompt asking the LLM to extract intent and entities into JSON."""
+    return INTENT_PROMPT_PREFIX + _intent_prompt_suffix(user_text)
+
+def _intent_prompt_suffix(user_text: str) -> str:
+    """The per-request part of the intent prompt."""
+    return f"""---
 User request: "{user_text}"
 Output: 
 """
-    return prompt
+
+# --- Intent extraction cache ---
+# Identical requests (after normalization) return the same intent/entities within a day,
+# so repeat phrases skip the LLM round-trip. Requests with time-relative words are not
+# cached since their extracted datetimes depend on when they were sent. Stored in Redis
+# when configured (shared across workers), otherwise in a per-process LRU.
+INTENT_CACHE_MAX_SIZE = 1024
+INTENT_CACHE_TTL_SECONDS = 4 * 3600 # Redis only; keys also roll over daily
+_intent_cache: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+_intent_cache_lock = threading.Lock()
+_TIME_RELATIVE_RE = re.compile(
+    r"\b(now|today|tonight|tomorrow|yesterday|next|ago|in \d+|\d{1,2}(:\d{2})?\s*(am|pm)|"
+    r"monday|tuesday|wednesday|thursday|friday|saturday|sunday|morning|afternoon|evening)\b",
+    re.IGNORECASE,
+)
+_UNCACHEABLE_INTENTS = {"llm_api_error", "llm_parse_error", "unknown_or_malformed"}
 
 def extract_intent_entities(text: str) -> Optional[Dict[str, Any]]:
     """
-    Sends text to the Gemini model to extract intent and entities.
+    Sends text to the Gemini model to extract intent and entities, reusing a
+    cached result for repeated requests where possible. Blocking; async callers
+    should use extract_intent_entities_async.
 
     Args:
         text: The user's input text.
@@ -95,53 +136,141 @@ def extract_intent_entities(text: str) -> Optional[Dict[str, Any]]:
         A dictionary containing 'intent' and 'entities' if successful,
         None otherwise.
     """
+    cache_key = _intent_cache_key(text)
+    cached = _get_cached_intent(cache_key)
+    if cached is not None:
+        return cached
+    result = _extract_intent_entities_uncached(text)
+    _store_cached_intent(cache_key, result)
+    return result
+
+async def extract_intent_entities_async(text: str) -> Optional[Dict[str, Any]]:
+    """Async version of extract_intent_entities; does not block the event loop."""
+    cache_key = _intent_cache_key(text)
+    cached = _get_cached_intent(cache_key)
+    if cached is not None:
+        return cached
+    result = await _extract_intent_entities_uncached_async(text)
+    _store_cached_intent(cache_key, result)
+    return result
+
+def _intent_cache_key(text: str) -> Optional[str]:
+    """Returns the cache key for a request, or None if it should not be cached."""
+    if _TIME_RELATIVE_RE.search(text):
+        return None
+    normalized = " ".join(text.lower().split())
+    digest = hashlib.sha256(f"{date.today().isoformat()}:{normalized}".encode()).hexdigest()
+    return f"intent:{digest}"
+
+def _get_cached_intent(cache_key: Optional[str]) -> Optional[Dict[str, Any]]:
+    if cache_key is None:
+        return None
+    redis_conn = get_redis()
+    if redis_conn is not None:
+        try:
+            raw = redis_conn.get(cache_key)
+        except Exception as e:
+            logger.warning("Failed to read intent from Redis: %s", e)
+            return None
+        if raw is None:
+            return None
+        logger.debug("Intent cache hit for: %s", cache_key)
+        return orjson.loads(raw) # A fresh dict per call, so callers may mutate it
+    with _intent_cache_lock:
+        cached = _intent_cache.get(cache_key)
+        if cached is not None:
+            _intent_cache.move_to_end(cache_key)
+    if cached is None:
+        return None
+    logger.debug("Intent cache hit for: %s", cache_key)
+    # Callers mutate the entities dict, so never hand out the cached object itself
+    return copy.deepcopy(cached)
+
+def _store_cached_intent(cache_key: Optional[str], result: Optional[Dict[str, Any]]) -> None:
+    if cache_key is None or result is None or result.get("intent") in _UNCACHEABLE_INTENTS:
+        return
+    redis_conn = get_redis()
+    if redis_conn is not None:
+        try:
+            redis_conn.setex(cache_key, INTENT_CACHE_TTL_SECONDS, orjson.dumps(result))
+        except Exception as e:
+            logger.warning("Failed to write intent to Redis: %s", e)
+        return
+    with _intent_cache_lock:
+        _intent_cache[cache_key] = copy.deepcopy(result)
+        if len(_intent_cache) > INTENT_CACHE_MAX_SIZE:
+            _intent_cache.popitem(last=False)
+
+# Force JSON output for intent extraction
+INTENT_GENERATION_CONFIG = genai.types.GenerationConfig(
+    response_mime_type="application/json"
+)
+
+def _extract_intent_entities_uncached(text: str) -> Optional[Dict[str, Any]]:
+    """Sends text to the Gemini model to extract intent and entities."""
     if not GOOGLE_API_KEY:
         logger.error("LLM function called but GOOGLE_API_KEY is not set.")
         return None
-        
+
     try:
-        model = genai.GenerativeModel(MODEL_NAME)
-        prompt = create_structured_prompt(text)
-        
-        # Set generation config to force JSON output
-        generation_config = genai.types.GenerationConfig(
-            response_mime_type="application/json" 
-        )
-        
-        response = model.generate_content(
-            prompt,
-            generation_config=generation_config
+        response = _get_model().generate_content(
+            create_structured_prompt(text),
+            generation_config=INTENT_GENERATION_CONFIG
         )
+        raw_text = response.text
+    except Exception as e:
+        return _intent_api_error(e)
+    return _parse_intent_response(raw_text)
 
-        # Debug: Log raw response text
-        logger.debug(f"Raw LLM Response Text: {response.text}")
+async def _extract_intent_entities_uncached_async(text: str) -> Optional[Dict[str, Any]]:
+    """Async version of _extract_intent_entities_uncached."""
+    if not GOOGLE_API_KEY:
+        logger.error("LLM function called but GOOGLE_API_KEY is not set.")
+        return None
 
-        # The response text should be a JSON string already due to response_mime_type
-        parsed_response = json.loads(response.text)
-        
-        # Basic validation of the expected structure
-        if (isinstance(parsed_response, dict) and 
-            "intent" in parsed_response and 
-            "entities" in parsed_response and 
-            isinstance(parsed_response["intent"], str) and 
-            isinstance(parsed_response["entities"], dict)):
-            logger.info(f"Successfully extracted intent: {parsed_response['intent']}")
-            return parsed_response
-        else:
-            logger.warning(f"LLM response did not match expected JSON structure: {parsed_response}")
-            # Fallback: Maybe treat as a general query?
-            return {"intent": "unknown_or_malformed", "entities": {"raw_response": response.text}}
-            
-    except json.JSONDecodeError as json_err:
-        logger.error(f"Failed to decode LLM JSON response: {json_err}")
-        logger.error(f"LLM Raw Text was: {response.text if 'response' in locals() else 'N/A'}")
-        return {"intent": "llm_parse_error", "entities": {"error": str(json_err), "raw_response": response.text if 'response' in locals() else 'N/A'}}
+    try:
+        response = await _get_model().generate_content_async(
+            create_structured_prompt(text),
+            generation_config=INTENT_GENERATION_CONFIG
+        )
+        raw_text = response.text
     except Exception as e:
-        # Catch specific API errors if possible from the library
-        logger.error(f"Error calling Gemini API: {e}", exc_info=True)
-        # Check for specific google API errors if the library provides them
-        # Example: if isinstance(e, google.api_core.exceptions.GoogleAPICallError): ...
-        return {"intent": "llm_api_error", "entities": {"error": str(e)}}
+        return _intent_api_error(e)
+    return _parse_intent_response(raw_text)
+
+def _intent_api_error(e: Exception) -> Dict[str, Any]:
+    # Catch specific API errors if possible from the library
+    logger.error("Error calling Gemini API: %s", e, exc_info=True)
+    # Check for specific google API errors if the library provides them
+    # Example: if isinstance(e, google.api_core.exceptions.GoogleAPICallError): ...
+    return {"intent": "llm_api_error", "entities": {"error": str(e)}}
+
+class IntentEntities(BaseModel):
+    """Expected shape of the model's intent extraction output."""
+    intent: str
+    entities: Dict[str, Any]
+    # Answer produced in the same call for intents that need no backend action (general questions)
+    response_text: Optional[str] = None
+
+def _parse_intent_response(raw_text: str) -> Dict[str, Any]:
+    """Parses and validates the JSON returned by the model for intent extraction."""
+    # Debug: Log raw response text
+    logger.debug("Raw LLM Response Text: %s", raw_text)
+
+    # Parse and validate in one pass; the response text should already be JSON due to response_mime_type
+    try:
+        parsed_response = IntentEntities.model_validate_json(raw_text)
+    except ValidationError as e:
+        if any(err["type"] == "json_invalid" for err in e.errors()):
+            logger.error("Failed to decode LLM JSON response: %s", e)
+            logger.error("LLM Raw Text was: %s", raw_text)
+            return {"intent": "llm_parse_error", "entities": {"error": str(e), "raw_response": raw_text}}
+        logger.warning("LLM response did not match expected JSON structure: %s", raw_text)
+        # Fallback: Maybe treat as a general query?
+        return {"intent": "unknown_or_malformed", "entities": {"raw_response": raw_text}}
+
+    logger.info("Successfully extracted intent: %s", parsed_response.intent)
+    return parsed_response.model_dump(exclude_none=True)
 
 def generate_response_text(intent: str, entities: dict, action_result: Any = None) -> str:
     """Generates a user-facing natural language response based on intent and action results.
@@ -154,8 +283,202 @@ def generate_response_text(intent: str, entities: dict, action_result: Any = Non
     Returns:
         A user-friendly string response.
     """
-    logger.debug(f"Generating response for intent: {intent}, entities: {entities}")
+    logger.debug("Generating response for intent: %s, entities: %s", intent, entities)
     
+    error_response = _error_response_text(intent, entities)
+    if error_response is not None:
+        return error_response
+    
+    # Check for warnings (non-blocking errors)
+    warning_type = entities.get("warning")
+    warning_msg = ""
+    if warning_type == "datetime_parse_error":
+        failed_value = entities.get("value", "the date/time")
+        warning_msg = f"(Warning: I couldn't understand '{failed_value}' as a date/time, so I proceeded without it.) "
+        
+    # --- Intent-specific success/fallback logic ---
+    handler = RESPONSE_HANDLERS.get(intent, _resp_default)
+    return handler(intent, entities, warning_msg)
+
+# --- Intent response handlers ---
+
+@lru_cache(maxsize=512)
+def _fmt_iso(iso: str) -> str:
+    """Formats an ISO datetime string for display. Raises ValueError if it can't be parsed."""
+    # Simple formatting, consider user preferences later
+    return datetime.fromisoformat(iso).strftime('%Y-%m-%d %H:%M')
+
+def _resp_create_reminder(intent: str, entities: dict, warning_msg: str) -> str:
+    created_id = entities.get("created_reminder_id")
+    desc = entities.get("created_description")
+    dt_iso = entities.get("created_trigger_datetime")
+    if created_id and desc and dt_iso:
+        try:
+            formatted_dt = _fmt_iso(dt_iso)
+            return f"OK. I've created reminder {created_id}: '{desc}' due on {formatted_dt}."
+        except ValueError:
+             logger.error("Failed to re-parse created_trigger_datetime '%s' for response.", dt_iso)
+             # Fallback if re-parsing fails (shouldn't happen)
+             return f"OK. I've created reminder {created_id}: '{desc}'."
+    else:
+        # If creation didn't happen (e.g., due to prior error caught above)
+        return "Sorry, I wasn't able to create the reminder. Please try again or check the details."
+
+def _resp_create_task(intent: str, entities: dict, warning_msg: str) -> str:
+    created_id = entities.get("created_task_id")
+    title = entities.get("created_title")
+    desc = entities.get("created_description")
+    due_date_iso = entities.get("created_due_date")
+    if created_id and title:
+        base_response = f"OK. I've created task {created_id}: '{title}'."
+        if desc:
+            base_response += f" Description: '{desc}'."
+        if due_date_iso:
+             try:
+                 base_response += f" Due: {_fmt_iso(due_date_iso)}."
+             except ValueError:
+                 logger.error("Failed to re-parse created_due_date '%s' for response.", due_date_iso)
+        # Prepend warning if it exists
+        return warning_msg + base_response
+    else:
+        # If creation didn't happen
+        return warning_msg + "Sorry, I wasn't able to create the task. Please try again or check the details."
+
+def _resp_ask_general_question(intent: str, entities: dict, warning_msg: str) -> str:
+    query = entities.get("query")
+    if not query:
+        return "It looks like you asked a question, but I couldn't figure out what it was. Could you rephrase?"
+    # Call LLM again for the answer
+    if not GOOGLE_API_KEY:
+         logger.error("LLM API key not set, cannot answer general question.")
+         return "Sorry, I can't answer general questions right now due to a configuration issue."
+    try:
+        response = _get_model().generate_content(_general_question_prompt(query))
+        return _general_answer_from_response(response)
+    except Exception as e:
+        logger.error("Error calling Gemini API for general question: %s", e, exc_info=True)
+        return "Sorry, I encountered an error trying to answer your question."
+
+def _resp_general_greeting(intent: str, entities: dict, warning_msg: str) -> str:
+    # Simple hardcoded response
+    return "Hello there! How can I help you today?"
+
+def _resp_acknowledgement(intent: str, entities: dict, warning_msg: str) -> str:
+    return "You're welcome! Let me know if there's anything else I can help with."
+
+def _resp_llm_api_error(intent: str, entities: dict, warning_msg: str) -> str:
+    error_msg = entities.get('error', 'an unknown API error')
+    return f"Sorry, I encountered an issue communicating with the language model ({error_msg}). Please try again later."
+
+def _resp_llm_parse_error(intent: str, entities: dict, warning_msg: str) -> str:
+    return "Sorry, I received an unexpected response from the language model. Could you please rephrase your request?"
+
+def _resp_unknown_or_malformed(intent: str, entities: dict, warning_msg: str) -> str:
+    return "Sorry, I'm not sure I understood that. Could you try rephrasing your request?"
+
+# --- Handle Summarization Results --- 
+def _resp_request_file_summary(intent: str, entities: dict, warning_msg: str) -> str:
+    summarized_file_id = entities.get("summarized_file_id")
+    summary = entities.get("summary")
+    error_details = entities.get("details") # Check for specific errors passed from router
+    error_type = entities.get("error") # Reuse existing error check
+    
+    if error_type:
+        base_err_msg = f"Sorry, I couldn't summarize file {entities.get('file_id', 'the requested file')}."
+        if error_type == "summarization_failed":
+             return f"{base_err_msg} Reason: {error_details or 'Unknown failure from summary endpoint.'}"
+        elif error_type == "summarization_api_call_failed":
+             return f"{base_err_msg} Reason: Could not reach the summarization service."
+        elif error_type in ["summarization_bad_response_format", "summarization_unexpected_response"]:
+             return f"{base_err_msg} Reason: Received an unexpected response from the summarization service."
+        elif error_type == "summarization_unexpected_error":
+             return f"{base_err_msg} An unexpected internal error occurred."
+        elif error_type == "missing_or_invalid_entity":
+            return "Sorry, I couldn't understand which file ID you want to summarize. Please provide a valid number."
+        else:
+            # Fallback for other generic errors caught earlier
+            return base_err_msg
+    elif summarized_file_id and summary:
+        return f"Here is the summary for file {summarized_file_id}:\n\n{summary}"
+    else:
+        # Should not happen if action_performed=True was set correctly in router
+        return f"I understood you wanted to summarize file {entities.get('file_id', '...')}, but I don't have the result."
+
+# --- Handle File Association Results --- 
+def _resp_associate_file(intent: str, entities: dict, warning_msg: str) -> str:
+    details = entities.get("association_details", {})
+    error_type = entities.get("error")
+    error_details = entities.get("details")
+    file_id = details.get("file_id", "?")
+    target_type = details.get("target_type", "?")
+    target_id = details.get("target_id", "?")
+    
+    if error_type:
+        base_err_msg = f"Sorry, I couldn't associate file {file_id} with {target_type} {target_id}."
+        if error_type == "missing_or_invalid_entity":
+            return f"Sorry, I'm missing some information. {error_details or 'Please specify the file ID, target type (task/project), and target ID.'}"
+        elif error_type == "auth_error":
+            return f"{base_err_msg} Reason: {error_details or 'Authorization failed.'}"
+        elif error_type == "invalid_target":
+            return f"{base_err_msg} Reason: {error_details or 'Target not found or invalid.'}"
+        elif error_type == "not_found":
+            return f"{base_err_msg} Reason: {error_details or 'File not found.'}"
+        elif error_type == "crud_error":
+             return f"{base_err_msg} Reason: {error_details or 'Database error during association.'}"
+        elif error_type == "unexpected_error":
+            return f"{base_err_msg} Reason: An unexpected error occurred."
+        else:
+            return base_err_msg # Generic fallback
+    elif details.get("success"):
+        # Construct success message
+        linked_name = None
+        if target_type == "project":
+             linked_name = details.get("project_name")
+        elif target_type == "task":
+             linked_name = details.get("task_title")
+        
+        if linked_name:
+             return f"OK. File {file_id} is now associated with {target_type} {target_id} ('{linked_name}')."
+        else:
+             return f"OK. File {file_id} is now associated with {target_type} {target_id}."
+    else:
+         # Should not generally happen if logic is correct
+         return f"I understood you wanted to associate file {file_id} with {target_type} {target_id}, but I couldn't confirm the result."
+
+def _resp_batch_intents(intent: str, entities: dict, warning_msg: str) -> str:
+    results = entities.get("results")
+    if not results:
+        return "Sorry, I couldn't work out the separate requests in that message. Could you send them one at a time?"
+    # One sentence per item, generated exactly as if each had been sent on its own
+    return " ".join(
+        generate_response_text(result["intent"], result["entities"])
+        if result["intent"] != intent else "Sorry, I can't handle nested batches of requests."
+        for result in results
+    )
+
+def _resp_default(intent: str, entities: dict, warning_msg: str) -> str:
+    # Default fallback for unhandled intents
+    logger.warning("No specific response generation logic for intent: %s", intent)
+    return f"I understood your intent as '{intent}', but I don't have specific response logic for it yet."
+
+
+# Intent -> response handler. Each handler takes (intent, entities, warning_msg).
+RESPONSE_HANDLERS = {
+    "create_reminder": _resp_create_reminder,
+    "create_task": _resp_create_task,
+    "ask_general_question": _resp_ask_general_question,
+    "general_greeting": _resp_general_greeting,
+    "acknowledgement": _resp_acknowledgement,
+    "llm_api_error": _resp_llm_api_error,
+    "llm_parse_error": _resp_llm_parse_error,
+    "unknown_or_malformed": _resp_unknown_or_malformed,
+    "request_file_summary": _resp_request_file_summary,
+    "associate_file": _resp_associate_file,
+    "batch_intents": _resp_batch_intents,
+}
+
+def _error_response_text(intent: str, entities: dict) -> Optional[str]:
+    """Returns the response for blocking error flags set by the router, or None if there are none."""
     # Check for specific error flags first
     error_type = entities.get("error")
     if error_type == "missing_required_entities":
@@ -186,162 +509,31 @@ def generate_response_text(intent: str, entities: dict, action_result: Any = Non
         return f"Sorry, there was an issue trying to {operation} in the database."
     if error_type == "unexpected_error":
         return "Sorry, an unexpected error occurred while processing your request."
-    
-    # Check for warnings (non-blocking errors)
-    warning_type = entities.get("warning")
-    warning_msg = ""
-    if warning_type == "datetime_parse_error":
-        failed_value = entities.get("value", "the date/time")
-        warning_msg = f"(Warning: I couldn't understand '{failed_value}' as a date/time, so I proceeded without it.) "
-        
-    # --- Intent-specific success/fallback logic ---
-    if intent == "create_reminder":
-        created_id = entities.get("created_reminder_id")
-        desc = entities.get("created_description")
-        dt_iso = entities.get("created_trigger_datetime")
-        if created_id and desc and dt_iso:
-            try:
-                dt_obj = datetime.fromisoformat(dt_iso)
-                # Simple formatting, consider user preferences later
-                formatted_dt = dt_obj.strftime('%Y-%m-%d %H:%M') 
-                return f"OK. I've created reminder {created_id}: '{desc}' due on {formatted_dt}."
-            except ValueError:
-                 logger.error(f"Failed to re-parse created_trigger_datetime '{dt_iso}' for response.")
-                 # Fallback if re-parsing fails (shouldn't happen)
-                 return f"OK. I've created reminder {created_id}: '{desc}'."
-        else:
-            # If creation didn't happen (e.g., due to prior error caught above)
-            return "Sorry, I wasn't able to create the reminder. Please try again or check the details."
-
-    elif intent == "create_task":
-        created_id = entities.get("created_task_id")
-        title = entities.get("created_title")
-        desc = entities.get("created_description")
-        due_date_iso = entities.get("created_due_date")
-        if created_id and title:
-            base_response = f"OK. I've created task {created_id}: '{title}'."
-            if desc:
-                base_response += f" Description: '{desc}'."
-            if due_date_iso:
-                 try:
-                     dt_obj = datetime.fromisoformat(due_date_iso)
-                     formatted_dt = dt_obj.strftime('%Y-%m-%d %H:%M')
-                     base_response += f" Due: {formatted_dt}."
-                 except ValueError:
-                     logger.error(f"Failed to re-parse created_due_date '{due_date_iso}' for response.")
-            # Prepend warning if it exists
-            return warning_msg + base_response
-        else:
-            # If creation didn't happen
-            return warning_msg + "Sorry, I wasn't able to create the task. Please try again or check the details."
-
-    elif intent == "ask_general_question":
-        query = entities.get("query")
-        if not query:
-            return "It looks like you asked a question, but I couldn't figure out what it was. Could you rephrase?"
-        # Call LLM again for the answer
-        try:
-            if not GOOGLE_API_KEY:
-                 logger.error("LLM API key not set, cannot answer general question.")
-                 return "Sorry, I can't answer general questions right now due to a configuration issue."
-                 
-            model = genai.GenerativeModel(MODEL_NAME)
-            # Simple prompt for answering
-            response = model.generate_content(f"Answer the following question concisely: {query}")
-            answer = response.text
-            logger.info(f"Generated answer for general question: {answer[:100]}...")
-            return answer
-        except Exception as e:
-            logger.error(f"Error calling Gemini API for general question: {e}", exc_info=True)
-            return "Sorry, I encountered an error trying to answer your question."
-            
-    elif intent == "general_greeting":
-        # Simple hardcoded response
-        return "Hello there! How can I help you today?"
-
-    elif intent == "llm_api_error":
-        error_msg = entities.get('error', 'an unknown API error')
-        return f"Sorry, I encountered an issue communicating with the language model ({error_msg}). Please try again later."
-        
-    elif intent == "llm_parse_error":
-        return "Sorry, I received an unexpected response from the language model. Could you please rephrase your request?"
-        
-    elif intent == "unknown_or_malformed":
-        return "Sorry, I'm not sure I understood that. Could you try rephrasing your request?"
-
-    # --- Handle Summarization Results --- 
-    elif intent == "request_file_summary":
-        summarized_file_id = entities.get("summarized_file_id")
-        summary = entities.get("summary")
-        error_details = entities.get("details") # Check for specific errors passed from router
-        error_type = entities.get("error") # Reuse existing error check
-        
-        if error_type:
-            base_err_msg = f"Sorry, I couldn't summarize file {entities.get('file_id', 'the requested file')}."
-            if error_type == "summarization_failed":
-                 return f"{base_err_msg} Reason: {error_details or 'Unknown failure from summary endpoint.'}"
-            elif error_type == "summarization_api_call_failed":
-                 return f"{base_err_msg} Reason: Could not reach the summarization service."
-            elif error_type in ["summarization_bad_response_format", "summarization_unexpected_response"]:
-                 return f"{base_err_msg} Reason: Received an unexpected response from the summarization service."
-            elif error_type == "summarization_unexpected_error":
-                 return f"{base_err_msg} An unexpected internal error occurred."
-            elif error_type == "missing_or_invalid_entity":
-                return "Sorry, I couldn't understand which file ID you want to summarize. Please provide a valid number."
-            else:
-                # Fallback for other generic errors caught earlier
-                return base_err_msg
-        elif summarized_file_id and summary:
-            return f"Here is the summary for file {summarized_file_id}:\n\n{summary}"
-        else:
-            # Should not happen if action_performed=True was set correctly in router
-            return f"I understood you wanted to summarize file {entities.get('file_id', '...')}, but I don't have the result."
-
-    # --- Handle File Association Results --- 
-    elif intent == "associate_file":
-        details = entities.get("association_details", {})
-        error_type = entities.get("error")
-        error_details = entities.get("details")
-        file_id = details.get("file_id", "?")
-        target_type = details.get("target_type", "?")
-        target_id = details.get("target_id", "?")
-        
-        if error_type:
-            base_err_msg = f"Sorry, I couldn't associate file {file_id} with {target_type} {target_id}."
-            if error_type == "missing_or_invalid_entity":
-                return f"Sorry, I'm missing some information. {error_details or 'Please specify the file ID, target type (task/project), and target ID.'}"
-            elif error_type == "auth_error":
-                return f"{base_err_msg} Reason: {error_details or 'Authorization failed.'}"
-            elif error_type == "invalid_target":
-                return f"{base_err_msg} Reason: {error_details or 'Target not found or invalid.'}"
-            elif error_type == "not_found":
-                return f"{base_err_msg} Reason: {error_details or 'File not found.'}"
-            elif error_type == "crud_error":
-                 return f"{base_err_msg} Reason: {error_details or 'Database error during association.'}"
-            elif error_type == "unexpected_error":
-                return f"{base_err_msg} Reason: An unexpected error occurred."
-            else:
-                return base_err_msg # Generic fallback
-        elif details.get("success"):
-            # Construct success message
-            linked_name = None
-            if target_type == "project":
-                 linked_name = details.get("project_name")
-            elif target_type == "task":
-                 linked_name = details.get("task_title")
-            
-            if linked_name:
-                 return f"OK. File {file_id} is now associated with {target_type} {target_id} ('{linked_name}')."
-            else:
-                 return f"OK. File {file_id} is now associated with {target_type} {target_id}."
-        else:
-             # Should not generally happen if logic is correct
-             return f"I understood you wanted to associate file {file_id} with {target_type} {target_id}, but I couldn't confirm the result."
-
-    else:
-        # Default fallback for unhandled intents
-        logger.warning(f"No specific response generation logic for intent: {intent}")
-        return f"I understood your intent as '{intent}', but I don't have specific response logic for it yet."
+    return None
+
+def _general_question_prompt(query: str) -> str:
+    # Simple prompt for answering
+    return f"Answer the following question concisely: {query}"
+
+def _general_answer_from_response(response) -> str:
+    answer = response.text
+    logger.info("Generated answer for general question: %s...", answer[:100])
+    return answer
+
+async def generate_response_text_async(intent: str, entities: dict, action_result: Any = None) -> str:
+    """Async version of generate_response_text. Only the ask_general_question path does I/O;
+    all other intents are formatted synchronously."""
+    if intent != "ask_general_question" or not entities.get("query") or not GOOGLE_API_KEY:
+        return generate_response_text(intent, entities, action_result)
+    error_response = _error_response_text(intent, entities)
+    if error_response is not None:
+        return error_response
+    try:
+        response = await _get_model().generate_content_async(_general_question_prompt(entities["query"]))
+        return _general_answer_from_response(response)
+    except Exception as e:
+        logger.error("Error calling Gemini API for general question: %s", e, exc_info=True)
+        return "Sorry, I encountered an error trying to answer your question."
 
 # Example Usage (for testing purposes)
 if __name__ == '__main__':
@@ -362,33 +554,103 @@ if __name__ == '__main__':
         print(json.dumps(result_2, indent=2))
 
 # --- Helper Function --- 
+# Long texts are summarized map-reduce style: each chunk is summarized on its own, then
+# the partial summaries are combined in a final call. This keeps every prompt well within
+# token limits and lets the async path summarize chunks concurrently.
+SUMMARY_CHUNK_CHARS = 3000
+# Upper bound on concurrent Gemini calls from summarization; keep within the API quota.
+SUMMARY_MAX_CONCURRENCY = 4
+_summary_semaphore: Optional[asyncio.Semaphore] = None
+
+def _get_summary_semaphore() -> asyncio.Semaphore:
+    # Created lazily inside the running loop; on Python 3.9 a Semaphore binds to the
+    # current event loop at construction, which at import time is not the server's loop.
+    global _summary_semaphore
+    if _summary_semaphore is None:
+        _summary_semaphore = asyncio.Semaphore(SUMMARY_MAX_CONCURRENCY)
+    return _summary_semaphore
+
+def _chunks(text: str, size: int = SUMMARY_CHUNK_CHARS):
+    """Yields consecutive pieces of text of at most `size` chars, preferring to break at a newline."""
+    start = 0
+    while start < len(text):
+        end = min(start + size, len(text))
+        if end < len(text):
+            newline = text.rfind("\n", start + size // 2, end)
+            if newline != -1:
+                end = newline + 1
+        yield text[start:end]
+        start = end
+
 def summarize_text_gemini(text_to_summarize: str) -> Optional[str]:
-    """Summarizes the given text using the configured Gemini model."""
+    """Summarizes the given text using the configured Gemini model. Blocking; async
+    callers should use summarize_text_gemini_async."""
     if not GOOGLE_API_KEY:
         logger.error("Cannot summarize text: GOOGLE_API_KEY is not configured.")
         return None
 
-    try:
-        model = genai.GenerativeModel(MODEL_NAME)
-        # Basic prompt - can be refined significantly
-        prompt = f"Please provide a concise summary of the following meeting minutes:\n\n---\n{text_to_summarize}\n---\n\nSummary:"
-        
-        logger.debug(f"Sending text (first 100 chars: '{text_to_summarize[:100]}...') to Gemini model {MODEL_NAME} for summarization.")
-        response = model.generate_content(prompt)
-        
-        # Simple error handling - check response structure as needed
-        if response.parts:
-            summary = response.text # Access the text part
-            logger.info(f"Successfully generated summary using {MODEL_NAME}.")
-            return summary
-        else:
-            # Log potential blocking or other issues
-            logger.warning(f"Gemini response did not contain expected text part. Response: {response}")
-            # Check for finish_reason if needed: response.prompt_feedback.block_reason
+    chunks = list(_chunks(text_to_summarize))
+    if len(chunks) <= 1:
+        return _summarize_one(_summary_prompt(text_to_summarize))
+    partials = []
+    for chunk in chunks:
+        partial = _summarize_one(_summary_prompt(chunk))
+        if partial is None:
             return None
+        partials.append(partial)
+    return _summarize_one(_combine_summaries_prompt(partials))
 
+async def summarize_text_gemini_async(text_to_summarize: str) -> Optional[str]:
+    """Async version of summarize_text_gemini. Chunks are summarized concurrently."""
+    if not GOOGLE_API_KEY:
+        logger.error("Cannot summarize text: GOOGLE_API_KEY is not configured.")
+        return None
+
+    chunks = list(_chunks(text_to_summarize))
+    if len(chunks) <= 1:
+        return await _summarize_one_async(_summary_prompt(text_to_summarize))
+    logger.info("Summarizing %s chars in %s chunks.", len(text_to_summarize), len(chunks))
+    partials = await asyncio.gather(*[_summarize_one_async(_summary_prompt(c)) for c in chunks])
+    if any(partial is None for partial in partials):
+        return None
+    return await _summarize_one_async(_combine_summaries_prompt(partials))
+
+def _summarize_one(prompt: str) -> Optional[str]:
+    try:
+        response = _get_model().generate_content(prompt)
+        return _summary_from_response(response)
     except Exception as e:
-        logger.error(f"Error calling Gemini API ({MODEL_NAME}) for summarization: {e}", exc_info=True)
+        logger.error("Error calling Gemini API (%s) for summarization: %s", MODEL_NAME, e, exc_info=True)
+        return None
+
+async def _summarize_one_async(prompt: str) -> Optional[str]:
+    async with _get_summary_semaphore():
+        try:
+            response = await _get_model().generate_content_async(prompt)
+            return _summary_from_response(response)
+        except Exception as e:
+            logger.error("Error calling Gemini API (%s) for summarization: %s", MODEL_NAME, e, exc_info=True)
+            return None
+
+def _combine_summaries_prompt(partials: List[str]) -> str:
+    joined = "\n\n".join(partials)
+    return f"The following are summaries of consecutive sections of the same meeting minutes. Combine them into a single concise summary:\n\n---\n{joined}\n---\n\nSummary:"
+
+def _summary_prompt(text_to_summarize: str) -> str:
+    logger.debug("Sending text (first 100 chars: '%s...') to Gemini model %s for summarization.", text_to_summarize[:100], MODEL_NAME)
+    # Basic prompt - can be refined significantly
+    return f"Please provide a concise summary of the following meeting minutes:\n\n---\n{text_to_summarize}\n---\n\nSummary:"
+
+def _summary_from_response(response) -> Optional[str]:
+    # Simple error handling - check response structure as needed
+    if response.parts:
+        summary = response.text # Access the text part
+        logger.info("Successfully generated summary using %s.", MODEL_NAME)
+        return summary
+    else:
+        # Log potential blocking or other issues
+        logger.warning("Gemini response did not contain expected text part. Response: %s", response)
+        # Check for finish_reason if needed: response.prompt_feedback.block_reason
         return None
 
 # --- (Optional) Add other LLM utility functions here later --- 
\ No newline at end of file
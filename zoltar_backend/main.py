@@ -4,23 +4,32 @@ import logging # Add logging import
 logging.basicConfig(level=logging.DEBUG, format='%(asctime)s - %(levelname)s - %(message)s')
 
 # Now, other imports can happen, and their loggers will use this basicConfig
-from fastapi import FastAPI, Depends, HTTPException, status
+from fastapi import FastAPI, Depends, HTTPException, Request, status
+from fastapi.responses import ORJSONResponse
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
-from sqlalchemy.orm import Session, joinedload
+from sqlalchemy import and_, func, or_, update
+from sqlalchemy.orm import Session, load_only, selectinload
 from datetime import timedelta, datetime, timezone
+from collections import defaultdict
 from apscheduler.schedulers.asyncio import AsyncIOScheduler # Import APScheduler
-from dateutil.tz import UTC # Import UTC for timezone handling
+from apscheduler.executors.pool import ThreadPoolExecutor
 # Add SessionMiddleware import
 # from starlette.middleware.session import SessionMiddleware 
 from fastapi.middleware.cors import CORSMiddleware
 
+# Load .env and read settings once, before any module that needs configuration
+import app_settings
+
 # Change relative imports to direct imports
 import crud
+import crud_errors
 import models
 import schemas
 import auth
+import auth_utils_ms
 import push_utils # Import push_utils
-from database import SessionLocal, engine, get_db # Import SessionLocal for job
+import reminder_schedule
+from database import JobSessionLocal, engine, get_db # Import JobSessionLocal for job
 from routers import ( # Assuming routers is a directory at the same level
     categories, projects, tasks, files, reminders, contacts, reports,
     # users, # Commented out as it seems to be causing an ImportError
@@ -41,6 +50,7 @@ app = FastAPI(
     title="Zoltar AI Assistant API",
     description="API for managing tasks, projects, reminders, files, and more.",
     version="0.1.0",
+    default_response_class=ORJSONResponse, # orjson serializes responses straight to UTF-8 bytes
     # Add security schemes for Swagger UI
     openapi_tags=[
         {"name": "auth", "description": "Authentication"},
@@ -76,87 +86,150 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# CRUD functions raise CrudError subclasses for not-found/invalid-input cases; map them to
+# the same {"detail": ...} body HTTPException produces
+@app.exception_handler(crud_errors.CrudError)
+async def crud_error_handler(request: Request, exc: crud_errors.CrudError):
+    return ORJSONResponse(status_code=exc.status_code, content={"detail": exc.detail})
+
 # --- Add Session Middleware ---
 # TODO: Use a more secure secret key, load from config/env
 # app.add_middleware(SessionMiddleware, secret_key="YOUR_SUPER_SECRET_KEY_HERE") 
 
 # --- Scheduler Setup ---
-scheduler = AsyncIOScheduler(timezone="UTC") # Use UTC for consistency
+# The reminder scan gets its own thread so blocking DB/APNs work never competes with
+# other jobs for the default executor; one worker since only one scan runs at a time
+scheduler = AsyncIOScheduler(
+    timezone="UTC", # Use UTC for consistency
+    executors={reminder_schedule.JOB_EXECUTOR: ThreadPoolExecutor(max_workers=1)}
+)
+
+def _renotify_due_clause(db: Session, now_utc: datetime):
+    """SQL condition: remind_frequency_minutes have elapsed since last_notified_at."""
+    if db.get_bind().dialect.name == "postgresql":
+        next_due = models.Reminder.last_notified_at + func.make_interval(0, 0, 0, 0, 0, models.Reminder.remind_frequency_minutes)
+        return next_due <= now_utc
+    # SQLite (local dev) has no interval type; compare elapsed time via julianday (fractional days)
+    elapsed_minutes = (func.julianday(now_utc) - func.julianday(models.Reminder.last_notified_at)) * 1440
+    return elapsed_minutes >= models.Reminder.remind_frequency_minutes
 
 def check_due_reminders_job():
     """Job function to check for due reminders and handle persistent reminders."""
+    if not push_utils.APNS_CONFIGURED:
+        # Nothing can be delivered (APNs not configured, e.g. dev/CI); skip the DB work entirely.
+        # Not rescheduled: the config can't change at runtime, and edits still trigger a run.
+        logger.debug("Scheduler job: APNs disabled, skipping.")
+        return
+    if push_utils.get_apns_client() is None:
+        # Configured but the client failed to build (logged by push_utils); leave the due
+        # reminders unmarked and retry after RESCAN_DELAY
+        logger.warning("Scheduler job: APNs client unavailable, retrying later.")
+        reminder_schedule.clear_next_due()
+        reminder_schedule.schedule_next_run()
+        return
+    now_utc = datetime.now(timezone.utc)
+    if reminder_schedule.can_skip_scan(now_utc):
+        logger.debug("Scheduler job: Nothing due yet, skipping scan.")
+        reminder_schedule.schedule_next_run()
+        return
     logger.info("Scheduler job: Checking for due reminders...")
-    db = SessionLocal() # Create a new session for the job
+    token = reminder_schedule.scan_token()
     try: # Add try block
-        now_utc = datetime.now(timezone.utc)
-        # Eager load owner relationship to get user object easily
-        reminders_to_check = db.query(models.Reminder).options(
-            joinedload(models.Reminder.owner)
-        ).filter(
-            models.Reminder.is_active == True,
-            models.Reminder.trigger_datetime <= now_utc,
-            (models.Reminder.snoozed_until == None) | (models.Reminder.snoozed_until <= now_utc)
-        ).all()
-
-        reminders_to_notify = []
-
-        # Initial check for reminders that just became due
-        for reminder in reminders_to_check:
-            if reminder.last_notified_at is None or reminder.last_notified_at < reminder.trigger_datetime:
-                reminders_to_notify.append(reminder)
-
-        # Check for persistent reminders needing re-notification
-        for reminder in reminders_to_check: # Iterate through already fetched reminders
-            if reminder.remind_frequency_minutes is not None and reminder.last_notified_at is not None:
-                last_notified_aware = reminder.last_notified_at.astimezone(UTC) # Ensure timezone aware
-                frequency_delta = timedelta(minutes=reminder.remind_frequency_minutes)
-                if last_notified_aware + frequency_delta <= now_utc:
-                    if reminder not in reminders_to_notify: # Avoid duplicates
-                        logger.info(f"  Adding reminder ID={reminder.id} for persistent notification.")
-                        reminders_to_notify.append(reminder)
-
-        if not reminders_to_notify:
-            logger.info("Scheduler job: No reminders due for notification.")
-        else:
-            logger.info(f"Scheduler job: Found {len(reminders_to_notify)} unique reminders for notification.")
-            for reminder in reminders_to_notify:
-                owner = reminder.owner
-                if owner and owner.device_token:
-                    alert_body = reminder.description or reminder.title or "Your Zoltar reminder is due!"
-                    custom_data = {"reminder_id": reminder.id}
-                    
-                    success = push_utils.send_apns_notification(
-                        device_token=owner.device_token,
-                        alert_body=alert_body,
-                        custom_data=custom_data
-                    )
-                    if not success:
-                        logger.error(f"Failed to send push notification for reminder ID={reminder.id} to user ID={owner.id}")
+        with JobSessionLocal() as db: # Closed on exit; the connection goes back to the engine pool
+            # Eager load owners in one follow-up IN query (avoids widening every reminder row with a join)
+            # Only fetch reminders that actually need a push: newly due ones, and persistent ones
+            # whose re-notification frequency has elapsed since the last push.
+            reminders_to_notify = db.query(models.Reminder).options(
+                # Only the columns the job reads; skips wide User columns such as ms_token_cache
+                load_only(
+                    models.Reminder.id, models.Reminder.title, models.Reminder.description,
+                    models.Reminder.trigger_datetime, models.Reminder.owner_id
+                ),
+                selectinload(models.Reminder.owner).load_only(models.User.id, models.User.device_token)
+            ).filter(
+                models.Reminder.is_active == True,
+                models.Reminder.trigger_datetime <= now_utc,
+                (models.Reminder.snoozed_until == None) | (models.Reminder.snoozed_until <= now_utc),
+                or_(
+                    models.Reminder.last_notified_at == None,
+                    models.Reminder.last_notified_at < models.Reminder.trigger_datetime,
+                    and_(
+                        models.Reminder.remind_frequency_minutes != None,
+                        _renotify_due_clause(db, now_utc),
+                    ),
+                )
+            ).all()
+
+            if not reminders_to_notify:
+                logger.info("Scheduler job: No reminders due for notification.")
+            else:
+                logger.info(f"Scheduler job: Found {len(reminders_to_notify)} unique reminders for notification.")
+                # Coalesce reminders firing together for the same device into one push
+                # Single pass: group pushes, log, and collect the event rows and ids for the bulk writes
+                reminders_by_token = defaultdict(list)
+                event_rows = []
+                notified_ids = set()
+                for reminder in reminders_to_notify:
+                    logger.info(f"NOTIFYING (Internal Log): ID={reminder.id}, Title='{reminder.title}', Due='{reminder.trigger_datetime}', LastNotified='{now_utc}'")
+                    notified_ids.add(reminder.id)
+                    event_rows.append({
+                        "reminder_id": reminder.id,
+                        "expected_trigger_time": reminder.trigger_datetime,
+                        "action_time": now_utc,
+                        "action_type": models.ReminderActionType.TRIGGERED,
+                    })
+                    owner = reminder.owner
+                    if owner and owner.device_token:
+                        reminders_by_token[owner.device_token].append(reminder)
                     else:
-                        logger.info(f"Push notification sent successfully for reminder ID={reminder.id}")
-                else:
-                    logger.warning(f"Cannot send push notification for reminder ID={reminder.id}: Owner or device token missing.")
-
-                trigger_event = models.ReminderEvent(
-                    reminder_id=reminder.id,
-                    expected_trigger_time=reminder.trigger_datetime, 
-                    action_time=now_utc,
-                    action_type=models.ReminderActionType.TRIGGERED
+                        logger.warning(f"Cannot send push notification for reminder ID={reminder.id}: Owner or device token missing.")
+
+                pushes = [] # (reminders, owner, (device_token, alert_body, badge_count, custom_data))
+                for device_token, token_reminders in reminders_by_token.items():
+                    first = token_reminders[0]
+                    if len(token_reminders) == 1:
+                        alert_body = first.description or first.title or "Your Zoltar reminder is due!"
+                        custom_data = {"reminder_id": first.id}
+                    else:
+                        alert_body = f"You have {len(token_reminders)} reminders due"
+                        custom_data = {"reminder_id": first.id, "reminder_ids": [r.id for r in token_reminders]}
+                    pushes.append((token_reminders, first.owner, (device_token, alert_body, len(token_reminders), custom_data)))
+
+                # One batch call; APNs requests are multiplexed as concurrent streams on one HTTP/2 connection
+                if pushes:
+                    results = push_utils.send_apns_notification_batch([push[2] for push in pushes])
+                    for token_reminders, owner, (device_token, _, _, _) in pushes:
+                        reminder_ids = [r.id for r in token_reminders]
+                        if not results.get(device_token):
+                            logger.error(f"Failed to send push notification for reminder IDs={reminder_ids} to user ID={owner.id}")
+                        else:
+                            logger.info(f"Push notification sent successfully for reminder IDs={reminder_ids}")
+
+                # Record TRIGGERED events with a single executemany insert (no ORM objects needed)
+                db.execute(models.ReminderEvent.__table__.insert(), event_rows)
+
+                # One UPDATE for all notified reminders instead of one per row at commit
+                db.execute(
+                    update(models.Reminder)
+                    .where(models.Reminder.id.in_(notified_ids))
+                    .values(last_notified_at=now_utc)
                 )
-                db.add(trigger_event)
-                reminder.last_notified_at = now_utc
-                db.add(reminder)
-                logger.info(f"NOTIFYING (Internal Log): ID={reminder.id}, Title='{reminder.title}', Due='{reminder.trigger_datetime}', LastNotified='{reminder.last_notified_at}'")
-            
-            db.commit() 
+                db.commit() 
+
+            reminder_schedule.set_next_due(reminder_schedule.compute_next_due(db, now_utc), token)
+    except Exception:
+        # The old due time is now in the past; drop it so the retry waits RESCAN_DELAY
+        reminder_schedule.clear_next_due()
+        raise
     finally: # Add finally block
-        db.close() # Ensure session is closed
+        reminder_schedule.schedule_next_run()
 
 @app.on_event("startup")
 async def startup_event():
     logger.info("Starting scheduler...")
-    # Add the job to the scheduler to run every 60 seconds
-    scheduler.add_job(check_due_reminders_job, 'interval', seconds=60, id="check_reminders")
+    # The job reschedules itself for the next due reminder after each run; start with a scan now
+    reminder_schedule.configure(scheduler, check_due_reminders_job)
+    reminder_schedule.run_now()
     scheduler.start()
     logger.info("Scheduler started.")
 
@@ -165,6 +238,8 @@ async def shutdown_event():
     logger.info("Shutting down scheduler...")
     scheduler.shutdown()
     logger.info("Scheduler shut down.")
+    await auth_utils_ms.GRAPH_CLIENT.aclose()
+    files.EXTRACT_POOL.shutdown(wait=False)
 
 # --- End Scheduler Setup ---
 
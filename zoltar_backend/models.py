@@ -1,9 +1,10 @@
 import enum
 from sqlalchemy import (
-    create_engine, Column, Integer, String, DateTime, ForeignKey, Boolean, Enum, Text, Table, Index
+    create_engine, Column, Integer, String, DateTime, ForeignKey, Boolean, Enum, Text, Table, Index,
+    event, inspect, update
 )
 from sqlalchemy.orm import relationship
-from sqlalchemy.sql import func
+from sqlalchemy.sql import func, text
 from database import Base
 
 # Association table for task dependencies (many-to-many)
@@ -57,6 +58,11 @@ class Category(Base):
     owner = relationship("User", back_populates="categories")
     projects = relationship("Project", back_populates="category")
 
+    __table_args__ = (
+        # Serves keyset pagination of a user's categories (owner_id = ? AND id > ? ORDER BY id)
+        Index('ix_categories_owner_id', 'owner_id', 'id'),
+    )
+
 class ProjectStatus(enum.Enum):
     ACTIVE = "active"
     ON_HOLD = "on_hold"
@@ -87,6 +93,11 @@ class Project(Base):
         backref="dependency_projects"
     )
 
+    __table_args__ = (
+        # Serves per-user project listings and the by-category grouping (owner_id = ?)
+        Index('ix_projects_owner_category', 'owner_id', 'category_id'),
+    )
+
 class TaskStatus(enum.Enum):
     PENDING = "pending"
     IN_PROGRESS = "in_progress"
@@ -122,6 +133,14 @@ class Task(Base):
         backref="dependency_tasks"
     )
 
+    __table_args__ = (
+        # Serves keyset pagination of a user's tasks (owner_id = ? AND id > ? ORDER BY id)
+        Index('ix_tasks_owner_id', 'owner_id', 'id'),
+        # Serves the available-tasks listing (owner_id = ? AND status IN (PENDING, IN_PROGRESS)).
+        # Partial on PostgreSQL so completed/cancelled tasks aren't indexed.
+        Index('ix_tasks_available', 'owner_id', 'id', postgresql_where=text("status IN ('PENDING', 'IN_PROGRESS')")),
+    )
+
 class ReminderType(enum.Enum):
     ONE_TIME = "one_time"
     RECURRING_SCHEDULED = "recurring_scheduled" # e.g., every Monday 9am
@@ -147,7 +166,7 @@ class Reminder(Base):
     relative_to_task_completion_id = Column(Integer, ForeignKey('tasks.id'), nullable=True)
     last_triggered_at = Column(DateTime(timezone=True), nullable=True) # Renaming might be complex for Alembic, keep for now?
     last_notified_at = Column(DateTime(timezone=True), nullable=True) # Track last notification time for persistent reminders
-    is_active = Column(Boolean, default=True, index=True) # Add index
+    is_active = Column(Boolean, default=True) # Indexed via the composite indexes below
     snoozed_until = Column(DateTime(timezone=True), nullable=True)
     owner_id = Column(Integer, ForeignKey("users.id"))
     task_id = Column(Integer, ForeignKey("tasks.id"), nullable=True) # Optional link to a task
@@ -163,6 +182,14 @@ class Reminder(Base):
     contact = relationship("Contact", back_populates="reminders")
     events = relationship("ReminderEvent", back_populates="reminder", cascade="all, delete-orphan") # Add relationship to events
 
+    __table_args__ = (
+        # Serves the scheduler's due-reminder scan (is_active AND trigger_datetime <= now).
+        # Partial on PostgreSQL so only active reminders are indexed.
+        Index('ix_reminder_due_scan', 'is_active', 'trigger_datetime', postgresql_where=text('is_active')),
+        # Serves per-user reminder listings filtered by active state and ordered by trigger time
+        Index('ix_rem_owner_active_trigger', 'owner_id', 'is_active', 'trigger_datetime'),
+    )
+
 # New table to track reminder instance events
 class ReminderEvent(Base):
     __tablename__ = "reminder_events"
@@ -174,6 +201,11 @@ class ReminderEvent(Base):
 
     reminder = relationship("Reminder", back_populates="events")
 
+    __table_args__ = (
+        # Serves reminder history (reminder_id = ? with an action_time range, ordered by action_time)
+        Index('ix_reminder_events_rid_time', 'reminder_id', 'action_time'),
+    )
+
 class Note(Base):
     __tablename__ = "notes"
     id = Column(Integer, primary_key=True, index=True)
@@ -189,6 +221,11 @@ class Note(Base):
     owner = relationship("User", back_populates="notes")
     contact = relationship("Contact", back_populates="notes")
 
+    __table_args__ = (
+        # Serves a user's notes filtered by contact (owner_id = ? AND contact_id = ?)
+        Index('ix_notes_owner_contact', 'owner_id', 'contact_id'),
+    )
+
 class FileReference(Base):
     __tablename__ = "file_references"
     id = Column(Integer, primary_key=True, index=True)
@@ -215,6 +252,9 @@ class Contact(Base):
     owner_id = Column(Integer, ForeignKey("users.id"), index=True, nullable=False)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    # Pending/in-progress tasks linked to this contact, kept current by the Task mapper events
+    # below so the contact list doesn't need a COUNT per contact
+    outstanding_task_count = Column(Integer, nullable=False, default=0, server_default=text('0'))
 
     owner = relationship("User", back_populates="contacts")
     # Add relationships to tasks, reminders, notes that refer to this contact
@@ -222,6 +262,48 @@ class Contact(Base):
     reminders = relationship("Reminder", back_populates="contact")
     notes = relationship("Note", back_populates="contact")
 
+# --- Contact.outstanding_task_count maintenance ---
+# Only ORM flushes of Task fire these; bulk update()/delete() statements on tasks bypass them
+
+_OUTSTANDING_TASK_STATUSES = (TaskStatus.PENDING, TaskStatus.IN_PROGRESS)
+
+def _adjust_outstanding_task_count(connection, contact_id, delta):
+    if contact_id is None:
+        return
+    connection.execute(
+        update(Contact.__table__)
+        .where(Contact.__table__.c.id == contact_id)
+        .values(outstanding_task_count=Contact.__table__.c.outstanding_task_count + delta)
+    )
+
+def _is_outstanding(status) -> bool:
+    # status is still None on insert when the column default supplied it
+    return status is None or status in _OUTSTANDING_TASK_STATUSES
+
+@event.listens_for(Task, "after_insert")
+def _task_inserted(mapper, connection, target):
+    if _is_outstanding(target.status):
+        _adjust_outstanding_task_count(connection, target.contact_id, 1)
+
+@event.listens_for(Task, "after_update")
+def _task_updated(mapper, connection, target):
+    state = inspect(target)
+    status_history = state.attrs.status.history
+    contact_history = state.attrs.contact_id.history
+    if not status_history.has_changes() and not contact_history.has_changes():
+        return
+    old_status = status_history.deleted[0] if status_history.deleted else target.status
+    old_contact_id = contact_history.deleted[0] if contact_history.deleted else target.contact_id
+    if _is_outstanding(old_status):
+        _adjust_outstanding_task_count(connection, old_contact_id, -1)
+    if _is_outstanding(target.status):
+        _adjust_outstanding_task_count(connection, target.contact_id, 1)
+
+@event.listens_for(Task, "after_delete")
+def _task_deleted(mapper, connection, target):
+    if _is_outstanding(target.status):
+        _adjust_outstanding_task_count(connection, target.contact_id, -1)
+
 # --- New List Models ---
 
 class List(Base):
@@ -1,27 +1,41 @@
 import logging
-import os # Import os
-from apns2.client import APNsClient
+import threading
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from apns2.client import APNsClient, Notification
+from apns2.errors import ConnectionFailed
 from apns2.payload import Payload
 from apns2.credentials import TokenCredentials # Import TokenCredentials
-from dotenv import load_dotenv # Import load_dotenv
-
-# Load environment variables from .env file (especially for local dev)
-load_dotenv()
+from hyper.http20.exceptions import ConnectionError as HTTP20ConnectionError, StreamResetError
+from app_settings import settings
 
 logger = logging.getLogger(__name__)
 
 # --- Load APNs config from environment variables --- 
-APNS_TEAM_ID = os.getenv("APNS_TEAM_ID")
-APNS_AUTH_KEY_PATH = os.getenv("APNS_AUTH_KEY_PATH") # Path to the .p8 file
-APNS_KEY_ID = os.getenv("APNS_KEY_ID")
-APNS_TOPIC = os.getenv("APNS_TOPIC") # Your app's bundle ID
-APNS_USE_SANDBOX_STR = os.getenv("APNS_USE_SANDBOX", "True") # Default to Sandbox
+APNS_TEAM_ID = settings.APNS_TEAM_ID
+APNS_AUTH_KEY_PATH = settings.APNS_AUTH_KEY_PATH # Path to the .p8 file
+APNS_KEY_ID = settings.APNS_KEY_ID
+APNS_TOPIC = settings.APNS_TOPIC # Your app's bundle ID
+APNS_USE_SANDBOX_STR = settings.APNS_USE_SANDBOX # Default to Sandbox
 APNS_USE_SANDBOX = APNS_USE_SANDBOX_STR.lower() in ['true', '1', 'yes']
 # --- End Load --- 
 
-# Initialize APNs client globally
-apns_client = None
-if all([APNS_TEAM_ID, APNS_AUTH_KEY_PATH, APNS_KEY_ID, APNS_TOPIC]):
+# Whether the APNs settings are present; fixed for the life of the process
+APNS_CONFIGURED = all([APNS_TEAM_ID, APNS_AUTH_KEY_PATH, APNS_KEY_ID, APNS_TOPIC])
+if not APNS_CONFIGURED:
+    missing_vars = [var for var, val in {
+        "APNS_TEAM_ID": APNS_TEAM_ID, 
+        "APNS_AUTH_KEY_PATH": APNS_AUTH_KEY_PATH, 
+        "APNS_KEY_ID": APNS_KEY_ID, 
+        "APNS_TOPIC": APNS_TOPIC
+    }.items() if not val]
+    logger.warning("APNs client NOT initialized. Missing environment variables: %s", missing_vars)
+
+# The APNs client is created on first use and rebuilt if its connection drops. Only a successfully
+# built client is kept, so a transient failure (key file, network) is retried on the next call.
+_apns_client: Optional[APNsClient] = None
+_apns_client_lock = threading.Lock()
+
+def _build_apns_client() -> Optional[APNsClient]:
     try:
         # Create TokenCredentials object
         token_credentials = TokenCredentials(
@@ -30,26 +44,70 @@ if all([APNS_TEAM_ID, APNS_AUTH_KEY_PATH, APNS_KEY_ID, APNS_TOPIC]):
             team_id=APNS_TEAM_ID
         )
         # Initialize APNsClient with TokenCredentials
-        apns_client = APNsClient(
+        client = APNsClient(
             credentials=token_credentials,
             use_sandbox=APNS_USE_SANDBOX
         )
-        logger.info(f"APNsClient initialized successfully (Sandbox: {APNS_USE_SANDBOX}).")
+        logger.info("APNsClient initialized successfully (Sandbox: %s).", APNS_USE_SANDBOX)
+        return client
     except Exception as e:
-        logger.error(f"Failed to initialize APNsClient from env vars: {e}", exc_info=True)
-else:
-    missing_vars = [var for var, val in {
-        "APNS_TEAM_ID": APNS_TEAM_ID, 
-        "APNS_AUTH_KEY_PATH": APNS_AUTH_KEY_PATH, 
-        "APNS_KEY_ID": APNS_KEY_ID, 
-        "APNS_TOPIC": APNS_TOPIC
-    }.items() if not val]
-    logger.warning(f"APNs client NOT initialized. Missing environment variables: {missing_vars}")
+        logger.error("Failed to initialize APNsClient from env vars: %s", e, exc_info=True)
+        return None
+
+def get_apns_client() -> Optional[APNsClient]:
+    """Returns the shared APNs client, or None if APNs is not configured or the client could
+    not be built right now."""
+    global _apns_client
+    if not APNS_CONFIGURED:
+        return None
+    with _apns_client_lock:
+        if _apns_client is None:
+            _apns_client = _build_apns_client()
+        return _apns_client
+
+def reset_apns_client() -> None:
+    """Drops the shared client so the next get_apns_client call builds a new connection."""
+    global _apns_client
+    with _apns_client_lock:
+        _apns_client = None
+
+# Errors meaning the HTTP/2 connection is gone rather than APNs rejecting the notification
+_CONNECTION_ERRORS = (ConnectionError, ConnectionFailed, HTTP20ConnectionError, StreamResetError)
+
+def _call_with_reconnect(send: Callable[[APNsClient], Any]) -> Any:
+    """Runs send(client); if the connection dropped, rebuilds the client and retries once."""
+    try:
+        return send(get_apns_client())
+    except _CONNECTION_ERRORS as e:
+        logger.warning("APNs connection lost (%r); reconnecting and retrying once.", e)
+        reset_apns_client()
+        client = get_apns_client()
+        if client is None:
+            raise
+        return send(client)
+
+# Static part of every alert's "aps" dictionary; only alert, badge and custom data vary per push
+_BASE_APS = {"sound": "default", "mutable-content": 1}
+
+class _TemplatePayload(Payload):
+    """Payload whose JSON dict is built from the shared _BASE_APS template."""
+    def dict(self):
+        result = {"aps": dict(_BASE_APS, alert=self.alert, badge=self.badge)}
+        if self.custom:
+            result.update(self.custom)
+        return result
+
+def build_payload(alert_body: str, badge_count: int = 1, custom_data: dict = None) -> Payload:
+    """Builds an alert payload (default sound, mutable content) for APNs."""
+    return _TemplatePayload(
+        alert=alert_body, badge=badge_count, sound=_BASE_APS["sound"],
+        custom=custom_data, mutable_content=True
+    )
 
 
 def send_apns_notification(device_token: str, alert_body: str, badge_count: int = 1, custom_data: dict = None):
     """Sends a push notification to a specific iOS device via APNs."""
-    if not apns_client:
+    if not get_apns_client():
         logger.error("APNs client not initialized. Cannot send push notification.")
         return False
 
@@ -57,29 +115,49 @@ def send_apns_notification(device_token: str, alert_body: str, badge_count: int
         logger.warning("No device token provided. Cannot send push notification.")
         return False
 
-    # Basic alert payload
-    payload = Payload(alert=alert_body, sound="default", badge=badge_count, mutable_content=True)
-
-    # Add custom data if provided
-    if custom_data:
-        payload.custom = custom_data
-
-    # Topic is now loaded from environment variable
-    topic = APNS_TOPIC 
+    payload = build_payload(alert_body, badge_count, custom_data)
 
     try:
-        logger.info(f"Sending APNs notification to token ending ...{device_token[-6:]} with body: '{alert_body}', topic: {topic}, sandbox: {APNS_USE_SANDBOX}")
+        logger.info("Sending APNs notification to token ending ...%s with body: '%s', topic: %s, sandbox: %s",
+                    device_token[-6:], alert_body, APNS_TOPIC, APNS_USE_SANDBOX)
         # Send the notification
-        response = apns_client.send_notification(
+        response = _call_with_reconnect(lambda client: client.send_notification(
             token_hex=device_token,
-            notification_payload=payload,
-            topic=topic
-        )
-        logger.info(f"APNs notification sent (or attempted). Response: {response}")
+            notification=payload,
+            topic=APNS_TOPIC
+        ))
+        logger.info("APNs notification sent (or attempted). Response: %s", response)
         return True 
 
     except Exception as e:
-        logger.error(f"Failed to send APNs notification to token ending ...{device_token[-6:]}: {e}", exc_info=True)
+        logger.error("Failed to send APNs notification to token ending ...%s: %s", device_token[-6:], e, exc_info=True)
         return False
 
+def send_apns_notification_batch(items: List[Tuple[str, str, int, dict]]) -> Dict[str, bool]:
+    """Sends (device_token, alert_body, badge_count, custom_data) items concurrently as HTTP/2
+    streams on the shared APNs connection. Returns whether each device token succeeded."""
+    if not get_apns_client():
+        logger.error("APNs client not initialized. Cannot send push notifications.")
+        return {item[0]: False for item in items}
+
+    notifications = [
+        Notification(token=device_token, payload=build_payload(alert_body, badge_count, custom_data))
+        for device_token, alert_body, badge_count, custom_data in items
+        if device_token
+    ]
+    try:
+        logger.info("Sending batch of %d APNs notifications, topic: %s, sandbox: %s",
+                    len(notifications), APNS_TOPIC, APNS_USE_SANDBOX)
+        results = _call_with_reconnect(
+            lambda client: client.send_notification_batch(notifications=notifications, topic=APNS_TOPIC)
+        )
+    except Exception as e:
+        logger.error("Failed to send APNs notification batch: %s", e, exc_info=True)
+        return {item[0]: False for item in items}
+
+    for device_token, result in results.items():
+        if result != 'Success':
+            logger.error("APNs rejected notification to token ending ...%s: %s", device_token[-6:], result)
+    return {item[0]: results.get(item[0]) == 'Success' for item in items}
+
 # --- Example Usage Removed --- 
\ No newline at end of file
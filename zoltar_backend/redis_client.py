@@ -0,0 +1,16 @@
+import logging
+from functools import lru_cache
+
+from app_settings import settings
+
+logger = logging.getLogger(__name__)
+
+@lru_cache(maxsize=1)
+def get_redis():
+    """Returns the shared Redis client, or None when REDIS_URL is not configured."""
+    if not settings.REDIS_URL:
+        return None
+    import redis # Only required when REDIS_URL is set
+
+    logger.info("Using Redis at %s", settings.REDIS_URL.rsplit("@", 1)[-1]) # Don't log credentials
+    return redis.Redis.from_url(settings.REDIS_URL, decode_responses=True)
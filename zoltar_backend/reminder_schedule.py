@@ -0,0 +1,151 @@
+import logging
+import threading
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Optional
+
+from sqlalchemy import func, or_
+from sqlalchemy.orm import Session
+
+import models
+
+logger = logging.getLogger(__name__)
+
+# Tracks when the reminder scheduler next has work to do. The scan job is a one-shot 'date'
+# job that reschedules itself for that time after every run, so nothing wakes up while no
+# reminder is due. Creating or changing reminders clears the value and runs the scan now.
+
+JOB_ID = "check_reminders"
+# Dedicated scheduler executor for the scan (blocking DB and APNs I/O), registered in main.py
+JOB_EXECUTOR = "pushpool"
+# Fallback delay when the next due time is unknown (scan failed or was invalidated mid-run)
+RESCAN_DELAY = timedelta(seconds=60)
+# A next due time already in the past (the scan ran long) is pushed out by this much, so the
+# job never lands in a tight loop rescheduling itself for "now"
+MIN_RESCHEDULE_DELAY = timedelta(seconds=1)
+
+# Never trust the cached value for longer than this; picks up changes made outside this
+# process (other workers, direct DB edits).
+MAX_IDLE = timedelta(minutes=10)
+
+# SQLite julianday() values are converted via the modified julian day epoch (JD 2400000.5)
+_MJD_EPOCH = datetime(1858, 11, 17, tzinfo=timezone.utc)
+_MJD_OFFSET = 2400000.5
+
+_lock = threading.Lock()
+_next_due_datetime: Optional[datetime] = None
+_generation = 0
+_scheduler = None
+_job_func: Optional[Callable[[], None]] = None
+
+def configure(scheduler, job_func: Callable[[], None]) -> None:
+    """Registers the scheduler and scan job; called once at startup."""
+    global _scheduler, _job_func
+    _scheduler = scheduler
+    _job_func = job_func
+
+def _schedule_at(run_date: datetime) -> None:
+    if _scheduler is None:
+        return
+    _scheduler.add_job(
+        _job_func, 'date', run_date=run_date, id=JOB_ID, replace_existing=True,
+        executor=JOB_EXECUTOR, max_instances=1, coalesce=True,
+        # A run delayed past its date (busy executor, event loop stall) must still happen;
+        # the default 1s grace period would silently drop it and stop the reschedule chain
+        misfire_grace_time=None
+    )
+
+def run_now() -> None:
+    _schedule_at(datetime.now(timezone.utc))
+
+def schedule_next_run() -> None:
+    """Schedules the scan job for the next due time. Call at the end of every job run."""
+    now_utc = datetime.now(timezone.utc)
+    next_due = _next_due_datetime
+    if next_due is None:
+        next_due = now_utc + RESCAN_DELAY
+    next_due = max(next_due, now_utc + MIN_RESCHEDULE_DELAY)
+    logger.debug("Next reminder scan scheduled for %s", next_due)
+    _schedule_at(next_due)
+
+def _as_utc(dt: datetime) -> datetime:
+    # SQLite returns naive datetimes for DateTime(timezone=True) columns; they are stored as UTC
+    return dt if dt.tzinfo is not None else dt.replace(tzinfo=timezone.utc)
+
+def can_skip_scan(now_utc: datetime) -> bool:
+    """True if the last scan determined nothing is due before now_utc."""
+    next_due = _next_due_datetime
+    return next_due is not None and now_utc < next_due
+
+def scan_token() -> int:
+    """Call before scanning; pass the result to set_next_due so a concurrent invalidation wins."""
+    return _generation
+
+def set_next_due(next_due: datetime, token: int) -> None:
+    global _next_due_datetime
+    with _lock:
+        if token == _generation:
+            _next_due_datetime = next_due
+
+def clear_next_due() -> None:
+    """Forgets the next due time after a failed scan, so schedule_next_run backs off to
+    RESCAN_DELAY instead of retrying a stale (past) due time right away."""
+    global _next_due_datetime, _generation
+    with _lock:
+        _generation += 1
+        _next_due_datetime = None
+
+def invalidate_next_due() -> None:
+    """Rescans immediately. Call after reminders are created or changed, so an earlier
+    trigger preempts the currently scheduled run."""
+    global _next_due_datetime, _generation
+    with _lock:
+        _generation += 1
+        _next_due_datetime = None
+    run_now()
+
+def compute_next_due(db: Session, now_utc: datetime) -> datetime:
+    """Earliest time after now_utc at which an active reminder may need a notification."""
+    candidates = [now_utc + MAX_IDLE]
+
+    next_trigger = db.query(func.min(models.Reminder.trigger_datetime)).filter(
+        models.Reminder.is_active == True,
+        models.Reminder.trigger_datetime > now_utc
+    ).scalar()
+    if next_trigger is not None:
+        candidates.append(_as_utc(next_trigger))
+
+    next_snooze_end = db.query(func.min(models.Reminder.snoozed_until)).filter(
+        models.Reminder.is_active == True,
+        models.Reminder.snoozed_until > now_utc
+    ).scalar()
+    if next_snooze_end is not None:
+        candidates.append(_as_utc(next_snooze_end))
+
+    # Persistent reminders are re-notified every remind_frequency_minutes after the last push;
+    # the earliest of those is aggregated in SQL rather than building a datetime per row
+    persistent_filter = (
+        models.Reminder.is_active == True,
+        models.Reminder.trigger_datetime <= now_utc,
+        models.Reminder.last_notified_at != None,
+        models.Reminder.remind_frequency_minutes != None,
+        # Matches the scan: snoozed reminders are covered by next_snooze_end above
+        or_(models.Reminder.snoozed_until == None, models.Reminder.snoozed_until <= now_utc)
+    )
+    if db.get_bind().dialect.name == "postgresql":
+        next_renotify = db.query(func.min(
+            models.Reminder.last_notified_at
+            + func.make_interval(0, 0, 0, 0, 0, models.Reminder.remind_frequency_minutes)
+        )).filter(*persistent_filter).scalar()
+    else:
+        # SQLite has no interval type; work in julian days and convert the result once
+        next_renotify_jd = db.query(func.min(
+            func.julianday(models.Reminder.last_notified_at)
+            + models.Reminder.remind_frequency_minutes / 1440.0
+        )).filter(*persistent_filter).scalar()
+        next_renotify = None
+        if next_renotify_jd is not None:
+            next_renotify = _MJD_EPOCH + timedelta(days=next_renotify_jd - _MJD_OFFSET)
+    if next_renotify is not None:
+        candidates.append(_as_utc(next_renotify))
+
+    return min(candidates)
@@ -0,0 +1,122 @@
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Optional, Set, Tuple
+
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session
+
+import models
+from redis_client import get_redis
+
+# Short-lived cache for the aggregate read endpoints (/outstanding/contact/{id} and
+# /projects/{id}/summary), which dashboards poll, and (with Redis only, see is_shared) the task
+# GETs under /tasks. Entries hold the serialized JSON response
+# and live in one bucket per user: a Redis hash "report:<user_id>" when Redis is configured
+# (shared across workers), otherwise a per-process LRU of buckets. Any committed ORM write to a
+# model these reports read drops the owner's bucket; Core UPDATE/INSERT statements bypass
+# that hook, so the TTL bounds how stale an entry can get.
+
+logger = logging.getLogger(__name__)
+
+REPORT_CACHE_TTL_SECONDS = 30
+REPORT_CACHE_MAX_USERS = 256
+
+# Models whose rows feed the cached reports
+_REPORT_MODELS = (
+    models.Task, models.Reminder, models.Note, models.FileReference,
+    models.Project, models.Category, models.Contact,
+)
+
+_local_cache: "OrderedDict[int, Dict[str, Tuple[float, str]]]" = OrderedDict()
+_local_cache_lock = threading.Lock()
+
+def _bucket_key(user_id: int) -> str:
+    return f"report:{user_id}"
+
+def is_shared() -> bool:
+    """True when entries live in Redis, so an invalidation on one worker is seen by all of them.
+    The per-process fallback is only invalidated by writes made in the same process."""
+    return get_redis() is not None
+
+def get(user_id: int, field: str) -> Optional[str]:
+    """Returns the cached JSON for one of the user's reports (e.g. "outstanding:3"), or None."""
+    redis_conn = get_redis()
+    if redis_conn is not None:
+        try:
+            entry = redis_conn.hget(_bucket_key(user_id), field)
+        except Exception as e:
+            logger.warning("Failed to read report cache from Redis: %s", e)
+            return None
+        if entry is None:
+            return None
+        # The hash's own TTL is refreshed on every write, so each entry carries its timestamp
+        cached_at, _, payload = entry.partition(":")
+        return payload if time.time() - float(cached_at) < REPORT_CACHE_TTL_SECONDS else None
+    with _local_cache_lock:
+        entry = _local_cache.get(user_id, {}).get(field)
+        if entry is None or time.monotonic() - entry[0] >= REPORT_CACHE_TTL_SECONDS:
+            return None
+        _local_cache.move_to_end(user_id)
+        return entry[1]
+
+def store(user_id: int, field: str, payload: str) -> None:
+    redis_conn = get_redis()
+    if redis_conn is not None:
+        try:
+            pipe = redis_conn.pipeline()
+            pipe.hset(_bucket_key(user_id), field, f"{time.time()}:{payload}")
+            pipe.expire(_bucket_key(user_id), REPORT_CACHE_TTL_SECONDS)
+            pipe.execute()
+        except Exception as e:
+            logger.warning("Failed to write report cache to Redis: %s", e)
+        return
+    with _local_cache_lock:
+        _local_cache.setdefault(user_id, {})[field] = (time.monotonic(), payload)
+        _local_cache.move_to_end(user_id)
+        if len(_local_cache) > REPORT_CACHE_MAX_USERS:
+            _local_cache.popitem(last=False)
+
+def invalidate(user_ids: Set[Optional[int]]) -> None:
+    """Drops the cached reports of the given users; None in the set clears every user."""
+    redis_conn = get_redis()
+    if redis_conn is not None:
+        try:
+            if None in user_ids:
+                keys = list(redis_conn.scan_iter(match="report:*"))
+            else:
+                keys = [_bucket_key(user_id) for user_id in user_ids]
+            if keys:
+                redis_conn.delete(*keys)
+        except Exception as e:
+            logger.warning("Failed to invalidate report cache in Redis: %s", e)
+        return
+    with _local_cache_lock:
+        if None in user_ids:
+            _local_cache.clear()
+        for user_id in user_ids:
+            _local_cache.pop(user_id, None)
+
+# --- Invalidation on commit ---
+# Owners are collected at flush and invalidated only after commit, so a concurrent read can't
+# re-cache the pre-commit state in between.
+
+@event.listens_for(Session, "after_flush")
+def _collect_report_owners(session: Session, flush_context) -> None:
+    owners = session.info.setdefault("report_cache_owners", set())
+    for obj in (*session.new, *session.dirty, *session.deleted):
+        if isinstance(obj, _REPORT_MODELS):
+            # Read the loaded value without triggering a lazy load mid-flush; unknown owner
+            # (None) falls back to clearing everyone
+            owners.add(inspect(obj).dict.get("owner_id"))
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_report_owners(session: Session) -> None:
+    owners = session.info.pop("report_cache_owners", None)
+    if owners:
+        invalidate(owners)
+
+@event.listens_for(Session, "after_rollback")
+def _discard_report_owners(session: Session) -> None:
+    session.info.pop("report_cache_owners", None)
@@ -1,8 +1,7 @@
-import os
-import uuid
-import msal
+from secrets import token_urlsafe
 from fastapi import APIRouter, Depends, HTTPException, status, Request
 from fastapi.responses import RedirectResponse
+from sqlalchemy import select, update
 from sqlalchemy.orm import Session
 import logging
 from typing import Optional, Dict
@@ -19,73 +18,50 @@ import auth_utils_ms
 
 logger = logging.getLogger(__name__)
 
-# TODO: Load these securely from environment variables or config
-MS_CLIENT_ID = os.getenv("MS_CLIENT_ID", "YOUR_MS_CLIENT_ID_HERE")
-MS_CLIENT_SECRET = os.getenv("MS_CLIENT_SECRET", "YOUR_MS_CLIENT_SECRET_HERE")
-# Make sure the redirect URI matches *exactly* what's in Azure AD
-MS_REDIRECT_URI = "http://localhost:8000/auth/microsoft/callback"
-MS_SCOPES = ["User.Read", "Calendars.ReadWrite"] # Base scopes, offline_access added automatically by MSAL for confidential client flow
-MS_AUTHORITY = "https://login.microsoftonline.com/common" # For multi-tenant + personal
-
 router = APIRouter(
     prefix="/auth/microsoft",
     tags=["Auth - Microsoft"], # Add tags for OpenAPI docs
     responses={404: {"description": "Not found"}},
 )
 
-# Store state temporarily (replace with more robust method, e.g., session)
-# WARNING: Simple global state is NOT suitable for multi-user/production!
-# For demo purposes only.
-temp_state_store = {}
-
-# Helper function to build MSAL confidential client application
-def _build_msal_app(authority=MS_AUTHORITY):
-    return msal.ConfidentialClientApplication(
-        MS_CLIENT_ID,
-        authority=authority,
-        client_credential=MS_CLIENT_SECRET,
-    )
+# The login flow goes through auth_utils_ms.msal_client, a single module-level ConfidentialClientApplication
+# whose authority metadata lives for the whole process. Silent token lookups build their own client
+# and token cache per call (see auth_utils_ms.get_cached_ms_token).
 
 @router.get("/login")
 async def login_microsoft(request: Request):
     """Initiates the Microsoft OAuth2 login flow."""
-    # logger.info("Microsoft login endpoint called")
-    # return {"message": "Microsoft login endpoint placeholder"}
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("Initiating MS OAuth login")
     
     # Generate a unique state value for CSRF protection
-    state = str(uuid.uuid4())
-    # Store the state temporarily to validate it on callback
-    # This needs a better storage mechanism (e.g., session, database)
-    # keyed potentially by browser session ID if not user ID yet
-    # temp_state_store[state] = True # Or store user context if available
-    # For now, we might just log it or skip validation for simplicity 
-    logger.info(f"Generated state for login: {state}") 
+    state = token_urlsafe(16) # 16 random bytes, 22 URL-safe characters
+    # Store the state to validate it on callback (shared across workers via Redis, else per process)
+    auth_utils_ms.save_oauth_state(state)
     
+    # Neither the state nor the auth URL (which carries it) is logged
     auth_url = auth_utils_ms.get_ms_auth_url(state=state)
-    logger.info(f"Redirecting user to Microsoft login: {auth_url}")
     return RedirectResponse(auth_url)
 
 @router.get("/callback")
 async def callback_microsoft(request: Request, db: Session = Depends(get_db), code: str = None, state: str = None, error: str = None, error_description: str = None):
     """Handles the redirect callback from Microsoft after authentication."""
-    logger.info(f"Microsoft callback endpoint called. State: {state}, Code provided: {code is not None}, Error: {error}")
+    logger.info("Microsoft callback endpoint called. State provided: %s, Code provided: %s, Error: %s", state is not None, code is not None, error)
     # logger.info(f"Full request query params: {request.query_params}")
     # return {"message": "Microsoft callback endpoint placeholder", "code": code, "state": state}
     
     # 1. Handle potential errors from Microsoft
     if error:
-        logger.error(f"Microsoft login error: {error} - {error_description}")
+        logger.error("Microsoft login error: %s - %s", error, error_description)
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST, 
             detail=f"Microsoft login failed: {error_description or error}"
         )
         
-    # 2. Validate state (basic check - needs improvement)
-    # stored_state = temp_state_store.pop(state, None)
-    # if not stored_state:
-    #     logger.error(f"Invalid or expired state received: {state}")
-    #     raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid state parameter.")
-    # logger.info(f"State validation passed for: {state}")
+    # 2. Validate state; each value is single-use and expires after MS_OAUTH_STATE_TTL_SECONDS
+    if not auth_utils_ms.consume_oauth_state(state):
+        logger.error("Invalid or expired state received in Microsoft callback.")
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid state parameter.")
 
     # 3. Check if authorization code is present
     if not code:
@@ -107,28 +83,39 @@ async def callback_microsoft(request: Request, db: Session = Depends(get_db), co
         logger.error("Could not extract OID or email from token claims.", extra={"claims": id_claims})
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Could not identify user from Microsoft token.")
 
-    # Find Zoltar user by email
-    user = db.query(models.User).filter(models.User.email == email).first()
+    # Find Zoltar user by email (unique index ix_users_email); only the columns needed here
+    user_row = db.execute(
+        select(models.User.id, models.User.ms_oid).where(models.User.email == email)
+    ).first()
 
-    if not user:
-        logger.warning(f"Received successful Microsoft login for email {email} (OID: {ms_oid}), but no matching Zoltar user found.")
+    if not user_row:
+        logger.warning("Received successful Microsoft login for email %s (OID: %s), but no matching Zoltar user found.", email, ms_oid)
         # In a real app, you might redirect to a page explaining this,
         # or allow on-the-fly user creation/linking if the user was already logged into Zoltar.
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"No Zoltar user account found for email {email}. Please register first or ensure emails match.")
 
-    logger.info(f"Linking Microsoft account (OID: {ms_oid}) to Zoltar user: {user.email} (ID: {user.id})")
+    logger.info("Linking Microsoft account (OID: %s) to Zoltar user: %s (ID: %s)", ms_oid, email, user_row.id)
     
-    # Update user's OID (if needed) and token cache
-    user.ms_oid = ms_oid
-    user.ms_token_cache = auth_utils_ms.token_cache.serialize() # Get serialized cache from the shared instance
+    # Update user's OID (if needed) and token cache with a single UPDATE of the changed columns
+    values = {}
+    if user_row.ms_oid != ms_oid:
+        values["ms_oid"] = ms_oid
+    if auth_utils_ms.token_cache.has_state_changed:
+        # serialize() also resets has_state_changed on the shared instance
+        cache_state = auth_utils_ms.token_cache.serialize()
+        # The cache goes to Redis when configured; the DB column is the fallback store
+        if not auth_utils_ms.save_token_cache_to_redis(ms_oid, cache_state):
+            values["ms_token_cache"] = cache_state
     
-    try:
-        db.commit()
-        logger.info(f"Successfully saved token cache and OID for user {user.email}")
-    except Exception as e:
-        db.rollback()
-        logger.error(f"Database error saving token cache/OID for user {user.email}: {e}", exc_info=True)
-        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Failed to save authentication details.")
+    if values:
+        try:
+            db.execute(update(models.User).where(models.User.id == user_row.id).values(**values))
+            db.commit()
+            logger.info("Successfully saved token cache and OID for user %s", email)
+        except Exception as e:
+            db.rollback()
+            logger.error("Database error saving token cache/OID for user %s: %s", email, e, exc_info=True)
+            raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Failed to save authentication details.")
 
     # Return a simple success message or redirect to a frontend page
     return {"message": f"Successfully linked Microsoft account for {email}. You can now close this window."}
@@ -149,21 +136,21 @@ async def get_microsoft_me(
     """Fetches the profile of the linked Microsoft account using the Graph API (/me endpoint).
        Requires the user to be logged into Zoltar and to have previously linked their Microsoft account.
     """
-    logger.info(f"Request received for /auth/microsoft/me by Zoltar user: {current_user.email}")
+    logger.info("Request received for /auth/microsoft/me by Zoltar user: %s", current_user.email)
     
     if not current_user.ms_oid:
-        logger.warning(f"User {current_user.email} tried to access /me but has no linked Microsoft OID.")
+        logger.warning("User %s tried to access /me but has no linked Microsoft OID.", current_user.email)
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Microsoft account not linked. Please use the /auth/microsoft/login flow first."
         )
         
-    logger.debug(f"Fetching /me data for MS OID: {current_user.ms_oid}")
+    logger.debug("Fetching /me data for MS OID: %s", current_user.ms_oid)
     
     # Define the required scopes for the /me endpoint
     required_scopes = ["User.Read"]
     
-    graph_data = auth_utils_ms.call_microsoft_graph_api(
+    graph_data = await auth_utils_ms.call_microsoft_graph_api_async(
         db=db,
         ms_oid=current_user.ms_oid,
         scopes=required_scopes,
@@ -172,12 +159,12 @@ async def get_microsoft_me(
     )
     
     if graph_data is None:
-        logger.error(f"Failed to retrieve /me data from Graph API for user {current_user.email} (OID: {current_user.ms_oid})")
-        # The error is already logged in call_microsoft_graph_api
+        logger.error("Failed to retrieve /me data from Graph API for user %s (OID: %s)", current_user.email, current_user.ms_oid)
+        # The error is already logged in call_microsoft_graph_api_async
         raise HTTPException(
             status_code=status.HTTP_503_SERVICE_UNAVAILABLE, 
             detail="Could not retrieve data from Microsoft Graph API. Check logs for details."
         )
         
-    logger.info(f"Successfully retrieved /me data for user {current_user.email}")
+    logger.info("Successfully retrieved /me data for user %s", current_user.email)
     return graph_data 
\ No newline at end of file
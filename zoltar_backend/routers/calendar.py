@@ -1,11 +1,11 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Body, Depends, HTTPException, status, Query
+from pydantic import TypeAdapter, ValidationError
 from sqlalchemy.orm import Session
 import logging
 from typing import Dict, Optional, List
 import datetime # Need datetime for duration calculation
 
 # Zoltar imports
-import crud
 import models
 import schemas
 import auth
@@ -29,62 +29,51 @@ router = APIRouter(
 CALENDAR_READ_SCOPES = ["Calendars.Read"]
 CALENDAR_WRITE_SCOPES = ["Calendars.ReadWrite"]
 
+_UTC = datetime.timezone.utc
+_ZERO_OFFSET = datetime.timedelta(0)
+_REMINDER_EVENT_DURATION = datetime.timedelta(minutes=15)
+
+# Validates a whole page of agenda events in one call instead of one model construction per event
+_EVENT_LIST_ADAPTER = TypeAdapter(List[schemas.CalendarEvent])
+
 # --- Endpoint implementations will go here ---
 
 @router.get("/test") # Simple test endpoint to check router setup
 async def test_calendar_router(current_user: models.User = Depends(auth.get_current_active_user)):
-    logger.info(f"Calendar test endpoint accessed by {current_user.email}")
+    logger.info("Calendar test endpoint accessed by %s", current_user.email)
     return {"message": "Calendar router is active", "user": current_user.email}
 
-@router.post("/reminders/{reminder_id}", status_code=status.HTTP_201_CREATED)
-async def sync_reminder_to_calendar(
+def get_owned_reminder(
     reminder_id: int,
     db: Session = Depends(get_db),
     current_user: models.User = Depends(auth.get_current_active_user)
-) -> Dict:
-    """Creates a Microsoft Calendar event corresponding to a Zoltar Reminder."""
-    logger.info(f"Request to sync reminder ID {reminder_id} to calendar for user {current_user.email}")
-
-    # 1. Check if MS account is linked
-    if not current_user.ms_oid:
-        logger.warning(f"User {current_user.email} tried to sync reminder but has no linked Microsoft OID.")
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Microsoft account not linked. Please use the /auth/microsoft/login flow first."
-        )
-
-    # 2. Get the reminder from Zoltar DB
-    reminder = crud.get_reminder(db=db, reminder_id=reminder_id)
+) -> models.Reminder:
+    """Loads a reminder owned by the current user in one query; 404 if missing or not owned."""
+    reminder = db.query(models.Reminder).filter(
+        models.Reminder.id == reminder_id,
+        models.Reminder.owner_id == current_user.id
+    ).first()
     if reminder is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Reminder with ID {reminder_id} not found.")
-    
-    # Check ownership
-    if reminder.owner_id != current_user.id:
-        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not authorized to access this reminder.")
-        
-    # 3. Validate reminder data needed for calendar event
-    if not reminder.trigger_datetime:
-        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Reminder must have a trigger_datetime to be synced to calendar.")
-        
-    if not reminder.title:
-         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Reminder must have a title to be synced to calendar.")
+    return reminder
 
+def _reminder_event_data(reminder: models.Reminder) -> Dict:
+    """Builds the Graph event body for a reminder (requires trigger_datetime and title)."""
     # Ensure trigger_datetime is timezone-aware (should be UTC from DB)
     start_time = reminder.trigger_datetime
     if start_time.tzinfo is None:
         # This shouldn't happen if data is saved correctly, but handle defensively
-        logger.warning(f"Reminder {reminder_id} trigger_datetime is timezone-naive. Assuming UTC.")
-        start_time = start_time.replace(tzinfo=datetime.timezone.utc)
-    else:
-        # Convert to UTC just in case it was stored with a different offset
-        start_time = start_time.astimezone(datetime.timezone.utc)
+        logger.warning("Reminder %s trigger_datetime is timezone-naive. Assuming UTC.", reminder.id)
+        start_time = start_time.replace(tzinfo=_UTC)
+    elif start_time.utcoffset() != _ZERO_OFFSET:
+        # Convert to UTC just in case it was stored with a different offset (already-UTC values skip this)
+        start_time = start_time.astimezone(_UTC)
         
     # Set default duration (e.g., 15 minutes)
-    end_time = start_time + datetime.timedelta(minutes=15)
+    end_time = start_time + _REMINDER_EVENT_DURATION
 
-    # 4. Format data for Microsoft Graph API event
     # https://learn.microsoft.com/en-us/graph/api/resources/event?view=graph-rest-1.0
-    event_data = {
+    return {
         "subject": reminder.title,
         "body": {
             "contentType": "Text", # Or "HTML"
@@ -99,15 +88,115 @@ async def sync_reminder_to_calendar(
             "timeZone": "UTC" # Specify timezone
         },
         # Optional: Add a link back to the Zoltar reminder?
-        # "webLink": f"http://your-zoltar-instance/reminders/{reminder_id}", 
+        # "webLink": f"http://your-zoltar-instance/reminders/{reminder.id}", 
         # Optional: Add reminder settings for the calendar event itself?
         # "isReminderOn": True,
         # "reminderMinutesBeforeStart": 15 
     }
 
+@router.post("/reminders/batch", status_code=status.HTTP_200_OK)
+async def sync_reminders_to_calendar_batch(
+    reminder_ids: List[int] = Body(..., embed=True),
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(auth.get_current_active_user)
+) -> Dict:
+    """Creates Microsoft Calendar events for several Zoltar Reminders using Graph JSON batching
+    (up to 20 events per request). Returns a per-reminder result."""
+    logger.info("Request to batch sync %s reminders to calendar for user %s", len(reminder_ids), current_user.email)
+
+    if not current_user.ms_oid:
+        logger.warning("User %s tried to sync reminders but has no linked Microsoft OID.", current_user.email)
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Microsoft account not linked. Please use the /auth/microsoft/login flow first."
+        )
+
+    # Load all requested reminders owned by the user in one query
+    reminders = {
+        reminder.id: reminder
+        for reminder in db.query(models.Reminder).filter(
+            models.Reminder.id.in_(reminder_ids),
+            models.Reminder.owner_id == current_user.id
+        ).all()
+    }
+
+    results = []
+    batch_requests = []
+    for reminder_id in dict.fromkeys(reminder_ids): # De-duplicate, keep order
+        reminder = reminders.get(reminder_id)
+        if reminder is None:
+            results.append({"reminder_id": reminder_id, "status": status.HTTP_404_NOT_FOUND, "error": "Reminder not found."})
+        elif not reminder.trigger_datetime or not reminder.title:
+            results.append({"reminder_id": reminder_id, "status": status.HTTP_400_BAD_REQUEST,
+                            "error": "Reminder must have a trigger_datetime and a title to be synced to calendar."})
+        else:
+            batch_requests.append({
+                "id": str(reminder_id), # Maps each batch response back to its reminder
+                "method": "POST",
+                "url": "/me/events",
+                "headers": {"Content-Type": "application/json"},
+                "body": _reminder_event_data(reminder),
+            })
+
+    if batch_requests:
+        responses = await auth_utils_ms.call_microsoft_graph_batch_async(
+            db=db,
+            ms_oid=current_user.ms_oid,
+            scopes=CALENDAR_WRITE_SCOPES,
+            requests=batch_requests
+        )
+        if responses is None:
+            logger.error("Failed to batch create calendar events via Graph API for user %s", current_user.email)
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Could not create calendar events via Microsoft Graph API. Check logs."
+            )
+        for response in responses:
+            body = response.get("body") or {}
+            result = {"reminder_id": int(response["id"]), "status": response.get("status")}
+            if response.get("status") == status.HTTP_201_CREATED:
+                result["event_id"] = body.get("id")
+            else:
+                result["error"] = body.get("error", {}).get("message", "Graph API request failed.")
+            results.append(result)
+
+    logger.info("Batch calendar sync finished for user %s: %s/%s created", current_user.email,
+                sum(1 for r in results if r['status'] == status.HTTP_201_CREATED), len(results))
+    return {"results": results}
+
+@router.post("/reminders/{reminder_id}", status_code=status.HTTP_201_CREATED)
+async def sync_reminder_to_calendar(
+    reminder_id: int,
+    reminder: models.Reminder = Depends(get_owned_reminder),
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(auth.get_current_active_user)
+) -> Dict:
+    """Creates a Microsoft Calendar event corresponding to a Zoltar Reminder."""
+    logger.info("Request to sync reminder ID %s to calendar for user %s", reminder_id, current_user.email)
+
+    # 1. Check if MS account is linked
+    if not current_user.ms_oid:
+        logger.warning("User %s tried to sync reminder but has no linked Microsoft OID.", current_user.email)
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Microsoft account not linked. Please use the /auth/microsoft/login flow first."
+        )
+
+    # 2. The reminder is loaded and owner-checked by get_owned_reminder
+
+    # 3. Validate reminder data needed for calendar event
+    if not reminder.trigger_datetime:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Reminder must have a trigger_datetime to be synced to calendar.")
+        
+    if not reminder.title:
+         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Reminder must have a title to be synced to calendar.")
+
+    # 4. Format data for Microsoft Graph API event
+    event_data = _reminder_event_data(reminder)
+
     # 5. Call Graph API to create the event
-    logger.debug(f"Calling Graph API to create event for reminder {reminder_id}")
-    graph_result = auth_utils_ms.call_microsoft_graph_api(
+    logger.debug("Calling Graph API to create event for reminder %s", reminder_id)
+    graph_result = await auth_utils_ms.call_microsoft_graph_api_async(
         db=db,
         ms_oid=current_user.ms_oid,
         scopes=CALENDAR_WRITE_SCOPES, # Use write scopes
@@ -117,13 +206,13 @@ async def sync_reminder_to_calendar(
     )
 
     if graph_result is None:
-        logger.error(f"Failed to create calendar event via Graph API for reminder {reminder_id}")
+        logger.error("Failed to create calendar event via Graph API for reminder %s", reminder_id)
         raise HTTPException(
             status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
             detail="Could not create calendar event via Microsoft Graph API. Check logs."
         )
 
-    logger.info(f"Successfully created calendar event for reminder {reminder_id}. Graph Event ID: {graph_result.get('id')}")
+    logger.info("Successfully created calendar event for reminder %s. Graph Event ID: %s", reminder_id, graph_result.get('id'))
     
     # Return the created event details from Graph API
     return graph_result 
@@ -141,18 +230,18 @@ async def read_calendar_agenda(
 
     Connects to the user's linked Outlook calendar via Microsoft Graph.
     """
-    logger.info(f"Fetching agenda for user {current_user.email} from {start_time} to {end_time}")
+    logger.info("Fetching agenda for user %s from %s to %s", current_user.email, start_time, end_time)
 
     # 1. Check if MS account is linked
     if not current_user.ms_oid:
-        logger.warning(f"User {current_user.email} tried to read agenda but has no linked Microsoft OID.")
+        logger.warning("User %s tried to read agenda but has no linked Microsoft OID.", current_user.email)
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Microsoft account not linked. Cannot fetch calendar agenda."
         )
 
     # 2. Call the helper function to get events from Graph API
-    raw_events = auth_utils_ms.get_outlook_calendar_events(
+    raw_events = await auth_utils_ms.get_outlook_calendar_events_async(
         db=db,
         ms_oid=current_user.ms_oid,
         start_time=start_time,
@@ -161,36 +250,37 @@ async def read_calendar_agenda(
 
     # 3. Handle failure from the Graph API call
     if raw_events is None:
-        logger.error(f"Failed to retrieve calendar events from Graph for user {current_user.email} (OID: {current_user.ms_oid}).")
+        logger.error("Failed to retrieve calendar events from Graph for user %s (OID: %s).", current_user.email, current_user.ms_oid)
         # Return 503 Service Unavailable as the external service failed
         raise HTTPException(
             status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
             detail="Could not retrieve calendar events from Microsoft Graph."
         )
         
-    # 4. Process the raw events and map to the response schema
-    calendar_events: List[schemas.CalendarEvent] = []
-    for event_data in raw_events:
-        try:
-            # Extract required fields - MS Graph returns start/end as dicts
-            start_dt_str = event_data.get('start', {}).get('dateTime')
-            end_dt_str = event_data.get('end', {}).get('dateTime')
-            
-            # Let Pydantic handle parsing ISO strings with timezone (should be UTC)
-            parsed_event = schemas.CalendarEvent(
-                id=event_data.get('id'),
-                subject=event_data.get('subject'),
-                body_preview=event_data.get('bodyPreview'),
-                start_datetime=start_dt_str, # Pass the string directly
-                end_datetime=end_dt_str      # Pass the string directly
-            )
-            calendar_events.append(parsed_event)
-        except Exception as e: # Catch potential validation errors or missing keys
-            event_id = event_data.get('id', 'unknown')
-            logger.warning(f"Skipping event ID {event_id} due to processing error: {e}", exc_info=False) # Log less verbosely
-            continue # Skip this event if parsing fails
+    # 4. Map the raw events to the response schema; MS Graph returns start/end as dicts
+    # and Pydantic parses the ISO strings (should be UTC)
+    mapped_events = [
+        {
+            "id": event_data.get('id'),
+            "subject": event_data.get('subject'),
+            "body_preview": event_data.get('bodyPreview'),
+            "start_datetime": (event_data.get('start') or {}).get('dateTime'),
+            "end_datetime": (event_data.get('end') or {}).get('dateTime'),
+        }
+        for event_data in raw_events
+    ]
+    try:
+        calendar_events = _EVENT_LIST_ADAPTER.validate_python(mapped_events)
+    except ValidationError as e:
+        # Skip the events that failed validation and keep the rest
+        invalid_indexes = {error["loc"][0] for error in e.errors() if error["loc"]}
+        for index in sorted(invalid_indexes):
+            logger.warning("Skipping event ID %s due to validation error", mapped_events[index]['id'] or 'unknown')
+        calendar_events = _EVENT_LIST_ADAPTER.validate_python(
+            [event for index, event in enumerate(mapped_events) if index not in invalid_indexes]
+        )
 
-    logger.info(f"Successfully processed {len(calendar_events)} events for user {current_user.email}")
+    logger.info("Successfully processed %s events for user %s", len(calendar_events), current_user.email)
     return calendar_events
 
 @router.post("/events", response_model=schemas.CalendarEvent, status_code=status.HTTP_201_CREATED)
@@ -200,11 +290,11 @@ async def create_calendar_event(
     current_user: models.User = Depends(auth.get_current_active_user)
 ):
     """Creates a new event directly in the user's linked Microsoft Calendar."""
-    logger.info(f"Received request to create calendar event: '{event.subject}' for user {current_user.email}")
+    logger.info("Received request to create calendar event: '%s' for user %s", event.subject, current_user.email)
     
     # 1. Check if user has ms_oid
     if not current_user.ms_oid:
-        logger.warning(f"User {current_user.email} tried to create calendar event but has no linked Microsoft OID.")
+        logger.warning("User %s tried to create calendar event but has no linked Microsoft OID.", current_user.email)
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Microsoft account not linked. Cannot create calendar event."
@@ -215,12 +305,12 @@ async def create_calendar_event(
         payload = auth_utils_ms.create_outlook_calendar_event_payload(event_data=event)
     except Exception as e:
         # Catch potential errors during payload creation (e.g., datetime issues missed by validator?)
-        logger.error(f"Error creating Graph API payload for event '{event.subject}': {e}", exc_info=True)
+        logger.error("Error creating Graph API payload for event '%s': %s", event.subject, e, exc_info=True)
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Error processing event data: {e}")
 
     # 3. Call Graph API POST /me/events using auth_utils_ms.call_microsoft_graph_api
-    logger.debug(f"Calling Graph API to create event for user {current_user.email}")
-    graph_response = auth_utils_ms.call_microsoft_graph_api(
+    logger.debug("Calling Graph API to create event for user %s", current_user.email)
+    graph_response = await auth_utils_ms.call_microsoft_graph_api_async(
         db=db,
         ms_oid=current_user.ms_oid,
         scopes=CALENDAR_WRITE_SCOPES, # Ensure correct scopes are used
@@ -231,7 +321,7 @@ async def create_calendar_event(
 
     # 4. Handle Graph API errors (returns None)
     if graph_response is None:
-        logger.error(f"Failed to create calendar event '{event.subject}' via Graph API for user {current_user.email}")
+        logger.error("Failed to create calendar event '%s' via Graph API for user %s", event.subject, current_user.email)
         raise HTTPException(
             status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
             detail="Could not create calendar event via Microsoft Graph API. Check logs."
@@ -255,18 +345,18 @@ async def create_calendar_event(
             end_datetime=end_info.get("dateTime")
         )
         
-        logger.info(f"Successfully created and parsed calendar event ID: {created_event_response.id}")
+        logger.info("Successfully created and parsed calendar event ID: %s", created_event_response.id)
         return created_event_response
         
     except KeyError as e:
         # Handle cases where the Graph API response is missing expected keys
-        logger.error(f"Graph API response missing expected key: {e}. Response: {graph_response}", exc_info=True)
+        logger.error("Graph API response missing expected key: %s. Response: %s", e, graph_response, exc_info=True)
         raise HTTPException(
             status_code=status.HTTP_502_BAD_GATEWAY, # Indicate error communicating with upstream server
             detail=f"Received unexpected response format from Microsoft Graph API after creating event."
         )
     except Exception as e: # Catch potential Pydantic validation errors or other issues
-        logger.error(f"Error parsing Graph API response: {e}. Response: {graph_response}", exc_info=True)
+        logger.error("Error parsing Graph API response: %s. Response: %s", e, graph_response, exc_info=True)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Failed to process response from Microsoft Graph API after creating event."
@@ -292,18 +382,18 @@ async def update_calendar_event(
     current_user: models.User = Depends(auth.get_current_active_user)
 ):
     """Updates an existing event in the user's linked Microsoft Calendar."""
-    logger.info(f"Received request to update calendar event ID: {event_id} for user {current_user.email}")
+    logger.info("Received request to update calendar event ID: %s for user %s", event_id, current_user.email)
 
     # 1. Check if user has ms_oid
     if not current_user.ms_oid:
-        logger.warning(f"User {current_user.email} tried to update calendar event but has no linked Microsoft OID.")
+        logger.warning("User %s tried to update calendar event but has no linked Microsoft OID.", current_user.email)
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Microsoft account not linked. Cannot update calendar event."
         )
         
-    # Prevent sending empty updates
-    if update_data.model_dump(exclude_unset=True) == {}:
+    # Prevent sending empty updates (model_fields_set is checked without serializing the model)
+    if not update_data.model_fields_set:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="No update data provided."
@@ -313,13 +403,13 @@ async def update_calendar_event(
     try:
         payload = auth_utils_ms.create_outlook_calendar_update_payload(update_data=update_data)
     except Exception as e:
-        logger.error(f"Error creating Graph API PATCH payload for event {event_id}: {e}", exc_info=True)
+        logger.error("Error creating Graph API PATCH payload for event %s: %s", event_id, e, exc_info=True)
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Error processing update data: {e}")
 
     # 3. Call Graph API PATCH /me/events/{event_id}
-    logger.debug(f"Calling Graph API PATCH for event {event_id} for user {current_user.email}")
+    logger.debug("Calling Graph API PATCH for event %s for user %s", event_id, current_user.email)
     graph_endpoint = f"/me/events/{event_id}"
-    graph_response = auth_utils_ms.call_microsoft_graph_api(
+    graph_response = await auth_utils_ms.call_microsoft_graph_api_async(
         db=db,
         ms_oid=current_user.ms_oid,
         scopes=CALENDAR_WRITE_SCOPES, # Use write scopes
@@ -333,7 +423,7 @@ async def update_calendar_event(
     # A more specific error handling might involve catching HTTPError here or modifying the helper.
     if graph_response is None:
         # Could be 404 Not Found, 401/403, 5xx, or other connection issue.
-        logger.error(f"Graph API call failed for PATCH {graph_endpoint} for user {current_user.email}")
+        logger.error("Graph API call failed for PATCH %s for user %s", graph_endpoint, current_user.email)
         # Returning 503 is a general "upstream service failed" indicator.
         # If distinguishing 404 is critical, further refinement is needed.
         raise HTTPException(
@@ -357,17 +447,17 @@ async def update_calendar_event(
             end_datetime=end_info.get("dateTime")
         )
         
-        logger.info(f"Successfully updated and parsed calendar event ID: {updated_event_response.id}")
+        logger.info("Successfully updated and parsed calendar event ID: %s", updated_event_response.id)
         return updated_event_response
 
     except KeyError as e:
-        logger.error(f"Graph API PATCH response missing expected key: {e}. Response: {graph_response}", exc_info=True)
+        logger.error("Graph API PATCH response missing expected key: %s. Response: %s", e, graph_response, exc_info=True)
         raise HTTPException(
             status_code=status.HTTP_502_BAD_GATEWAY,
             detail="Received unexpected response format from Microsoft Graph API after updating event."
         )
     except Exception as e:
-        logger.error(f"Error parsing Graph API PATCH response: {e}. Response: {graph_response}", exc_info=True)
+        logger.error("Error parsing Graph API PATCH response: %s. Response: %s", e, graph_response, exc_info=True)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Failed to process response from Microsoft Graph API after updating event."
@@ -1,6 +1,6 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy.orm import Session
-from typing import List
+from typing import Optional
 
 # Change to direct imports
 import crud
@@ -24,15 +24,17 @@ def create_category(
 ):
     return crud.create_user_category(db=db, category=category, user_id=current_user.id)
 
-@router.get("/", response_model=List[schemas.Category])
+@router.get("/", response_model=schemas.CategoryPage)
 def read_categories(
-    skip: int = 0, 
-    limit: int = 100, 
+    after_id: Optional[int] = None,
+    limit: int = Query(100, ge=1, le=500),
     db: Session = Depends(get_db), 
     current_user: models.User = Depends(auth.get_current_active_user)
 ):
-    categories = crud.get_user_categories(db, user_id=current_user.id, skip=skip, limit=limit)
-    return categories
+    categories = crud.get_user_categories(db, user_id=current_user.id, after_id=after_id, limit=limit)
+    # A short page means there is nothing after it
+    next_cursor = categories[-1].id if len(categories) == limit else None
+    return {"items": categories, "next_cursor": next_cursor}
 
 @router.get("/{category_id}", response_model=schemas.Category)
 def read_category(
@@ -40,12 +42,10 @@ def read_category(
     db: Session = Depends(get_db), 
     current_user: models.User = Depends(auth.get_current_active_user)
 ):
-    db_category = crud.get_category(db, category_id=category_id)
+    # Owner check is part of the query; another user's category is reported as not found
+    db_category = crud.get_category(db, category_id=category_id, owner_id=current_user.id)
     if db_category is None:
         raise HTTPException(status_code=404, detail="Category not found")
-    if db_category.owner_id != current_user.id:
-        # Although the get_user_categories filters, this direct access needs owner check
-        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not authorized to access this category")
     return db_category
 
 @router.delete("/{category_id}", status_code=status.HTTP_204_NO_CONTENT)
@@ -1,18 +1,20 @@
-from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi import APIRouter, HTTPException
 from sqlalchemy.orm import Session
-from typing import Any
-from datetime import datetime
+from typing import List, Optional
+import asyncio
 import logging
-import requests
-import json
+
+import ciso8601 # C ISO 8601 parser; also accepts the 'Z' suffix the LLM often emits
 
 # Change to direct imports as modules are now at the same level in /app
 import crud
 import schemas
 import models
-import auth
 import llm_utils
-from database import get_db
+import intent_router
+import reminder_schedule
+from deps import DB, CurrentUser
+from routers import files # summarize_file is called in-process for request_file_summary
 
 logger = logging.getLogger(__name__)
 
@@ -36,19 +38,358 @@ router = APIRouter(
 # ... other intents ...
 # -----------------------------------------------
 
+def _reminder_create_from_entities(entities: dict, response_entities: dict) -> Optional[schemas.ReminderCreate]:
+    """Builds a one-time ReminderCreate from description and trigger_datetime_iso, or records
+    error context in response_entities and returns None."""
+    # Use description for reminder, consistent with schema
+    description = entities.get("description") 
+    iso_datetime_str = entities.get("trigger_datetime_iso")
+
+    # Check for required fields
+    if not description or not iso_datetime_str:
+        logger.warning("Missing description or trigger_datetime_iso for create_reminder.")
+        # Remove direct message setting, add error context to entities
+        # response_message = "Sorry, I need both a description and a time to create a reminder." # noqa
+        response_entities["error"] = "missing_required_entities"
+        response_entities["missing"] = ["description", "trigger_datetime_iso"] # Be specific
+        return None
+
+    logger.debug(f"Attempting to parse ISO string: '{iso_datetime_str}'")
+    try:
+        trigger_dt = ciso8601.parse_datetime(iso_datetime_str)
+        logger.debug(f"Successfully parsed datetime: {trigger_dt}")
+        if trigger_dt.tzinfo is None:
+             logger.warning(f"Parsed datetime {trigger_dt} is timezone-naive. Assuming UTC for now.")
+
+        return schemas.ReminderCreate(
+            description=description, 
+            trigger_datetime=trigger_dt,
+            reminder_type=schemas.ReminderType.ONE_TIME, 
+        )
+    except ValueError as ve: 
+        logger.error(f"ValueError caught during date parsing: {ve}", exc_info=True)
+        # Remove direct message setting, add error context to entities
+        # response_message = "Sorry, I couldn't understand the date/time for the reminder." # noqa
+        response_entities["error"] = "datetime_parse_error"
+        response_entities["value"] = iso_datetime_str # Include the value that failed
+        return None
+
+async def _handle_create_reminder(
+    entities: dict, response_entities: dict, db: Session, current_user: models.User
+) -> bool:
+    """Creates a one-time reminder from description and trigger_datetime_iso. Records results or error context in response_entities;
+    returns whether the action was performed."""
+    action_performed = False
+    logger.info(f"Routing to create_reminder with entities: {entities}")
+    try:
+        reminder_in = _reminder_create_from_entities(entities, response_entities)
+        if reminder_in is not None:
+            try:
+                logger.debug("Calling create_user_reminder...")
+                created_reminder = await asyncio.to_thread(
+                    crud.create_user_reminder, db=db, reminder=reminder_in, owner_id=current_user.id
+                )
+                logger.debug("create_user_reminder successful.")
+                reminder_schedule.invalidate_next_due()
+                # Remove direct message setting, update entities with result
+                # response_message = f"OK. I've created reminder {created_reminder.id}: '{created_reminder.description}' due on {created_reminder.trigger_datetime.strftime('%Y-%m-%d %H:%M')}." # noqa
+                response_entities["created_reminder_id"] = created_reminder.id 
+                response_entities["created_description"] = created_reminder.description # Pass back info needed for response
+                response_entities["created_trigger_datetime"] = created_reminder.trigger_datetime.isoformat() # Pass back info needed for response
+                action_performed = True 
+            except Exception as crud_err: 
+                logger.error(f"Error creating reminder in DB: {crud_err}", exc_info=True)
+                # Remove direct message setting, add error context to entities
+                # response_message = "Sorry, there was an issue saving the reminder."
+                response_entities["error"] = "database_error"
+                response_entities["operation"] = "create_reminder"
+
+    except Exception as outer_err: 
+         logger.error(f"Unexpected error processing create_reminder intent: {outer_err}", exc_info=True)
+         # Remove direct message setting, add error context to entities
+         # response_message = "Sorry, an unexpected error occurred while creating the reminder."
+         response_entities["error"] = "unexpected_error"
+         response_entities["intent_context"] = "create_reminder"
+    return action_performed
+
+async def _handle_create_task(
+    entities: dict, response_entities: dict, db: Session, current_user: models.User
+) -> bool:
+    """Creates a task from title, description and an optional due_date_iso. Records results or error context in response_entities;
+    returns whether the action was performed."""
+    action_performed = False
+    logger.info(f"Routing to create_task with entities: {entities}")
+    try:
+        title = entities.get("title")
+        if not title:
+             logger.warning("Missing title for create_task intent.")
+             # Remove direct message setting, add error context
+             # response_message = "Sorry, I need a title to create a task."
+             response_entities["error"] = "missing_required_entities"
+             response_entities["missing"] = ["title"]
+        else:
+            due_date_iso = entities.get("due_date_iso")
+            due_date = None
+            parsing_error = False
+            if due_date_iso:
+                try:
+                    due_date = ciso8601.parse_datetime(due_date_iso)
+                    if due_date.tzinfo is None:
+                        logger.warning(f"Parsed due_date {due_date} is timezone-naive. Assuming UTC for now.")
+                except ValueError:
+                    logger.error(f"Failed to parse task due_date_iso: {due_date_iso}")
+                    # Keep track of the parsing error for context, but don't set response_message yet
+                    # response_message = "Warning: Could not understand the due date. Task created without it."
+                    response_entities["warning"] = "datetime_parse_error" # Use warning key?
+                    response_entities["value"] = due_date_iso
+                    parsing_error = True 
+            try:
+                task_data = schemas.TaskCreate(
+                    title=title,
+                    description=entities.get("description"),
+                    due_date=None if parsing_error else due_date,
+                )
+                created_task = await asyncio.to_thread(
+                    crud.create_user_task, db=db, task=task_data, owner_id=current_user.id
+                )
+                # Remove direct message setting, update entities with result
+                # response_message = (response_message + " " + base_response) if parsing_error else base_response
+                response_entities["created_task_id"] = created_task.id
+                response_entities["created_title"] = created_task.title # Pass back info
+                response_entities["created_description"] = created_task.description # Pass back info
+                response_entities["created_due_date"] = created_task.due_date.isoformat() if created_task.due_date else None # Pass back info
+                # Keep parsing warning if it occurred
+                # response_entities["warning"] will persist if set above
+                action_performed = True
+            except Exception as crud_err: 
+                logger.error(f"Error creating task in DB: {crud_err}", exc_info=True)
+                # Remove direct message setting, add error context
+                # response_message = "Sorry, there was an issue saving the task."
+                response_entities["error"] = "database_error"
+                response_entities["operation"] = "create_task"
+
+    except Exception as outer_err: 
+        logger.error(f"Unexpected error processing create_task intent: {outer_err}", exc_info=True)
+        response_entities["error"] = "unexpected_error"
+        response_entities["intent_context"] = "create_task"
+    return action_performed
+
+async def _handle_request_file_summary(
+    entities: dict, response_entities: dict, db: Session, current_user: models.User
+) -> bool:
+    """Summarizes the file given by file_id. Records results or error context in response_entities;
+    returns whether the action was performed."""
+    action_performed = False
+    logger.info(f"Routing to request_file_summary with entities: {entities}")
+    file_id = entities.get("file_id")
+    if not isinstance(file_id, int):
+        logger.warning(f"Could not extract valid integer file_id from entities: {entities}")
+        response_entities["error"] = "missing_or_invalid_entity"
+        response_entities["expected_entity"] = "file_id (integer)"
+    else:
+        logger.info(f"Extracted file_id {file_id} for summarization. Calling summarize_file directly.")
+
+        # --- In-process call to the /files/{file_id}/summarize handler (no HTTP round trip) --- 
+        try:
+            summary_response = await files.summarize_file(file_id=file_id, db=db, current_user=current_user)
+
+            # Update entities based on the summarization result
+            if summary_response.error:
+                response_entities["error"] = "summarization_failed"
+                response_entities["details"] = summary_response.error
+            elif summary_response.summary:
+                response_entities["summary"] = summary_response.summary
+                response_entities["summarized_file_id"] = file_id
+                action_performed = True # Mark action as successful
+            else:
+                response_entities["error"] = "summarization_unexpected_response"
+                response_entities["details"] = "Summarization returned unexpected data."
+
+        except HTTPException as http_err: # File missing or not owned
+             logger.warning(f"Summarization of file {file_id} rejected: {http_err.status_code} {http_err.detail}")
+             response_entities["error"] = "summarization_api_call_failed"
+             response_entities["status_code"] = http_err.status_code
+             response_entities["details"] = http_err.detail
+        except Exception as e:
+             logger.error(f"Unexpected error during summarization call: {e}", exc_info=True)
+             response_entities["error"] = "summarization_unexpected_error"
+             response_entities["details"] = str(e)
+        # --- End summarize call --- 
+    return action_performed
+
+async def _handle_associate_file(
+    entities: dict, response_entities: dict, db: Session, current_user: models.User
+) -> bool:
+    """Links file_id to the task or project given by target_type and target_id. Records results or error context in response_entities;
+    returns whether the action was performed."""
+    action_performed = False
+    logger.info(f"Routing to associate_file with entities: {entities}")
+    file_id = entities.get("file_id")
+    target_type = entities.get("target_type")
+    target_id = entities.get("target_id")
+
+    # Validate extracted entities in one check; the missing list is only built on failure
+    if not (isinstance(file_id, int) and target_type in ("task", "project") and isinstance(target_id, int)):
+        missing = [name for name, ok in (
+            ("file_id (integer)", isinstance(file_id, int)),
+            ("target_type ('task' or 'project')", target_type in ("task", "project")),
+            ("target_id (integer)", isinstance(target_id, int)),
+        ) if not ok]
+        logger.warning(f"Could not extract valid entities for associate_file: Missing {missing}")
+        response_entities["error"] = "missing_or_invalid_entity"
+        response_entities["missing"] = missing
+        response_entities["details"] = "I need the file ID, the target type (task or project), and the target ID."
+    else:
+        logger.info(f"Extracted details for association: file={file_id}, target_type={target_type}, target_id={target_id}")
+
+        # --- Call CRUD function --- 
+        # Both ids were type-checked above, so skip Pydantic validation
+        update_payload = schemas.FileReferenceUpdate.model_construct(
+            project_id=target_id if target_type == "project" else None,
+            task_id=target_id if target_type == "task" else None
+        )
+
+        try:
+            association_result = await asyncio.to_thread(
+                crud.update_file_reference_links,
+                db=db,
+                user_id=current_user.id,
+                file_id=file_id,
+                update_data=update_payload
+            )
+
+            # Handle CRUD result
+            if isinstance(association_result, str): # Error code returned
+                if association_result == "unauthorized_file":
+                     response_entities["error"] = "auth_error"
+                     response_entities["details"] = "You don't own the file you're trying to associate."
+                elif association_result == "invalid_project":
+                     response_entities["error"] = "invalid_target"
+                     response_entities["details"] = f"Project ID {target_id} not found or you don't own it."
+                elif association_result == "invalid_task":
+                     response_entities["error"] = "invalid_target"
+                     response_entities["details"] = f"Task ID {target_id} not found or you don't own it."
+                else:
+                     response_entities["error"] = "crud_error"
+                     response_entities["details"] = f"Unknown CRUD error: {association_result}"
+            elif association_result is None:
+                response_entities["error"] = "not_found"
+                response_entities["details"] = f"File ID {file_id} not found."
+            else: # Success (association_result is the updated FileReference model)
+                logger.info(f"Successfully associated file {file_id} with {target_type} {target_id}")
+                action_performed = True # Mark action as successful
+                # Add context for response generation
+                response_entities["association_details"] = { 
+                    "file_id": file_id,
+                    "target_type": target_type,
+                    "target_id": target_id,
+                    "success": True,
+                    # Ensure both keys always exist for consistent structure
+                    "project_name": None, 
+                    "task_title": None 
+                }
+                # Add linked item details if needed for response
+                if target_type == "project" and association_result.project:
+                    response_entities["association_details"]["project_name"] = association_result.project.name
+                elif target_type == "task" and association_result.task:
+                     response_entities["association_details"]["task_title"] = association_result.task.title
+
+        except Exception as e:
+            logger.error(f"Unexpected error during file association CRUD call: {e}", exc_info=True)
+            response_entities["error"] = "unexpected_error"
+            response_entities["details"] = str(e)
+        # --- End CRUD call --- 
+    return action_performed
+
+async def _handle_batch_intents(
+    entities: dict, response_entities: dict, db: Session, current_user: models.User
+) -> bool:
+    """Runs each {"intent", "entities"} item in entities["intents"]. All create_reminder items are
+    inserted in one round trip; other items go through their normal handler. Per-item results
+    are recorded in response_entities["results"]; returns whether any action was performed."""
+    items = entities.get("intents")
+    if not isinstance(items, list) or not all(isinstance(item, dict) for item in items):
+        logger.warning(f"Could not extract a valid intents list for batch_intents: {entities}")
+        response_entities["error"] = "missing_or_invalid_entity"
+        response_entities["expected_entity"] = "intents (list of objects)"
+        return False
+    logger.info(f"Routing batch of {len(items)} intents")
+
+    results = [{"intent": item.get("intent") or "unknown", "entities": dict(item.get("entities") or {})} for item in items]
+    action_performed = False
+
+    # --- Reminders: validate each, then insert the valid ones together --- 
+    pending: List[tuple] = [] # (result entities, ReminderCreate)
+    for result in results:
+        if result["intent"] == "create_reminder":
+            reminder_in = _reminder_create_from_entities(result["entities"], result["entities"])
+            if reminder_in is not None:
+                pending.append((result["entities"], reminder_in))
+    if pending:
+        try:
+            reminder_ids = await asyncio.to_thread(
+                crud.create_user_reminders_bulk, db, [reminder_in for _, reminder_in in pending], current_user.id
+            )
+            reminder_schedule.invalidate_next_due()
+            for (result_entities, reminder_in), reminder_id in zip(pending, reminder_ids):
+                result_entities["created_reminder_id"] = reminder_id
+                result_entities["created_description"] = reminder_in.description
+                result_entities["created_trigger_datetime"] = reminder_in.trigger_datetime.isoformat()
+            response_entities["created_reminder_ids"] = reminder_ids
+            action_performed = True
+        except Exception as crud_err:
+            logger.error(f"Error bulk-creating reminders in DB: {crud_err}", exc_info=True)
+            for result_entities, _ in pending:
+                result_entities["error"] = "database_error"
+                result_entities["operation"] = "create_reminder"
+
+    # --- Everything else, one at a time --- 
+    for result in results:
+        intent = result["intent"]
+        if intent in ("create_reminder", "batch_intents"): # Nested batches are not run
+            continue
+        handler = INTENT_HANDLERS.get(intent)
+        if handler is not None:
+            performed = await handler(result["entities"], result["entities"], db, current_user)
+            action_performed = action_performed or performed
+
+    response_entities["results"] = results
+    return action_performed
+
+# Intent -> handler for intents that run a backend action. Their response text is generated
+# from the action's result; any other intent uses a response_text returned with the intent
+# extraction, if present.
+INTENT_HANDLERS = {
+    "create_reminder": _handle_create_reminder,
+    "create_task": _handle_create_task,
+    "request_file_summary": _handle_request_file_summary,
+    "associate_file": _handle_associate_file,
+    "batch_intents": _handle_batch_intents,
+}
+ACTION_INTENTS = frozenset(INTENT_HANDLERS)
+
+# Returned when building the final response fails; built once, never mutated
+_INTERNAL_ERROR_RESPONSE = schemas.ChatResponse(
+    intent="internal_error",
+    entities={"error": "Failed to construct final response"},
+    response_text="Sorry, a critical error occurred while preparing the response."
+)
+
 @router.post("/message", response_model=schemas.ChatResponse)
-def process_chat_message(
+async def process_chat_message(
     message: schemas.ChatMessageCreate,
-    request: Request,
-    db: Session = Depends(get_db),
-    current_user: models.User = Depends(auth.get_current_active_user)
+    db: DB,
+    current_user: CurrentUser
 ) -> schemas.ChatResponse:
     """Receives a chat message, extracts intent/entities using LLM."""
     
-    print(f"Received message: '{message.text}' from user: {current_user.email}")
+    logger.debug("Received message: '%s' from user: %s", message.text, current_user.email)
 
-    # Call the LLM utility function
-    llm_result = llm_utils.extract_intent_entities(message.text)
+    # Greetings, thanks and other fixed phrasings are classified without an LLM round trip
+    llm_result = intent_router.classify(message.text)
+    if llm_result is None:
+        # Call the LLM utility function (blocking; run off the event loop)
+        llm_result = await asyncio.to_thread(llm_utils.extract_intent_entities, message.text)
 
     if not llm_result:
         # Handle cases where LLM call failed entirely (e.g., API key issue)
@@ -56,269 +397,24 @@ def process_chat_message(
         raise HTTPException(status_code=503, detail="LLM service unavailable or failed.")
         # Previous return: return {"error": "Failed to process message with LLM."}
 
-    print(f"LLM Result: Intent='{llm_result.get('intent')}', Entities='{llm_result.get('entities')}'")
+    logger.debug("LLM Result: Intent='%s', Entities='%s'", llm_result.get("intent"), llm_result.get("entities"))
 
     intent = llm_result.get("intent")
     entities = llm_result.get("entities", {})
+    needs_action = intent in ACTION_INTENTS
 
     # Initialize response components
     response_intent = intent if intent else "unknown"
     response_entities = entities
-    response_message = "Sorry, I encountered an issue." # Default error message
     action_performed = False
 
     # --- Route based on intent --- 
-    if intent == "create_reminder":
-        logger.info(f"Routing to create_reminder with entities: {entities}")
-        try:
-            # Use description for reminder, consistent with schema
-            description = entities.get("description") 
-            iso_datetime_str = entities.get("trigger_datetime_iso")
-
-            # Check for required fields
-            if not description or not iso_datetime_str:
-                logger.warning("Missing description or trigger_datetime_iso for create_reminder.")
-                # Remove direct message setting, add error context to entities
-                # response_message = "Sorry, I need both a description and a time to create a reminder." # noqa
-                response_entities["error"] = "missing_required_entities"
-                response_entities["missing"] = ["description", "trigger_datetime_iso"] # Be specific
-            else:
-                logger.debug(f"Attempting to parse ISO string: '{iso_datetime_str}'")
-                try:
-                    trigger_dt = datetime.fromisoformat(iso_datetime_str)
-                    logger.debug(f"Successfully parsed datetime: {trigger_dt}")
-                    if trigger_dt.tzinfo is None:
-                         logger.warning(f"Parsed datetime {trigger_dt} is timezone-naive. Assuming UTC for now.")
-
-                    reminder_in = schemas.ReminderCreate(
-                        description=description, 
-                        trigger_datetime=trigger_dt,
-                        reminder_type=schemas.ReminderType.ONE_TIME, 
-                    )
-                    logger.debug("Calling create_user_reminder...")
-                    created_reminder = crud.create_user_reminder(
-                        db=db, reminder=reminder_in, owner_id=current_user.id
-                    )
-                    logger.debug("create_user_reminder successful.")
-                    # Remove direct message setting, update entities with result
-                    # response_message = f"OK. I've created reminder {created_reminder.id}: '{created_reminder.description}' due on {created_reminder.trigger_datetime.strftime('%Y-%m-%d %H:%M')}." # noqa
-                    response_entities["created_reminder_id"] = created_reminder.id 
-                    response_entities["created_description"] = created_reminder.description # Pass back info needed for response
-                    response_entities["created_trigger_datetime"] = created_reminder.trigger_datetime.isoformat() # Pass back info needed for response
-                    action_performed = True 
-                except ValueError as ve: 
-                    logger.error(f"ValueError caught during date parsing: {ve}", exc_info=True)
-                    # Remove direct message setting, add error context to entities
-                    # response_message = "Sorry, I couldn't understand the date/time for the reminder." # noqa
-                    response_entities["error"] = "datetime_parse_error"
-                    response_entities["value"] = iso_datetime_str # Include the value that failed
-                except Exception as crud_err: 
-                    logger.error(f"Error creating reminder in DB: {crud_err}", exc_info=True)
-                    # Remove direct message setting, add error context to entities
-                    # response_message = "Sorry, there was an issue saving the reminder."
-                    response_entities["error"] = "database_error"
-                    response_entities["operation"] = "create_reminder"
-
-        except Exception as outer_err: 
-             logger.error(f"Unexpected error processing create_reminder intent: {outer_err}", exc_info=True)
-             # Remove direct message setting, add error context to entities
-             # response_message = "Sorry, an unexpected error occurred while creating the reminder."
-             response_entities["error"] = "unexpected_error"
-             response_entities["intent_context"] = "create_reminder"
-
-    elif intent == "create_task":
-        logger.info(f"Routing to create_task with entities: {entities}")
-        try:
-            title = entities.get("title")
-            if not title:
-                 logger.warning("Missing title for create_task intent.")
-                 # Remove direct message setting, add error context
-                 # response_message = "Sorry, I need a title to create a task."
-                 response_entities["error"] = "missing_required_entities"
-                 response_entities["missing"] = ["title"]
-            else:
-                due_date_iso = entities.get("due_date_iso")
-                due_date = None
-                parsing_error = False
-                if due_date_iso:
-                    try:
-                        due_date = datetime.fromisoformat(due_date_iso)
-                        if due_date.tzinfo is None:
-                            logger.warning(f"Parsed due_date {due_date} is timezone-naive. Assuming UTC for now.")
-                    except ValueError:
-                        logger.error(f"Failed to parse task due_date_iso: {due_date_iso}")
-                        # Keep track of the parsing error for context, but don't set response_message yet
-                        # response_message = "Warning: Could not understand the due date. Task created without it."
-                        response_entities["warning"] = "datetime_parse_error" # Use warning key?
-                        response_entities["value"] = due_date_iso
-                        parsing_error = True 
-                try:
-                    task_data = schemas.TaskCreate(
-                        title=title,
-                        description=entities.get("description"),
-                        due_date=None if parsing_error else due_date,
-                    )
-                    created_task = crud.create_user_task(
-                        db=db, task=task_data, owner_id=current_user.id
-                    )
-                    # Remove direct message setting, update entities with result
-                    # response_message = (response_message + " " + base_response) if parsing_error else base_response
-                    response_entities["created_task_id"] = created_task.id
-                    response_entities["created_title"] = created_task.title # Pass back info
-                    response_entities["created_description"] = created_task.description # Pass back info
-                    response_entities["created_due_date"] = created_task.due_date.isoformat() if created_task.due_date else None # Pass back info
-                    # Keep parsing warning if it occurred
-                    # response_entities["warning"] will persist if set above
-                    action_performed = True
-                except Exception as crud_err: 
-                    logger.error(f"Error creating task in DB: {crud_err}", exc_info=True)
-                    # Remove direct message setting, add error context
-                    # response_message = "Sorry, there was an issue saving the task."
-                    response_entities["error"] = "database_error"
-                    response_entities["operation"] = "create_task"
-        
-        except Exception as outer_err: 
-            logger.error(f"Unexpected error processing create_task intent: {outer_err}", exc_info=True)
-            response_entities["error"] = "unexpected_error"
-            response_entities["intent_context"] = "create_task"
-
-    # --- Add handler for file summarization request --- 
-    elif intent == "request_file_summary":
-        logger.info(f"Routing to request_file_summary with entities: {entities}")
-        file_id = entities.get("file_id")
-        if not isinstance(file_id, int):
-            logger.warning(f"Could not extract valid integer file_id from entities: {entities}")
-            response_message = "Sorry, I couldn't understand which file ID you want to summarize."
-            response_entities["error"] = "missing_or_invalid_entity"
-            response_entities["expected_entity"] = "file_id (integer)"
-        else:
-            logger.info(f"Extracted file_id {file_id} for summarization. Calling internal API.")
-            
-            # --- Internal API Call to /files/{file_id}/summarize --- 
-            summarize_url = f"http://localhost:8001/files/{file_id}/summarize" # Assuming same host/port
-            # We need the user's token for the internal request
-            # This assumes Request object is available via dependency injection
-            # If not, alternative ways to get token might be needed.
-            # **NOTE:** Requires `request: Request` in process_chat_message dependencies
-            auth_header = request.headers.get('Authorization')
-            headers = {'Authorization': auth_header if auth_header else ''}
-            
-            try:
-                internal_response = requests.post(summarize_url, headers=headers)
-                internal_response.raise_for_status() # Raise HTTPError for bad responses (4xx or 5xx)
-                
-                summary_data = internal_response.json() # Parse JSON response
-                
-                # Update entities based on the summarization result
-                if summary_data.get("error"):
-                    response_entities["error"] = "summarization_failed"
-                    response_entities["details"] = summary_data["error"]
-                elif summary_data.get("summary"):
-                    response_entities["summary"] = summary_data["summary"]
-                    response_entities["summarized_file_id"] = file_id
-                    action_performed = True # Mark action as successful
-                else:
-                    response_entities["error"] = "summarization_unexpected_response"
-                    response_entities["details"] = "Summarization endpoint returned unexpected data."
-
-            except requests.exceptions.RequestException as req_err:
-                 logger.error(f"Internal API call to summarize failed: {req_err}", exc_info=True)
-                 response_entities["error"] = "summarization_api_call_failed"
-                 response_entities["details"] = str(req_err)
-            except json.JSONDecodeError as json_err:
-                 logger.error(f"Failed to decode JSON from summarize endpoint: {json_err}", exc_info=True)
-                 response_entities["error"] = "summarization_bad_response_format"
-                 response_entities["details"] = str(json_err)
-            except Exception as e:
-                 logger.error(f"Unexpected error during summarization call: {e}", exc_info=True)
-                 response_entities["error"] = "summarization_unexpected_error"
-                 response_entities["details"] = str(e)
-            # --- End Internal API Call --- 
-
-    # --- Add handler for file association request --- 
-    elif intent == "associate_file":
-        logger.info(f"Routing to associate_file with entities: {entities}")
-        file_id = entities.get("file_id")
-        target_type = entities.get("target_type")
-        target_id = entities.get("target_id")
-
-        # Validate extracted entities
-        missing = []
-        if not isinstance(file_id, int):
-            missing.append("file_id (integer)")
-        if target_type not in ["task", "project"]:
-             missing.append("target_type ('task' or 'project')")
-        if not isinstance(target_id, int):
-            missing.append("target_id (integer)")
-
-        if missing:
-            logger.warning(f"Could not extract valid entities for associate_file: Missing {missing}")
-            response_entities["error"] = "missing_or_invalid_entity"
-            response_entities["missing"] = missing
-            response_entities["details"] = "I need the file ID, the target type (task or project), and the target ID."
-        else:
-            logger.info(f"Extracted details for association: file={file_id}, target_type={target_type}, target_id={target_id}")
-            
-            # --- Call CRUD function --- 
-            update_payload = schemas.FileReferenceUpdate(
-                project_id=target_id if target_type == "project" else None,
-                task_id=target_id if target_type == "task" else None
-            )
-            
-            try:
-                association_result = crud.update_file_reference_links(
-                    db=db,
-                    user_id=current_user.id,
-                    file_id=file_id,
-                    update_data=update_payload
-                )
-                
-                # Handle CRUD result
-                if isinstance(association_result, str): # Error code returned
-                    if association_result == "unauthorized_file":
-                         response_entities["error"] = "auth_error"
-                         response_entities["details"] = "You don't own the file you're trying to associate."
-                    elif association_result == "invalid_project":
-                         response_entities["error"] = "invalid_target"
-                         response_entities["details"] = f"Project ID {target_id} not found or you don't own it."
-                    elif association_result == "invalid_task":
-                         response_entities["error"] = "invalid_target"
-                         response_entities["details"] = f"Task ID {target_id} not found or you don't own it."
-                    else:
-                         response_entities["error"] = "crud_error"
-                         response_entities["details"] = f"Unknown CRUD error: {association_result}"
-                elif association_result is None:
-                    response_entities["error"] = "not_found"
-                    response_entities["details"] = f"File ID {file_id} not found."
-                else: # Success (association_result is the updated FileReference model)
-                    logger.info(f"Successfully associated file {file_id} with {target_type} {target_id}")
-                    action_performed = True # Mark action as successful
-                    # Add context for response generation
-                    response_entities["association_details"] = { 
-                        "file_id": file_id,
-                        "target_type": target_type,
-                        "target_id": target_id,
-                        "success": True,
-                        # Ensure both keys always exist for consistent structure
-                        "project_name": None, 
-                        "task_title": None 
-                    }
-                    # Add linked item details if needed for response
-                    if target_type == "project" and association_result.project:
-                        response_entities["association_details"]["project_name"] = association_result.project.name
-                    elif target_type == "task" and association_result.task:
-                         response_entities["association_details"]["task_title"] = association_result.task.title
-                         
-            except Exception as e:
-                logger.error(f"Unexpected error during file association CRUD call: {e}", exc_info=True)
-                response_entities["error"] = "unexpected_error"
-                response_entities["details"] = str(e)
-            # --- End CRUD call --- 
+    handler = INTENT_HANDLERS.get(intent)
+    if handler is not None:
+        action_performed = await handler(entities, response_entities, db, current_user)
 
     # --- Fallback for unhandled/general intents --- 
-    if not action_performed and intent not in [
-        "create_reminder", "create_task", "request_file_summary", "associate_file" # Add new intent
-        ]: 
+    if not action_performed and not needs_action: 
         logger.info(f"Intent '{intent}' has no specific action. Generating default response.")
         # No specific action needed, entities remain as extracted by LLM
         # generate_response_text will handle these cases
@@ -327,8 +423,14 @@ def process_chat_message(
     # Ensure this happens *after* all intent processing, using final state of variables
     logger.debug(f"Preparing final response. Intent: {response_intent}, Entities: {response_entities}")
     try:
-        final_response_text = llm_utils.generate_response_text(response_intent, response_entities)
-        api_response = schemas.ChatResponse(
+        if not needs_action and llm_result.get("response_text"):
+            # Answered in the extraction call; skip the second LLM round trip
+            final_response_text = llm_result["response_text"]
+        else:
+            final_response_text = await asyncio.to_thread(llm_utils.generate_response_text, response_intent, response_entities)
+        # Built from values this function already validated (str intent/text, dict entities);
+        # FastAPI validates the response model on the way out anyway
+        api_response = schemas.ChatResponse.model_construct(
             intent=response_intent,
             entities=response_entities,
             response_text=final_response_text
@@ -339,11 +441,7 @@ def process_chat_message(
         # Catch errors during final response generation itself
         logger.error(f"Failed to generate or construct final ChatResponse: {final_response_err}", exc_info=True)
         # Return a generic server error response that conforms to the model
-        return schemas.ChatResponse(
-            intent="internal_error",
-            entities={"error": "Failed to construct final response"},
-            response_text="Sorry, a critical error occurred while preparing the response."
-        )
+        return _INTERNAL_ERROR_RESPONSE
 
 # The duplicate function definition below this comment needs to be removed.
 # @router.post("/message", response_model=schemas.ChatResponse)
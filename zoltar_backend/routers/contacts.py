@@ -1,13 +1,12 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Response, status
+from pydantic import TypeAdapter
 from typing import List
 
 # Change to direct imports
 import crud
-import models
 import schemas
 import auth
-from database import get_db
+from deps import DB, CurrentUser
 
 router = APIRouter(
     prefix="/contacts",
@@ -16,31 +15,37 @@ router = APIRouter(
     responses={404: {"description": "Not found"}},
 )
 
+# Validates and serializes a whole contact page in one pass (see read_contacts)
+_CONTACT_LIST_ADAPTER = TypeAdapter(List[schemas.Contact])
+
 @router.post("/", response_model=schemas.Contact, status_code=status.HTTP_201_CREATED)
 def create_contact(
     contact: schemas.ContactCreate,
-    db: Session = Depends(get_db),
-    current_user: models.User = Depends(auth.get_current_active_user)
+    db: DB,
+    current_user: CurrentUser
 ):
     """Creates a new contact for the current user."""
     return crud.create_user_contact(db=db, contact=contact, user_id=current_user.id)
 
 @router.get("/", response_model=List[schemas.Contact])
 def read_contacts(
+    db: DB,
+    current_user: CurrentUser,
     skip: int = 0,
-    limit: int = 100,
-    db: Session = Depends(get_db),
-    current_user: models.User = Depends(auth.get_current_active_user)
+    limit: int = 100
 ):
     """Retrieves a list of contacts for the current user."""
     contacts = crud.get_user_contacts(db=db, user_id=current_user.id, skip=skip, limit=limit)
-    return contacts
+    # Returning a Response skips FastAPI's own per-item response_model validation; the
+    # response_model above still documents the shape
+    page = _CONTACT_LIST_ADAPTER.validate_python(contacts, from_attributes=True)
+    return Response(content=_CONTACT_LIST_ADAPTER.dump_json(page), media_type="application/json")
 
 @router.get("/{contact_id}", response_model=schemas.Contact)
 def read_contact(
     contact_id: int,
-    db: Session = Depends(get_db),
-    current_user: models.User = Depends(auth.get_current_active_user)
+    db: DB,
+    current_user: CurrentUser
 ):
     """Retrieves a specific contact by ID."""
     db_contact = crud.get_contact(db=db, contact_id=contact_id, user_id=current_user.id)
@@ -52,8 +57,8 @@ def read_contact(
 def update_contact(
     contact_id: int,
     contact_update: schemas.ContactUpdate,
-    db: Session = Depends(get_db),
-    current_user: models.User = Depends(auth.get_current_active_user)
+    db: DB,
+    current_user: CurrentUser
 ):
     """Updates a specific contact."""
     updated_contact = crud.update_contact(
@@ -66,8 +71,8 @@ def update_contact(
 @router.delete("/{contact_id}", status_code=status.HTTP_204_NO_CONTENT)
 def delete_contact(
     contact_id: int,
-    db: Session = Depends(get_db),
-    current_user: models.User = Depends(auth.get_current_active_user)
+    db: DB,
+    current_user: CurrentUser
 ):
     """Deletes a specific contact."""
     deleted = crud.delete_contact(db=db, contact_id=contact_id, user_id=current_user.id)
@@ -1,27 +1,39 @@
+import asyncio
+import hashlib
 import os
+import threading
 import uuid
-import shutil
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
+from typing import Annotated, Optional
+
+import aiofiles
 
 from fastapi import (
-    APIRouter, Depends, HTTPException, status, UploadFile, File
+    APIRouter, Depends, HTTPException, Response, status, UploadFile, File
 )
 from fastapi.responses import FileResponse
-from sqlalchemy.orm import Session
 
 # Change to direct imports
 import crud
-import models
 import schemas
 import auth
-from database import get_db
+from deps import DB, CurrentUser
 import llm_utils # Changed from zoltar_backend import
 import file_utils # Changed from zoltar_backend import
 import logging # Import logging if not already present
+from redis_client import get_redis
 
 # Define the base directory for uploads relative to the project root
 # Assuming the server runs from the project root (where zoltar_backend/ is)
 UPLOAD_DIR = Path("./uploads") 
+UPLOAD_DIR_RESOLVED = UPLOAD_DIR.resolve() # Resolved once; stored paths must stay inside it
+UPLOAD_CHUNK_SIZE = 1 << 20 # Uploads are streamed to disk 1 MiB at a time
+# Dedicated pool for text extraction, so slow PDF/DOCX parsing can't exhaust the shared
+# threadpool that sync endpoints and dependencies run on
+EXTRACT_MAX_WORKERS = 4
+EXTRACT_POOL = ThreadPoolExecutor(max_workers=EXTRACT_MAX_WORKERS, thread_name_prefix="extract")
 
 router = APIRouter(
     prefix="/files",
@@ -33,10 +45,10 @@ router = APIRouter(
 logger = logging.getLogger(__name__)
 
 @router.post("/upload", response_model=schemas.FileReference, status_code=status.HTTP_201_CREATED)
-def upload_file(
-    file: UploadFile = File(...), # File is required
-    db: Session = Depends(get_db),
-    current_user: models.User = Depends(auth.get_current_active_user)
+async def upload_file(
+    file: Annotated[UploadFile, File()], # File is required
+    db: DB,
+    current_user: CurrentUser
 ):
     """Handles file uploads, saves the file locally, and creates a DB reference."""
     
@@ -50,22 +62,24 @@ def upload_file(
     storage_path = user_upload_dir / unique_filename
     relative_storage_path = Path('.') / storage_path # Store relative path in DB
 
-    # Save the file
+    # Save the file, streaming it so the event loop stays free during large uploads
+    file_size = 0 # Counted while writing instead of stat()-ing the file afterwards
     try:
-        with storage_path.open("wb") as buffer:
-            shutil.copyfileobj(file.file, buffer)
+        async with aiofiles.open(storage_path, "wb") as buffer:
+            while chunk := await file.read(UPLOAD_CHUNK_SIZE):
+                await buffer.write(chunk)
+                file_size += len(chunk)
     except Exception as e:
         # Basic error handling, consider more specific exceptions
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"Could not save file: {e}")
     finally:
-        file.file.close() # Ensure the file buffer is closed
+        await file.close() # Ensure the file buffer is closed
 
-    # Get file metadata (size might be available directly)
-    file_size = storage_path.stat().st_size
     file_type = file.content_type
 
-    # Create database reference
-    db_file_ref = crud.create_file_reference(
+    # Create database reference (blocking DB call; run off the event loop)
+    db_file_ref = await asyncio.to_thread(
+        crud.create_file_reference,
         db=db,
         owner_id=current_user.id,
         original_filename=file.filename,
@@ -79,8 +93,8 @@ def upload_file(
 @router.get("/{file_id}", response_model=schemas.FileReference)
 def get_file_metadata(
     file_id: int,
-    db: Session = Depends(get_db),
-    current_user: models.User = Depends(auth.get_current_active_user)
+    db: DB,
+    current_user: CurrentUser
 ):
     """Retrieves metadata for a file by its ID, checking ownership."""
     db_file_ref = crud.get_file_reference(db, file_id=file_id)
@@ -94,7 +108,7 @@ def get_file_metadata(
     #     # raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="File not found on disk")
     
     # Return the Pydantic schema object (FastAPI handles serialization)
-    print(f"DEBUG: Returning FileReference metadata for ID: {file_id}")
+    logger.debug("Returning FileReference metadata for ID: %s", file_id)
     return db_file_ref
     # --- End metadata return --- 
     
@@ -110,8 +124,8 @@ def get_file_metadata(
 def update_file_links(
     file_id: int,
     update_data: schemas.FileReferenceUpdate, # Request body
-    db: Session = Depends(get_db),
-    current_user: models.User = Depends(auth.get_current_active_user)
+    db: DB,
+    current_user: CurrentUser
 ):
     """Links/unlinks a file to a project or task."""
     updated_file_ref = crud.update_file_reference_links(
@@ -129,18 +143,75 @@ def update_file_links(
 
     return updated_file_ref # Return the updated FileReference object 
 
+def _resolve_upload_path(storage_path: str) -> Optional[Path]:
+    """Resolves a stored file path, returning None if it points outside UPLOAD_DIR
+    (e.g. via '..' or a symlink)."""
+    file_path = Path(storage_path).resolve()
+    try:
+        file_path.relative_to(UPLOAD_DIR_RESOLVED)
+    except ValueError:
+        return None
+    return file_path
+
+# --- Summary cache ---
+# Summaries are keyed by the file's path, mtime and size, so a changed or re-uploaded file
+# gets a new key. Stored in Redis when configured (shared across workers), otherwise in a
+# per-process LRU. Only successful summaries are cached.
+SUMMARY_CACHE_TTL_SECONDS = 4 * 3600
+SUMMARY_CACHE_MAX_SIZE = 512
+_summary_cache: "OrderedDict[str, str]" = OrderedDict()
+_summary_cache_lock = threading.Lock()
+
+def _summary_cache_key(file_path: Path) -> Optional[str]:
+    """Returns the cache key for a file's summary, or None if the file can't be stat()-ed."""
+    try:
+        stat = file_path.stat()
+    except OSError:
+        return None
+    digest = hashlib.sha256(f"{file_path}:{stat.st_mtime_ns}:{stat.st_size}".encode()).hexdigest()
+    return f"file:summary:{digest}"
+
+def _get_cached_summary(cache_key: str) -> Optional[str]:
+    redis_conn = get_redis()
+    if redis_conn is not None:
+        try:
+            return redis_conn.get(cache_key)
+        except Exception as e:
+            logger.warning("Failed to read file summary from Redis: %s", e)
+            return None
+    with _summary_cache_lock:
+        summary = _summary_cache.get(cache_key)
+        if summary is not None:
+            _summary_cache.move_to_end(cache_key)
+        return summary
+
+def _store_cached_summary(cache_key: str, summary: str) -> None:
+    redis_conn = get_redis()
+    if redis_conn is not None:
+        try:
+            redis_conn.setex(cache_key, SUMMARY_CACHE_TTL_SECONDS, summary)
+        except Exception as e:
+            logger.warning("Failed to write file summary to Redis: %s", e)
+        return
+    with _summary_cache_lock:
+        _summary_cache[cache_key] = summary
+        if len(_summary_cache) > SUMMARY_CACHE_MAX_SIZE:
+            _summary_cache.popitem(last=False)
+
 # --- Add Summarization Endpoint ---
 @router.post("/{file_id}/summarize", response_model=schemas.FileSummaryResponse)
-def summarize_file(
+async def summarize_file(
     file_id: int,
-    db: Session = Depends(get_db),
-    current_user: models.User = Depends(auth.get_current_active_user)
+    db: DB,
+    current_user: CurrentUser,
+    response: Response = None # Injected by FastAPI; None when called directly (e.g. from chat)
 ):
-    """Extracts text from a file and generates a summary using the LLM."""
+    """Extracts text from a file and generates a summary using the LLM.
+    Repeat requests for an unchanged file are served from the summary cache (X-Cache: HIT)."""
     logger.info(f"Summarization request for file_id {file_id} by user {current_user.email}")
     
     # 1. Get File Record
-    db_file_ref = crud.get_file_reference(db, file_id=file_id)
+    db_file_ref = await asyncio.to_thread(crud.get_file_reference, db, file_id=file_id)
     if db_file_ref is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="File record not found")
     if db_file_ref.owner_id != current_user.id:
@@ -148,11 +219,23 @@ def summarize_file(
 
     # 2. Construct Full File Path
     # Assumes server runs from project root where UPLOAD_DIR is defined
-    file_path = Path(db_file_ref.storage_path).resolve() 
+    file_path = _resolve_upload_path(db_file_ref.storage_path)
+    if file_path is None:
+        logger.warning(f"Stored path for file ID {file_id} resolves outside the upload directory")
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not authorized to access this file")
     logger.debug(f"Resolved file path for summarization: {file_path}")
 
-    # 3. Extract Text
-    extracted_text = file_utils.extract_text_from_file(str(file_path))
+    cache_key = _summary_cache_key(file_path)
+    cached_summary = await asyncio.to_thread(_get_cached_summary, cache_key) if cache_key else None
+    if response is not None:
+        response.headers["X-Cache"] = "HIT" if cached_summary is not None else "MISS"
+    if cached_summary is not None:
+        logger.info(f"Returning cached summary for file ID {file_id}")
+        return schemas.FileSummaryResponse(file_id=file_id, summary=cached_summary, error=None)
+
+    # 3. Extract Text (CPU-bound; runs on the extraction pool)
+    loop = asyncio.get_running_loop()
+    extracted_text = await loop.run_in_executor(EXTRACT_POOL, file_utils.extract_text_from_file, str(file_path))
     if extracted_text is None:
         logger.error(f"Failed to extract text from file: {file_path} (ID: {file_id})")
         # Return response indicating failure but not a server error
@@ -165,7 +248,7 @@ def summarize_file(
     logger.info(f"Successfully extracted text from file ID {file_id}. Length: {len(extracted_text)}")
 
     # 4. Summarize Text
-    summary = llm_utils.summarize_text_gemini(extracted_text)
+    summary = await llm_utils.summarize_text_gemini_async(extracted_text)
     if summary is None:
         logger.error(f"Failed to generate summary for file ID {file_id}")
         return schemas.FileSummaryResponse(
@@ -176,4 +259,6 @@ def summarize_file(
 
     # 5. Return Success Response
     logger.info(f"Successfully generated summary for file ID {file_id}")
+    if cache_key:
+        await asyncio.to_thread(_store_cached_summary, cache_key, summary)
     return schemas.FileSummaryResponse(file_id=file_id, summary=summary, error=None) 
\ No newline at end of file
@@ -1,12 +1,11 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from typing import List
 
 import crud
-import models
 import schemas
+import schemas_fast
 import auth
-from database import get_db
+from deps import DB, CurrentUser
 
 router = APIRouter(
     prefix="/lists",
@@ -20,25 +19,30 @@ router = APIRouter(
 @router.post("/", response_model=schemas.List)
 def create_list(
     list_data: schemas.ListCreate,
-    db: Session = Depends(get_db),
-    current_user: models.User = Depends(auth.get_current_active_user)
+    db: DB,
+    current_user: CurrentUser
 ):
     """Creates a new list for the current user."""
     return crud.create_list(db=db, list_data=list_data, user_id=current_user.id)
 
 @router.get("/", response_model=List[schemas.List])
 def read_lists(
-    db: Session = Depends(get_db),
-    current_user: models.User = Depends(auth.get_current_active_user)
+    db: DB,
+    current_user: CurrentUser,
+    skip: int = 0,
+    limit: int = Query(100, ge=1, le=500)
 ):
-    """Retrieves all lists for the current user."""
-    return crud.get_lists_by_user(db=db, user_id=current_user.id)
+    """Retrieves a page of the current user's lists, ordered by name."""
+    lists = crud.get_lists_by_user(db=db, user_id=current_user.id, skip=skip, limit=limit)
+    # Encoded with msgspec and returned directly; response_model still documents the schema
+    content = schemas_fast.encode([schemas_fast.list_from_row(row) for row in lists])
+    return Response(content=content, media_type="application/json")
 
 @router.get("/{list_id}", response_model=schemas.List)
 def read_list(
     list_id: int,
-    db: Session = Depends(get_db),
-    current_user: models.User = Depends(auth.get_current_active_user)
+    db: DB,
+    current_user: CurrentUser
 ):
     """Retrieves a specific list by ID for the current user."""
     db_list = crud.get_list(db=db, list_id=list_id, user_id=current_user.id)
@@ -50,8 +54,8 @@ def read_list(
 def update_list(
     list_id: int,
     list_data: schemas.ListUpdate,
-    db: Session = Depends(get_db),
-    current_user: models.User = Depends(auth.get_current_active_user)
+    db: DB,
+    current_user: CurrentUser
 ):
     """Updates a specific list for the current user."""
     db_list = crud.update_list(db=db, list_id=list_id, list_data=list_data, user_id=current_user.id)
@@ -62,8 +66,8 @@ def update_list(
 @router.delete("/{list_id}", response_model=dict)
 def delete_list(
     list_id: int,
-    db: Session = Depends(get_db),
-    current_user: models.User = Depends(auth.get_current_active_user)
+    db: DB,
+    current_user: CurrentUser
 ):
     """Deletes a specific list for the current user."""
     deleted = crud.delete_list(db=db, list_id=list_id, user_id=current_user.id)
@@ -77,8 +81,8 @@ def delete_list(
 def create_list_item(
     list_id: int,
     item_data: schemas.ListItemCreate,
-    db: Session = Depends(get_db),
-    current_user: models.User = Depends(auth.get_current_active_user)
+    db: DB,
+    current_user: CurrentUser
 ):
     """Creates a new item within a specific list owned by the current user."""
     result = crud.create_list_item(db=db, item_data=item_data, list_id=list_id, user_id=current_user.id)
@@ -87,12 +91,23 @@ def create_list_item(
     # Assuming result is the db_item on success
     return result
 
+@router.post("/{list_id}/items/batch", response_model=List[schemas.ListItem])
+def create_list_items_batch(
+    list_id: int,
+    items: List[schemas.ListItemCreate],
+    db: DB,
+    current_user: CurrentUser
+):
+    """Creates several items in a list owned by the current user in one insert."""
+    # Raises NotFound (404) if the parent list isn't the user's
+    return crud.bulk_create_list_items(db=db, items=items, list_id=list_id, user_id=current_user.id)
+
 @router.put("/items/{item_id}", response_model=schemas.ListItem)
 def update_list_item(
     item_id: int,
     item_data: schemas.ListItemUpdate,
-    db: Session = Depends(get_db),
-    current_user: models.User = Depends(auth.get_current_active_user)
+    db: DB,
+    current_user: CurrentUser
 ):
     """Updates a specific list item owned by the current user (via parent list)."""
     result = crud.update_list_item(db=db, item_id=item_id, item_data=item_data, user_id=current_user.id)
@@ -104,8 +119,8 @@ def update_list_item(
 @router.delete("/items/{item_id}", response_model=dict)
 def delete_list_item(
     item_id: int,
-    db: Session = Depends(get_db),
-    current_user: models.User = Depends(auth.get_current_active_user)
+    db: DB,
+    current_user: CurrentUser
 ):
     """Deletes a specific list item owned by the current user (via parent list)."""
     deleted = crud.delete_list_item(db=db, item_id=item_id, user_id=current_user.id)
@@ -1,15 +1,15 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Response, status, Query
 from typing import List, Optional
+import asyncio
 import logging
 
 # Zoltar imports
 import crud
-import models
 import schemas
+import schemas_fast
 import auth
 import llm_utils
-from database import get_db
+from deps import DB, CurrentUser
 
 logger = logging.getLogger(__name__)
 
@@ -23,44 +23,51 @@ router = APIRouter(
 @router.post("/", response_model=schemas.Note, status_code=status.HTTP_201_CREATED)
 def create_note(
     note: schemas.NoteCreate, 
-    db: Session = Depends(get_db),
-    current_user: models.User = Depends(auth.get_current_active_user)
+    db: DB,
+    current_user: CurrentUser
 ):
     """Create a new note for the current user."""
-    logger.info(f"User {current_user.email} creating note.")
-    result = crud.create_user_note(db=db, note=note, user_id=current_user.id)
-    if isinstance(result, str):
-        if result == "invalid_contact":
-            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Invalid contact_id: {note.contact_id}. Contact not found or does not belong to user.")
-        else:
-            raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="An unexpected error occurred.")
-    logger.info(f"Note created with ID: {result.id} for user {current_user.email}")
+    logger.info("User %s creating note.", current_user.email)
+    result = crud.create_user_note(db=db, note=note, user_id=current_user.id) # Raises InvalidContact (400)
+    logger.info("Note created with ID: %s for user %s", result.id, current_user.email)
     return result
 
+@router.post("/batch", response_model=List[schemas.Note], status_code=status.HTTP_201_CREATED)
+def create_notes_batch(
+    notes: List[schemas.NoteCreate],
+    db: DB,
+    current_user: CurrentUser
+):
+    """Create several notes for the current user in one insert."""
+    logger.info("User %s creating %s notes in batch.", current_user.email, len(notes))
+    return crud.bulk_create_user_notes(db=db, notes=notes, user_id=current_user.id) # Raises InvalidContact (400)
+
 @router.get("/", response_model=List[schemas.Note])
 def read_notes(
+    db: DB,
+    current_user: CurrentUser,
     contact_id: Optional[int] = Query(None, description="Filter notes by contact ID"),
     skip: int = 0, 
-    limit: int = 100, 
-    db: Session = Depends(get_db),
-    current_user: models.User = Depends(auth.get_current_active_user)
+    limit: int = 100
 ):
     """Retrieve notes for the current user, optionally filtered by contact ID."""
-    logger.info(f"User {current_user.email} reading notes. Filter by contact_id: {contact_id}")
+    logger.info("User %s reading notes. Filter by contact_id: %s", current_user.email, contact_id)
     notes = crud.get_user_notes(db, user_id=current_user.id, contact_id=contact_id, skip=skip, limit=limit)
-    return notes
+    # Encoded with msgspec and returned directly; response_model still documents the schema
+    content = schemas_fast.encode([schemas_fast.from_row(schemas_fast.NoteStruct, row) for row in notes])
+    return Response(content=content, media_type="application/json")
 
 @router.get("/{note_id}", response_model=schemas.Note)
 def read_note(
     note_id: int, 
-    db: Session = Depends(get_db),
-    current_user: models.User = Depends(auth.get_current_active_user)
+    db: DB,
+    current_user: CurrentUser
 ):
     """Retrieve a specific note by ID."""
-    logger.info(f"User {current_user.email} reading note ID: {note_id}")
+    logger.info("User %s reading note ID: %s", current_user.email, note_id)
     db_note = crud.get_note(db, note_id=note_id, user_id=current_user.id)
     if db_note is None:
-        logger.warning(f"Note ID {note_id} not found for user {current_user.email}")
+        logger.warning("Note ID %s not found for user %s", note_id, current_user.email)
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Note not found")
     return db_note
 
@@ -68,77 +75,73 @@ def read_note(
 def update_note(
     note_id: int, 
     note: schemas.NoteUpdate, 
-    db: Session = Depends(get_db),
-    current_user: models.User = Depends(auth.get_current_active_user)
+    db: DB,
+    current_user: CurrentUser
 ):
     """Update a specific note by ID."""
-    logger.info(f"User {current_user.email} updating note ID: {note_id}")
+    logger.info("User %s updating note ID: %s", current_user.email, note_id)
     result = crud.update_note(db=db, note_id=note_id, note_update=note, user_id=current_user.id)
     if result is None:
-        logger.warning(f"Note ID {note_id} not found for user {current_user.email} during update.")
+        logger.warning("Note ID %s not found for user %s during update.", note_id, current_user.email)
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Note not found")
-    if isinstance(result, str):
-        if result == "invalid_contact":
-            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Invalid contact_id provided in update. Contact not found or does not belong to user.")
-        else:
-             raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="An unexpected error occurred during update.")
-    logger.info(f"Note ID {note_id} updated successfully for user {current_user.email}")
+    logger.info("Note ID %s updated successfully for user %s", note_id, current_user.email)
     return result
 
 @router.delete("/{note_id}", status_code=status.HTTP_204_NO_CONTENT)
 def delete_note(
     note_id: int, 
-    db: Session = Depends(get_db),
-    current_user: models.User = Depends(auth.get_current_active_user)
+    db: DB,
+    current_user: CurrentUser
 ):
     """Delete a specific note by ID."""
-    logger.info(f"User {current_user.email} deleting note ID: {note_id}")
+    logger.info("User %s deleting note ID: %s", current_user.email, note_id)
     deleted = crud.delete_note(db=db, note_id=note_id, user_id=current_user.id)
     if not deleted:
-        logger.warning(f"Note ID {note_id} not found for user {current_user.email} during delete attempt.")
+        logger.warning("Note ID %s not found for user %s during delete attempt.", note_id, current_user.email)
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Note not found")
-    logger.info(f"Note ID {note_id} deleted successfully by user {current_user.email}")
+    logger.info("Note ID %s deleted successfully by user %s", note_id, current_user.email)
     return # Return None with 204 status code 
 
 @router.post("/summary", response_model=schemas.NoteSummaryResponse)
 async def summarize_notes(
     summary_request: schemas.NoteSummaryRequest,
-    db: Session = Depends(get_db),
-    current_user: models.User = Depends(auth.get_current_active_user)
+    db: DB,
+    current_user: CurrentUser
 ):
     """Summarizes notes based on provided filters (note_ids, source, tags)."""
-    logger.info(f"Received request to summarize notes for user {current_user.email} with filters: {summary_request.model_dump()}")
+    logger.info("Received request to summarize notes for user %s with filters: %s", current_user.email, summary_request)
 
     # 1. Call crud function to get note IDs and combined content based on filters
+    # (blocking DB query; run it off the event loop)
     try:
-        included_ids, combined_content = crud.get_notes_content_by_filter(
-            db=db, user_id=current_user.id, filters=summary_request
+        included_ids, combined_content = await asyncio.to_thread(
+            crud.get_notes_content_by_filter, db=db, user_id=current_user.id, filters=summary_request
         )
     except Exception as e:
-        logger.error(f"Error retrieving notes for summarization: {e}", exc_info=True)
+        logger.error("Error retrieving notes for summarization: %s", e, exc_info=True)
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Failed to retrieve notes for summarization.")
 
     # 2. Handle case where no notes are found
     if not included_ids or not combined_content:
-        logger.info(f"No notes found matching filter criteria for user {current_user.email}")
+        logger.info("No notes found matching filter criteria for user %s", current_user.email)
         return schemas.NoteSummaryResponse(
             summary="No notes match the filter criteria.",
             included_note_ids=[]
         )
         
-    logger.info(f"Summarizing content from {len(included_ids)} notes for user {current_user.email}. Total length: {len(combined_content)} chars.")
+    logger.info("Summarizing content from %s notes for user %s. Total length: %s chars.", len(included_ids), current_user.email, len(combined_content))
 
     # 3. Call LLM utility function to summarize combined content
     # Note: Currently ignoring summary_request.max_summary_length as the LLM function doesn't support it yet.
-    summary = llm_utils.summarize_text_gemini(text_to_summarize=combined_content)
+    summary = await llm_utils.summarize_text_gemini_async(text_to_summarize=combined_content)
 
     # 4. Handle LLM failure
     if summary is None:
-        logger.error(f"LLM summarization failed for notes: {included_ids}")
+        logger.error("LLM summarization failed for notes: %s", included_ids)
         raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail="Failed to generate summary due to LLM error.")
 
     # 5. Return NoteSummaryResponse
-    logger.info(f"Successfully generated summary for notes: {included_ids}")
+    logger.info("Successfully generated summary for notes: %s", included_ids)
     return schemas.NoteSummaryResponse(
         summary=summary,
         included_note_ids=included_ids
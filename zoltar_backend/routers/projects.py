@@ -1,13 +1,13 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Response, status
 from typing import List
 
 # Change to direct imports
 import crud
-import models
 import schemas
+import schemas_fast
 import auth
-from database import get_db
+import report_cache
+from deps import DB, CurrentUser
 
 router = APIRouter(
     prefix="/projects",
@@ -19,8 +19,8 @@ router = APIRouter(
 @router.post("/", response_model=schemas.Project, status_code=status.HTTP_201_CREATED)
 def create_project(
     project: schemas.ProjectCreate,
-    db: Session = Depends(get_db),
-    current_user: models.User = Depends(auth.get_current_active_user)
+    db: DB,
+    current_user: CurrentUser
 ):
     db_project = crud.create_user_project(db=db, project=project, user_id=current_user.id)
     if db_project is None: # Handle invalid category case from CRUD
@@ -29,18 +29,20 @@ def create_project(
 
 @router.get("/", response_model=List[schemas.Project])
 def read_projects(
+    db: DB,
+    current_user: CurrentUser,
     skip: int = 0,
-    limit: int = 100,
-    db: Session = Depends(get_db),
-    current_user: models.User = Depends(auth.get_current_active_user)
+    limit: int = 100
 ):
     projects = crud.get_user_projects(db, user_id=current_user.id, skip=skip, limit=limit)
-    return projects
+    # Encoded with msgspec and returned directly; response_model still documents the schema
+    content = schemas_fast.encode([schemas_fast.from_row(schemas_fast.ProjectStruct, row) for row in projects])
+    return Response(content=content, media_type="application/json")
 
 @router.get("/by_category", response_model=schemas.ProjectsByCategoryResponse)
 def read_projects_by_category(
-    db: Session = Depends(get_db),
-    current_user: models.User = Depends(auth.get_current_active_user)
+    db: DB,
+    current_user: CurrentUser
 ):
     """Retrieves all projects for the user, grouped by category."""
     grouped_projects = crud.get_user_projects_by_category(db=db, user_id=current_user.id)
@@ -49,45 +51,48 @@ def read_projects_by_category(
 @router.get("/{project_id}", response_model=schemas.Project)
 def read_project(
     project_id: int,
-    db: Session = Depends(get_db),
-    current_user: models.User = Depends(auth.get_current_active_user)
+    db: DB,
+    current_user: CurrentUser
 ):
-    db_project = crud.get_project(db, project_id=project_id)
-    if db_project is None:
+    db_project = crud.get_project(db, project_id=project_id, user_id=current_user.id)
+    if db_project is None: # Missing or owned by another user
         raise HTTPException(status_code=404, detail="Project not found")
-    if db_project.owner_id != current_user.id:
-        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not authorized to access this project")
     return db_project
 
 @router.get("/{project_id}/summary", response_model=schemas.ProjectSummaryResponse)
 def read_project_summary(
     project_id: int,
-    db: Session = Depends(get_db),
-    current_user: models.User = Depends(auth.get_current_active_user)
+    db: DB,
+    current_user: CurrentUser
 ):
-    """Retrieves a structured summary for a specific project."""
-    summary_data = crud.get_project_summary(db=db, project_id=project_id, user_id=current_user.id)
-    if summary_data is None:
-        raise HTTPException(status_code=404, detail="Project not found or not owned by user")
-    # The CRUD function returns a dict; FastAPI validates it against ProjectSummaryResponse
-    return summary_data
+    """Retrieves a structured summary for a specific project.
+    Served from the short-lived report cache when possible (X-Cache: HIT)."""
+    cache_field = f"project_summary:{project_id}"
+    content = report_cache.get(current_user.id, cache_field)
+    cache_status = "HIT" if content is not None else "MISS"
+    if content is None:
+        summary_data = crud.get_project_summary(db=db, project_id=project_id, user_id=current_user.id)
+        if summary_data is None:
+            raise HTTPException(status_code=404, detail="Project not found or not owned by user")
+        # The CRUD function returns a dict; validate it against ProjectSummaryResponse before caching
+        content = schemas.ProjectSummaryResponse.model_validate(summary_data).model_dump_json()
+        report_cache.store(current_user.id, cache_field, content)
+    return Response(content=content, media_type="application/json", headers={"X-Cache": cache_status})
 
 @router.put("/{project_id}", response_model=schemas.ProjectUpdateResponse)
 def update_project(
     project_id: int,
     project_update: schemas.ProjectUpdate,
-    db: Session = Depends(get_db),
-    current_user: models.User = Depends(auth.get_current_active_user)
+    db: DB,
+    current_user: CurrentUser
 ):
     update_result = crud.update_project(
         db=db, project_id=project_id, project_update=project_update, user_id=current_user.id
     )
     
-    # Check for error conditions returned by CRUD function
+    # An invalid category raises InvalidCategory (400) from the CRUD function
     if update_result is None: # Handle project not found/owned
         raise HTTPException(status_code=404, detail="Project not found or not owned by user")
-    if isinstance(update_result, str) and update_result == "invalid_category": # Handle invalid category during update
-        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Category not found or not owned by user")
     
     # If successful, update_result is the dictionary {"updated_project": ..., "unblocked_projects": ...}
     # FastAPI will automatically convert this dict to the ProjectUpdateResponse schema
@@ -96,8 +101,8 @@ def update_project(
 @router.delete("/{project_id}", status_code=status.HTTP_204_NO_CONTENT)
 def delete_project(
     project_id: int,
-    db: Session = Depends(get_db),
-    current_user: models.User = Depends(auth.get_current_active_user)
+    db: DB,
+    current_user: CurrentUser
 ):
     deleted = crud.delete_project(db=db, project_id=project_id, user_id=current_user.id)
     if not deleted:
@@ -110,32 +115,20 @@ def delete_project(
 def add_project_dependency_endpoint(
     project_id: int,
     depends_on_project_id: int,
-    db: Session = Depends(get_db),
-    current_user: models.User = Depends(auth.get_current_active_user)
+    db: DB,
+    current_user: CurrentUser
 ):
-    """Make project_id dependent on depends_on_project_id."""
-    result = crud.add_project_dependency(db, project_id, depends_on_project_id, current_user.id)
-    if result == "not_found":
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="One or both projects not found or not owned by user")
-    if result == "self_dependency":
-        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Project cannot depend on itself")
-    if result == "already_exists":
-        pass # Idempotent
-    elif result != "ok":
-        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Failed to add dependency")
+    """Make project_id dependent on depends_on_project_id. Idempotent."""
+    crud.add_project_dependency(db, project_id, depends_on_project_id, current_user.id) # Raises NotFound / SelfDependency
     return
 
 @router.delete("/{project_id}/depends_on/{depends_on_project_id}", status_code=status.HTTP_204_NO_CONTENT)
 def remove_project_dependency_endpoint(
     project_id: int,
     depends_on_project_id: int,
-    db: Session = Depends(get_db),
-    current_user: models.User = Depends(auth.get_current_active_user)
+    db: DB,
+    current_user: CurrentUser
 ):
     """Remove dependency of project_id on depends_on_project_id."""
-    result = crud.remove_project_dependency(db, project_id, depends_on_project_id, current_user.id)
-    if result == "not_found":
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="One or both projects not found, or dependency does not exist")
-    elif result != "ok":
-        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Failed to remove dependency")
+    crud.remove_project_dependency(db, project_id, depends_on_project_id, current_user.id) # Raises NotFound
     return 
\ No newline at end of file
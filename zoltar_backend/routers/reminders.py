@@ -1,14 +1,14 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
 from typing import List, Optional
 from datetime import datetime
 
 # Change to direct imports
 import crud
-import models
 import schemas
+import schemas_fast
 import auth
-from database import get_db
+import reminder_schedule
+from deps import DB, CurrentUser
 
 router = APIRouter(
     prefix="/reminders",
@@ -20,67 +20,58 @@ router = APIRouter(
 @router.post("/", response_model=schemas.Reminder, status_code=status.HTTP_201_CREATED)
 def create_reminder(
     reminder: schemas.ReminderCreate,
-    db: Session = Depends(get_db),
-    current_user: models.User = Depends(auth.get_current_active_user)
+    db: DB,
+    current_user: CurrentUser
 ):
-    result = crud.create_user_reminder(db=db, reminder=reminder, user_id=current_user.id)
-    if result == "invalid_task":
-        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Task not found or not owned by user")
-    if result == "invalid_file":
-        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="File not found or not owned by user")
-    if result == "invalid_rule":
-        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid or missing recurrence rule for recurring reminder")
+    # Invalid links or recurrence rules raise a CrudError, which main.py turns into a 400
+    result = crud.create_user_reminder(db=db, reminder=reminder, owner_id=current_user.id)
+    reminder_schedule.invalidate_next_due()
     # Assuming direct return of the object on success
     return result 
 
 @router.get("/", response_model=List[schemas.Reminder])
 def read_reminders(
+    db: DB,
+    current_user: CurrentUser,
     skip: int = 0,
-    limit: int = 100,
-    db: Session = Depends(get_db),
-    current_user: models.User = Depends(auth.get_current_active_user)
+    limit: int = 100
 ):
     reminders = crud.get_user_reminders(db, user_id=current_user.id, skip=skip, limit=limit)
-    return reminders
+    # Encoded with msgspec and returned directly; response_model still documents the schema
+    content = schemas_fast.encode([schemas_fast.from_row(schemas_fast.ReminderStruct, row) for row in reminders])
+    return Response(content=content, media_type="application/json")
 
 @router.get("/{reminder_id}", response_model=schemas.Reminder)
 def read_reminder(
     reminder_id: int,
-    db: Session = Depends(get_db),
-    current_user: models.User = Depends(auth.get_current_active_user)
+    db: DB,
+    current_user: CurrentUser
 ):
-    db_reminder = crud.get_reminder(db, reminder_id=reminder_id)
-    if db_reminder is None:
+    db_reminder = crud.get_reminder(db, reminder_id=reminder_id, user_id=current_user.id)
+    if db_reminder is None: # Missing or owned by another user
         raise HTTPException(status_code=404, detail="Reminder not found")
-    if db_reminder.owner_id != current_user.id:
-        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not authorized to access this reminder")
     return db_reminder
 
 @router.put("/{reminder_id}", response_model=schemas.Reminder)
 def update_reminder(
     reminder_id: int,
     reminder_update: schemas.ReminderUpdate,
-    db: Session = Depends(get_db),
-    current_user: models.User = Depends(auth.get_current_active_user)
+    db: DB,
+    current_user: CurrentUser
 ):
     updated_reminder = crud.update_reminder(
         db=db, reminder_id=reminder_id, reminder_update=reminder_update, user_id=current_user.id
     )
     if updated_reminder is None: # Handle reminder not found/owned
         raise HTTPException(status_code=404, detail="Reminder not found or not owned by user")
-    if updated_reminder == "invalid_task":
-        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Task not found or not owned by user")
-    if updated_reminder == "invalid_file":
-        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="File not found or not owned by user")
-    if updated_reminder == "invalid_rule":
-        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid or missing recurrence rule, or rule provided for one-time reminder")
+    reminder_schedule.invalidate_next_due()
     return updated_reminder
 
 @router.delete("/{reminder_id}", status_code=status.HTTP_204_NO_CONTENT)
 def delete_reminder(
     reminder_id: int,
-    db: Session = Depends(get_db),
-    current_user: models.User = Depends(auth.get_current_active_user)
+    db: DB,
+    current_user: CurrentUser
 ):
     deleted = crud.delete_reminder(db=db, reminder_id=reminder_id, user_id=current_user.id)
     if not deleted:
@@ -92,29 +83,23 @@ def delete_reminder(
 @router.post("/{reminder_id}/complete", response_model=schemas.Reminder)
 def complete_reminder(
     reminder_id: int,
-    db: Session = Depends(get_db),
-    current_user: models.User = Depends(auth.get_current_active_user)
+    db: DB,
+    current_user: CurrentUser
 ):
     """Marks the current instance of a reminder as complete. For recurring scheduled, reschedules to next occurrence."""
-    result = crud.complete_reminder_instance(db=db, reminder_id=reminder_id, user_id=current_user.id)
-    if result == "not_found":
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Reminder not found or not owned by user")
-    if result == "inactive":
-        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Reminder is already inactive")
+    result = crud.complete_reminder_instance(db=db, reminder_id=reminder_id, user_id=current_user.id) # Raises NotFound / ReminderInactive
+    reminder_schedule.invalidate_next_due() # Recurring reminders move to their next trigger
     return result
 
 @router.post("/{reminder_id}/skip", response_model=schemas.Reminder)
 def skip_reminder(
     reminder_id: int,
-    db: Session = Depends(get_db),
-    current_user: models.User = Depends(auth.get_current_active_user)
+    db: DB,
+    current_user: CurrentUser
 ):
     """Skips the current instance of a reminder. For recurring scheduled, reschedules to next occurrence."""
-    result = crud.skip_reminder_instance(db=db, reminder_id=reminder_id, user_id=current_user.id)
-    if result == "not_found":
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Reminder not found or not owned by user")
-    if result == "inactive":
-        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Reminder is already inactive")
+    result = crud.skip_reminder_instance(db=db, reminder_id=reminder_id, user_id=current_user.id) # Raises NotFound / ReminderInactive
+    reminder_schedule.invalidate_next_due() # Recurring reminders move to their next trigger
     return result 
 
 # --- History Endpoint ---
@@ -122,20 +107,23 @@ def skip_reminder(
 @router.get("/{reminder_id}/history", response_model=List[schemas.ReminderEvent])
 def read_reminder_history(
     reminder_id: int,
+    db: DB,
+    current_user: CurrentUser,
     start_date: Optional[datetime] = None,
     end_date: Optional[datetime] = None,
-    db: Session = Depends(get_db),
-    current_user: models.User = Depends(auth.get_current_active_user)
+    before_id: Optional[int] = None,
+    limit: Optional[int] = Query(None, ge=1, le=500)
 ):
-    """Retrieves the action history for a specific reminder."""
-    history_result = crud.get_reminder_history(
+    """Retrieves the action history for a specific reminder, newest first. Returns the whole
+    history unless limit is given; to page back, pass the id of the last event received as
+    before_id."""
+    # Raises NotFound (404) if the reminder isn't the user's
+    return crud.get_reminder_history(
         db=db,
         reminder_id=reminder_id,
         user_id=current_user.id,
         start_date=start_date,
-        end_date=end_date
-    )
-    if history_result == "not_found":
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Reminder not found or not owned by user")
-    # Assuming direct return of list on success
-    return history_result 
\ No newline at end of file
+        end_date=end_date,
+        before_id=before_id,
+        limit=limit
+    )
\ No newline at end of file
@@ -1,13 +1,11 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from typing import List
+from fastapi import APIRouter, Depends, HTTPException, Response, status
 
 # Change to direct imports
 import crud
-import models
 import schemas
 import auth
-from database import get_db
+import report_cache
+from deps import DB, CurrentUser
 
 router = APIRouter(
     prefix="/outstanding",
@@ -19,14 +17,21 @@ router = APIRouter(
 @router.get("/contact/{contact_id}", response_model=schemas.OutstandingItemsResponse)
 def read_outstanding_items_for_contact(
     contact_id: int,
-    db: Session = Depends(get_db),
-    current_user: models.User = Depends(auth.get_current_active_user)
+    db: DB,
+    current_user: CurrentUser
 ):
-    """Retrieves outstanding tasks and reminders associated with a specific contact ID."""
-    items = crud.get_outstanding_items_for_contact(db=db, contact_id=contact_id, user_id=current_user.id)
-    if items is None: # CRUD function returns None if contact not found/owned
-        raise HTTPException(status_code=404, detail="Contact not found or not owned by user")
-    return items
+    """Retrieves outstanding tasks and reminders associated with a specific contact ID.
+    Served from the short-lived report cache when possible (X-Cache: HIT)."""
+    cache_field = f"outstanding:{contact_id}"
+    content = report_cache.get(current_user.id, cache_field)
+    cache_status = "HIT" if content is not None else "MISS"
+    if content is None:
+        items = crud.get_outstanding_items_for_contact(db=db, contact_id=contact_id, user_id=current_user.id)
+        if items is None: # CRUD function returns None if contact not found/owned
+            raise HTTPException(status_code=404, detail="Contact not found or not owned by user")
+        content = items.model_dump_json()
+        report_cache.store(current_user.id, cache_field, content)
+    return Response(content=content, media_type="application/json", headers={"X-Cache": cache_status})
 
 # Add endpoint for /outstanding/{person_name} later, requiring name lookup logic in CRUD
 # Add filtering (e.g., by item type) later if needed 
\ No newline at end of file
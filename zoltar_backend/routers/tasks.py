@@ -1,13 +1,16 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from typing import List
+import hashlib
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response, status
+from pydantic import TypeAdapter
+from typing import List, Optional
 
 # Change to direct imports
 import crud
-import models
 import schemas
 import auth
-from database import get_db
+import report_cache
+import reminder_schedule
+from deps import DB, CurrentUser
 
 router = APIRouter(
     prefix="/tasks",
@@ -16,76 +19,125 @@ router = APIRouter(
     responses={404: {"description": "Not found"}},
 )
 
+# Validates and serializes a whole task page in one pass for the cached list GETs
+_TASK_LIST_ADAPTER = TypeAdapter(List[schemas.Task])
+
+# Task reads are only cached in the shared Redis backend: with the per-process fallback, a write
+# handled by one worker would leave the others serving (and ETag-validating) the old task for
+# up to REPORT_CACHE_TTL_SECONDS.
+def _cached_read(user_id: int, field: str) -> Optional[str]:
+    return report_cache.get(user_id, field) if report_cache.is_shared() else None
+
+def _cache_read(user_id: int, field: str, content: str) -> None:
+    if report_cache.is_shared():
+        report_cache.store(user_id, field, content)
+
+def _etag(content: str) -> str:
+    """Weak ETag for a serialized response; any change to the task changes its JSON."""
+    return f'W/"{hashlib.sha256(content.encode()).hexdigest()[:32]}"'
+
 @router.post("/", response_model=schemas.Task, status_code=status.HTTP_201_CREATED)
 def create_task(
     task: schemas.TaskCreate,
-    db: Session = Depends(get_db),
-    current_user: models.User = Depends(auth.get_current_active_user)
+    db: DB,
+    current_user: CurrentUser
 ):
-    db_task = crud.create_user_task(db=db, task=task, user_id=current_user.id)
-    if db_task is None: # Handle invalid project case from CRUD
-        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Project not found or not owned by user")
-    return db_task
+    db_task = crud.create_user_task(db=db, task=task, owner_id=current_user.id) # Raises InvalidProject / InvalidContact (400)
+    # One validation from the ORM row; returning a Response skips FastAPI's second pass
+    # against response_model, which stays for the docs
+    return Response(
+        content=schemas.Task.model_validate(db_task).model_dump_json(),
+        status_code=status.HTTP_201_CREATED,
+        media_type="application/json"
+    )
 
 @router.get("/", response_model=List[schemas.Task])
 def read_tasks(
+    db: DB,
+    current_user: CurrentUser,
+    after_id: Optional[int] = None,
     skip: int = 0,
-    limit: int = 100,
+    limit: int = Query(100, ge=1, le=500)
     # Add project_id, status filters later
-    db: Session = Depends(get_db),
-    current_user: models.User = Depends(auth.get_current_active_user)
 ):
-    tasks = crud.get_user_tasks(db, user_id=current_user.id, skip=skip, limit=limit)
-    return tasks
+    """Retrieves a page of the user's tasks in creation order. To page forward, pass the id
+    of the last task received as after_id (cheaper than skip on large task lists).
+    Served from the short-lived report cache when Redis is configured (X-Cache: HIT)."""
+    cache_field = f"tasks:{after_id}:{skip}:{limit}"
+    content = _cached_read(current_user.id, cache_field)
+    cache_status = "HIT" if content is not None else "MISS"
+    if content is None:
+        tasks = crud.get_user_tasks(db, user_id=current_user.id, after_id=after_id, skip=skip, limit=limit)
+        content = _TASK_LIST_ADAPTER.dump_json(_TASK_LIST_ADAPTER.validate_python(tasks, from_attributes=True)).decode()
+        _cache_read(current_user.id, cache_field, content)
+    return Response(content=content, media_type="application/json", headers={"X-Cache": cache_status})
 
 @router.get("/available", response_model=List[schemas.Task])
 def read_available_tasks(
-    db: Session = Depends(get_db),
-    current_user: models.User = Depends(auth.get_current_active_user)
+    db: DB,
+    current_user: CurrentUser
 ):
-    """Retrieves tasks for the user that are currently available (Pending or In Progress)."""
-    tasks = crud.get_user_available_tasks(db=db, user_id=current_user.id)
-    return tasks
+    """Retrieves tasks for the user that are currently available (Pending or In Progress).
+    Served from the short-lived report cache when Redis is configured (X-Cache: HIT)."""
+    cache_field = "tasks_available"
+    content = _cached_read(current_user.id, cache_field)
+    cache_status = "HIT" if content is not None else "MISS"
+    if content is None:
+        tasks = crud.get_user_available_tasks(db=db, user_id=current_user.id)
+        content = _TASK_LIST_ADAPTER.dump_json(_TASK_LIST_ADAPTER.validate_python(tasks, from_attributes=True)).decode()
+        _cache_read(current_user.id, cache_field, content)
+    return Response(content=content, media_type="application/json", headers={"X-Cache": cache_status})
 
 @router.get("/{task_id}", response_model=schemas.Task)
 def read_task(
     task_id: int,
-    db: Session = Depends(get_db),
-    current_user: models.User = Depends(auth.get_current_active_user)
+    db: DB,
+    current_user: CurrentUser,
+    if_none_match: Optional[str] = Header(None)
 ):
-    db_task = crud.get_task(db, task_id=task_id)
-    if db_task is None:
-        raise HTTPException(status_code=404, detail="Task not found")
-    if db_task.owner_id != current_user.id:
-        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not authorized to access this task")
-    return db_task
+    """Retrieves a specific task by ID.
+    Served from the short-lived report cache when Redis is configured (X-Cache: HIT). The response
+    carries an ETag; a request whose If-None-Match still matches gets an empty 304."""
+    cache_field = f"task:{task_id}"
+    content = _cached_read(current_user.id, cache_field)
+    cache_status = "HIT" if content is not None else "MISS"
+    if content is None:
+        db_task = crud.get_task(db, task_id=task_id, user_id=current_user.id)
+        if db_task is None:
+            raise HTTPException(status_code=404, detail="Task not found")
+        content = schemas.Task.model_validate(db_task).model_dump_json()
+        _cache_read(current_user.id, cache_field, content)
+    headers = {"X-Cache": cache_status, "ETag": _etag(content)}
+    if if_none_match is not None and headers["ETag"] in (tag.strip() for tag in if_none_match.split(",")):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return Response(content=content, media_type="application/json", headers=headers)
 
 @router.put("/{task_id}", response_model=schemas.TaskUpdateResponse)
 def update_task(
     task_id: int,
     task_update: schemas.TaskUpdate,
-    db: Session = Depends(get_db),
-    current_user: models.User = Depends(auth.get_current_active_user)
+    db: DB,
+    current_user: CurrentUser
 ):
     update_result = crud.update_task(
         db=db, task_id=task_id, task_update=task_update, user_id=current_user.id
-    )
+    ) # Raises InvalidProject / InvalidContact (400)
     
-    # Check for error conditions returned by CRUD function
     if update_result is None: # Handle task not found/owned
         raise HTTPException(status_code=404, detail="Task not found or not owned by user")
-    if isinstance(update_result, str) and update_result == "invalid_project": # Handle invalid project during update
-        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Project not found or not owned by user")
+    if update_result.relative_reminders_activated:
+        # Completing the task set trigger times the scheduler doesn't know about yet
+        reminder_schedule.invalidate_next_due()
         
-    # If successful, update_result is the dictionary {"updated_task": ..., "unblocked_tasks": ...}
-    # FastAPI will automatically convert this dict to the TaskUpdateResponse schema
-    return update_result
+    # update_result is an already-validated TaskUpdateResponse; returning a Response skips
+    # FastAPI re-dumping and re-validating it against response_model, which stays for the docs
+    return Response(content=update_result.model_dump_json(), media_type="application/json")
 
 @router.delete("/{task_id}", status_code=status.HTTP_204_NO_CONTENT)
 def delete_task(
     task_id: int,
-    db: Session = Depends(get_db),
-    current_user: models.User = Depends(auth.get_current_active_user)
+    db: DB,
+    current_user: CurrentUser
 ):
     deleted = crud.delete_task(db=db, task_id=task_id, user_id=current_user.id)
     if not deleted:
@@ -98,35 +150,20 @@ def delete_task(
 def add_task_dependency_endpoint(
     task_id: int,
     depends_on_task_id: int,
-    db: Session = Depends(get_db),
-    current_user: models.User = Depends(auth.get_current_active_user)
+    db: DB,
+    current_user: CurrentUser
 ):
-    """Make task_id dependent on depends_on_task_id."""
-    result = crud.add_task_dependency(db, task_id, depends_on_task_id, current_user.id)
-    if result == "not_found":
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="One or both tasks not found or not owned by user")
-    if result == "self_dependency":
-        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Task cannot depend on itself")
-    if result == "already_exists":
-        # Not an error, just return success (idempotent)
-        pass 
-    elif result != "ok":
-        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Failed to add dependency") # Should not happen
+    """Make task_id dependent on depends_on_task_id. Idempotent."""
+    crud.add_task_dependency(db, task_id, depends_on_task_id, current_user.id) # Raises NotFound / SelfDependency
     return
 
 @router.delete("/{task_id}/depends_on/{depends_on_task_id}", status_code=status.HTTP_204_NO_CONTENT)
 def remove_task_dependency_endpoint(
     task_id: int,
     depends_on_task_id: int,
-    db: Session = Depends(get_db),
-    current_user: models.User = Depends(auth.get_current_active_user)
+    db: DB,
+    current_user: CurrentUser
 ):
     """Remove dependency of task_id on depends_on_task_id."""
-    result = crud.remove_task_dependency(db, task_id, depends_on_task_id, current_user.id)
-    if result == "not_found":
-         # If either task not found, or dependency doesn't exist, return 404
-         # Distinguishing could be done in CRUD, but 404 is acceptable here.
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="One or both tasks not found, or dependency does not exist")
-    elif result != "ok":
-        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Failed to remove dependency") # Should not happen
-    return 
\ No newline at end of file
+    crud.remove_task_dependency(db, task_id, depends_on_task_id, current_user.id) # Raises NotFound
+    return
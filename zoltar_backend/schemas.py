@@ -1,10 +1,23 @@
-from pydantic import BaseModel, EmailStr, field_validator, model_validator, Field
+from pydantic import BaseModel, ConfigDict, EmailStr, field_validator, model_validator, Field
 from datetime import datetime
 from typing import Optional, Any, List, Dict
 
 # Import Enum from models using direct import
 from models import ProjectStatus, TaskStatus, ReminderType, ReminderActionType
 
+# reminder_type strings accepted by the reminder validators: enum names and values, lowercased
+_REMINDER_TYPE_LOOKUP: Dict[str, ReminderType] = {
+    **{member.name.lower(): member for member in ReminderType},
+    **{member.value.lower(): member for member in ReminderType},
+}
+
+def _parse_reminder_type(v: str) -> ReminderType:
+    """Matches a reminder_type string case-insensitively against enum names and values."""
+    reminder_type = _REMINDER_TYPE_LOOKUP.get(v.lower())
+    if reminder_type is None:
+        raise ValueError(f"Invalid reminder_type: {v}")
+    return reminder_type
+
 # Base model for User - common attributes
 class UserBase(BaseModel):
     email: EmailStr
@@ -19,8 +32,7 @@ class User(UserBase):
     is_active: bool
     created_at: datetime
 
-    class Config:
-        from_attributes = True # Replaces orm_mode = True in Pydantic v2
+    model_config = ConfigDict(from_attributes=True)
 
 # --- Category Schemas ---
 
@@ -35,8 +47,11 @@ class Category(CategoryBase):
     id: int
     owner_id: int
 
-    class Config:
-        from_attributes = True # Replaces orm_mode = True in Pydantic v2
+    model_config = ConfigDict(from_attributes=True)
+
+class CategoryPage(BaseModel):
+    items: List[Category] = []
+    next_cursor: Optional[int] = None # Pass as after_id to fetch the next page; None on the last page
 
 # --- Project Schemas ---
 
@@ -63,8 +78,7 @@ class Project(ProjectBase):
     created_at: datetime
     updated_at: Optional[datetime] = None
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 # --- Task Schemas ---
 
@@ -96,8 +110,7 @@ class Task(TaskBase):
     updated_at: Optional[datetime] = None
     completed_at: Optional[datetime] = None
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 # --- FileReference Schema (for reading) ---
 
@@ -112,8 +125,7 @@ class FileReference(BaseModel):
     task_id: Optional[int] = None # Link to task
     uploaded_at: datetime
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 # --- FileReference Update Schema ---
 
@@ -191,15 +203,7 @@ class ReminderCreate(ReminderBase):
         if v is None:
             return ReminderType.ONE_TIME
         if isinstance(v, str):
-            # Try matching enum by name (case-insensitive)
-            try:
-                return ReminderType[v.upper()]
-            except KeyError:
-                # Try matching enum by value (case-insensitive)
-                try:
-                    return ReminderType(v.lower())
-                except ValueError:
-                    raise ValueError(f"Invalid reminder_type: {v}")
+            return _parse_reminder_type(v)
         return v
 
 class ReminderUpdate(BaseModel):
@@ -224,15 +228,7 @@ class ReminderUpdate(BaseModel):
         if v is None or isinstance(v, ReminderType):
             return v
         if isinstance(v, str):
-            # Try matching enum by name (case-insensitive)
-            try:
-                return ReminderType[v.upper()]
-            except KeyError:
-                # Try matching enum by value (case-insensitive)
-                try:
-                    return ReminderType(v.lower())
-                except ValueError:
-                    raise ValueError(f"Invalid reminder_type: {v}")
+            return _parse_reminder_type(v)
         return v
 
 class Reminder(ReminderBase):
@@ -248,8 +244,7 @@ class Reminder(ReminderBase):
     relative_delay_minutes: Optional[int] = None # Added from model
     relative_to_task_completion_id: Optional[int] = None # Added from model
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 # --- Reminder Event Schema ---
 
@@ -260,9 +255,7 @@ class ReminderEvent(BaseModel):
     action_time: Optional[datetime] = None # Can be null if only triggered?
     action_type: ReminderActionType # Use the Enum from models
 
-    class Config:
-        from_attributes = True
-        use_enum_values = True # Serialize enum values
+    model_config = ConfigDict(from_attributes=True, use_enum_values=True) # Serialize enum values
 
 # --- Schemas moved from auth.py ---
 class TokenData(BaseModel):
@@ -281,15 +274,13 @@ class ProjectBasicInfo(BaseModel):
     id: int
     name: str
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 class TaskBasicInfo(BaseModel):
     id: int
     title: str
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 # --- Update Response Schemas (including unblocked items) ---
 
@@ -300,6 +291,8 @@ class ProjectUpdateResponse(BaseModel):
 class TaskUpdateResponse(BaseModel):
     updated_task: Task
     unblocked_tasks: List[TaskBasicInfo] = [] 
+    # Set when completing the task gave relative reminders a trigger time; not part of the response
+    relative_reminders_activated: bool = Field(False, exclude=True)
 
 # --- Projects By Category Schemas ---
 
@@ -307,8 +300,7 @@ class CategoryWithProjects(CategoryBase): # Inherit name, description
     id: int
     projects: List[Project] = []
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 class ProjectsByCategoryResponse(BaseModel):
     categorized: List[CategoryWithProjects] = []
@@ -330,11 +322,11 @@ class ContactUpdate(BaseModel):
 class Contact(ContactBase):
     id: int
     owner_id: int
+    outstanding_task_count: int = 0
     created_at: datetime
     updated_at: Optional[datetime] = None
 
-    class Config:
-        from_attributes = True 
+    model_config = ConfigDict(from_attributes=True)
 
 # --- Note Schemas ---
 
@@ -362,8 +354,7 @@ class Note(NoteBase):
     created_at: datetime
     updated_at: Optional[datetime] = None
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 # --- Note Summarization Schemas ---
 
@@ -413,8 +404,7 @@ class ProjectSummaryResponse(BaseModel):
     task_counts: TaskStatusCounts
     file_count: int
 
-    class Config:
-        from_attributes = True # Allow mapping from ORM model/dict
+    model_config = ConfigDict(from_attributes=True)
 
 # --- File Summary Schema ---
 
@@ -482,11 +472,10 @@ class CalendarEvent(CalendarEventBase):
     """Schema for representing a calendar event retrieved via the API."""
     id: str = Field(..., description="The unique identifier for the event from Microsoft Graph.")
 
-    class Config:
-        orm_mode = True
-        from_attributes=True # Added for Pydantic v2 compatibility
+    model_config = ConfigDict(
+        from_attributes=True,
         # Example data for documentation generation
-        schema_extra = {
+        json_schema_extra={
             "example": {
                 "id": "AAMkEXAMPLE=",
                 "subject": "API Demo Meeting",
@@ -495,6 +484,7 @@ class CalendarEvent(CalendarEventBase):
                 "end_datetime": "2024-08-15T15:00:00Z"
             }
         }
+    )
 
 # --- List Schemas ---
 
@@ -515,8 +505,7 @@ class ListItem(ListItemBase):
     created_at: datetime
     updated_at: Optional[datetime] = None
 
-    class Config:
-        from_attributes = True # Replaces orm_mode
+    model_config = ConfigDict(from_attributes=True)
 
 class ListBase(BaseModel):
     name: str
@@ -534,8 +523,7 @@ class List(ListBase):
     updated_at: Optional[datetime] = None
     items: List[ListItem] = [] # Include list items
 
-    class Config:
-        from_attributes = True # Replaces orm_mode
+    model_config = ConfigDict(from_attributes=True)
 
 # =========================
 # Chat Schemas
@@ -0,0 +1,96 @@
+import msgspec
+from datetime import datetime
+from typing import Any, List, Optional, Type, TypeVar
+
+# Import Enum from models using direct import
+from models import ProjectStatus, ReminderType
+
+# msgspec mirrors of the read schemas returned by the hot list endpoints (GET /lists, /notes,
+# /projects, /reminders). Pydantic still validates input and documents response_model; these
+# only encode the response. Field names and order must match the Pydantic schema in schemas.py
+# so the JSON is unchanged - update both together.
+
+S = TypeVar("S", bound=msgspec.Struct)
+
+# --- Project ---
+
+class ProjectStruct(msgspec.Struct, kw_only=True):
+    name: str
+    description: Optional[str] = None
+    category_id: Optional[int] = None
+    id: int
+    owner_id: int
+    status: ProjectStatus
+    created_at: datetime
+    updated_at: Optional[datetime] = None
+
+# --- Reminder ---
+
+class ReminderStruct(msgspec.Struct, kw_only=True):
+    title: Optional[str] = None
+    description: str
+    trigger_datetime: Optional[datetime] = None
+    task_id: Optional[int] = None
+    file_reference_id: Optional[int] = None
+    contact_id: Optional[int] = None
+    recurrence_rule: Optional[str] = None
+    id: int
+    owner_id: int
+    reminder_type: ReminderType
+    is_active: bool
+    created_at: datetime
+    updated_at: Optional[datetime] = None
+    last_triggered_at: Optional[datetime] = None
+    snoozed_until: Optional[datetime] = None
+    relative_delay_minutes: Optional[int] = None
+    relative_to_task_completion_id: Optional[int] = None
+
+# --- Note ---
+
+class NoteStruct(msgspec.Struct, kw_only=True):
+    title: Optional[str] = None
+    content: str
+    source: Optional[str] = None
+    tags: Optional[str] = None
+    contact_id: Optional[int] = None
+    id: int
+    owner_id: int
+    created_at: datetime
+    updated_at: Optional[datetime] = None
+
+# --- List ---
+
+class ListItemStruct(msgspec.Struct, kw_only=True):
+    text: str
+    is_checked: bool = False
+    id: int
+    list_id: int
+    created_at: datetime
+    updated_at: Optional[datetime] = None
+
+class ListStruct(msgspec.Struct, kw_only=True):
+    name: str
+    id: int
+    user_id: int
+    created_at: datetime
+    updated_at: Optional[datetime] = None
+    items: List[ListItemStruct] = []
+
+# --- Encoding ---
+
+_encoder = msgspec.json.Encoder()
+
+def from_row(struct_cls: Type[S], row: Any) -> S:
+    """Builds a struct from an ORM row by attribute access (the msgspec counterpart of
+    Pydantic's from_attributes). Only the struct's own fields are read, so relationships
+    not declared on the struct are never lazy-loaded."""
+    return struct_cls(**{name: getattr(row, name) for name in struct_cls.__struct_fields__})
+
+def list_from_row(row: Any) -> ListStruct:
+    """ListStruct with its items converted as well."""
+    fields = {name: getattr(row, name) for name in ListStruct.__struct_fields__ if name != "items"}
+    return ListStruct(items=[from_row(ListItemStruct, item) for item in row.items], **fields)
+
+def encode(structs: List[msgspec.Struct]) -> bytes:
+    """Encodes a list of structs to JSON bytes."""
+    return _encoder.encode(structs)